@@ -0,0 +1,1033 @@
+"""
+Benchmarks de performance pour Donkey Quoter.
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.donkey_quoter.core.data_loader import DataLoader
+from src.donkey_quoter.core.models import Quote, QuoteView
+from src.donkey_quoter.ui.cli_display import print_info
+
+
+def synthetic_quotes(size: int, seed: int = 42) -> list[Quote]:
+    """
+    Génère un corpus synthétique à partir du vocabulaire des vraies citations.
+
+    Args:
+        size: Nombre de citations à générer
+        seed: Graine du générateur aléatoire
+
+    Returns:
+        Liste de citations
+    """
+    rng = random.Random(seed)
+    loader = DataLoader()
+    base = loader.load_quotes(loader.get_default_quotes_path())
+    words = {
+        lang: " ".join(q.text[lang] for q in base).split() for lang in ("fr", "en")
+    }
+
+    quotes = []
+    for i in range(size):
+        length = rng.randint(6, 20)
+        quotes.append(
+            Quote(
+                id=f"bench_{i}",
+                text={
+                    lang: " ".join(rng.choices(words[lang], k=length))
+                    for lang in ("fr", "en")
+                },
+                author={"fr": "Benchmark", "en": "Benchmark"},
+                category=rng.choice(["classic", "personal", "humor"]),
+                type="preset",
+            )
+        )
+    return quotes
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Retourne le percentile d'une liste de mesures."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def print_timings(label: str, samples: list[float]):
+    """Affiche médiane et p95 d'une série de mesures (en secondes)."""
+    print(
+        f"   {label:<34}: médiane {statistics.median(samples) * 1000:8.3f} ms"
+        f" | p95 {percentile(samples, 95) * 1000:8.3f} ms"
+    )
+
+
+def cmd_similarity(args):
+    """Benchmark de l'index TF-IDF des citations similaires."""
+    from src.donkey_quoter.core.similarity import QuoteSimilarityIndex
+
+    print(f"\n🔎 Citations similaires (TF-IDF) - {args.size:,} citations")
+    quotes = synthetic_quotes(args.size)
+
+    index = QuoteSimilarityIndex()
+    start = time.perf_counter()
+    index.ensure(quotes, background=False)
+    print_info(f"Construction de l'index : {time.perf_counter() - start:.2f} s")
+
+    rng = random.Random(0)
+    for lang in ("fr", "en"):
+        samples = []
+        for _ in range(args.queries):
+            quote_id = rng.choice(quotes).id
+            start = time.perf_counter()
+            index.similar(quote_id, lang, args.k)
+            samples.append(time.perf_counter() - start)
+        print_timings(f"similar(k={args.k}) [{lang}]", samples)
+
+
+def synthetic_haikus(count: int, seed: int = 42) -> dict:
+    """
+    Génère des haïkus synthétiques au format de ``DataStorage.haikus_data``.
+
+    Args:
+        count: Nombre total de haïkus (répartis entre fr et en)
+        seed: Graine du générateur aléatoire
+
+    Returns:
+        Dictionnaire {quote_id: {langue: [entrées]}}
+    """
+    rng = random.Random(seed)
+    words = "vent lune âne pré rosée silence matin pierre chemin nuage".split()
+    data: dict = {}
+    for i in range(count):
+        lang = ("fr", "en")[i % 2]
+        quote = data.setdefault(f"bench_{i // 2}", {"fr": [], "en": []})
+        lines = (" ".join(rng.choices(words, k=rng.randint(3, 5))) for _ in range(3))
+        quote[lang].append(
+            {
+                "text": "\n".join(lines),
+                "generated_at": "2024-01-01T00:00:00Z",
+                "model": "benchmark",
+            }
+        )
+    return data
+
+
+def cmd_export(args):
+    """Benchmark de l'export : octets transférés et latence, avec et sans gzip."""
+    import tempfile
+
+    from fastapi.testclient import TestClient
+
+    from src.donkey_quoter.api import create_app
+    from src.donkey_quoter.api.dependencies import get_storage
+    from src.donkey_quoter.api.routers.export import _export_cache
+    from src.donkey_quoter.core.storage import DataStorage
+
+    print(f"\n📦 Export - {args.haikus:,} haïkus")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = DataStorage(Path(tmp))
+        storage.haikus_data = synthetic_haikus(args.haikus)
+
+        app = create_app()
+        app.dependency_overrides[get_storage] = lambda: storage
+        client = TestClient(app)
+
+        for label, encoding in (("identity", "identity"), ("gzip", "gzip")):
+            headers = {"Accept-Encoding": encoding}
+            response = client.get("/export", headers=headers)
+            wire = len(response.content) if encoding == "identity" else None
+            if wire is None:
+                # TestClient décompresse : relire la taille annoncée
+                wire = int(response.headers["content-length"])
+            print_info(f"Octets transférés [{label}] : {wire:,}")
+
+            # À froid : sérialisation + compression à chaque requête
+            cold = []
+            for _ in range(args.cold):
+                _export_cache.clear()
+                start = time.perf_counter()
+                client.get("/export", headers=headers)
+                cold.append(time.perf_counter() - start)
+            print_timings(f"à froid [{label}]", cold)
+
+            # À chaud : corps déjà compressé pour cette version des données
+            warm = []
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                client.get("/export", headers=headers)
+                warm.append(time.perf_counter() - start)
+            print_timings(f"en cache [{label}]", warm)
+
+
+def cmd_download(args):
+    """Benchmark de /export/download : premier octet et pic mémoire."""
+    import tempfile
+    import tracemalloc
+    from datetime import datetime
+
+    from src.donkey_quoter.api.schemas import ExportResponse
+    from src.donkey_quoter.api.serialization import dump_trusted
+    from src.donkey_quoter.api.streaming import ExportSnapshot, iter_export
+    from src.donkey_quoter.core.storage import DataStorage
+
+    print(f"\n⬇️  Téléchargement de l'export - {args.haikus:,} haïkus")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = DataStorage(Path(tmp))
+        storage.haikus_data = synthetic_haikus(args.haikus)
+        quotes = synthetic_quotes(args.haikus // 2)
+
+        def full_body():
+            yield dump_trusted(
+                ExportResponse,
+                quotes=quotes,
+                haikus=storage.haikus_data,
+                export_date=datetime.utcnow(),
+                total_quotes=len(quotes),
+            )
+
+        modes = {
+            "corps complet": full_body,
+            "flux json": lambda: iter_export(ExportSnapshot(quotes, storage)),
+            "flux ndjson": lambda: iter_export(
+                ExportSnapshot(quotes, storage), "ndjson"
+            ),
+        }
+        for label, produce in modes.items():
+            # Temps mesurés sans tracemalloc (qui ralentit l'allocation)
+            start = time.perf_counter()
+            first_byte = None
+            total = 0
+            for chunk in produce():
+                if first_byte is None:
+                    first_byte = time.perf_counter() - start
+                total += len(chunk)
+            elapsed = time.perf_counter() - start
+
+            tracemalloc.start()
+            for _ in produce():
+                pass
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            print(
+                f"   {label:<16}: 1er octet {first_byte * 1000:8.1f} ms"
+                f" | total {elapsed * 1000:8.1f} ms"
+                f" | {total / 1e6:6.1f} Mo | pic mémoire {peak / 1e6:6.1f} Mo"
+            )
+
+
+class SlowClaudeClient:
+    """Client Claude factice : appel bloquant d'une durée fixe."""
+
+    max_tokens_input = 200
+    model = "benchmark"
+    haiku = "Vent sur la colline\nL'âne rêve sous la lune\nLe pré se tait doux"
+
+    def __init__(self, delay: float, first_token: float = 0.2):
+        self.delay = delay
+        # Part de la durée écoulée avant le premier fragment (en flux)
+        self.first_token = first_token
+
+    def call_claude(self, prompt: str, **kwargs) -> str:
+        time.sleep(self.delay)
+        return self.haiku
+
+    def stream_claude(self, prompt: str, **kwargs):
+        words = self.haiku.split(" ")
+        time.sleep(self.delay * self.first_token)
+        for i, word in enumerate(words):
+            yield word if i == 0 else " " + word
+            time.sleep(self.delay * (1 - self.first_token) / len(words))
+
+
+def inline_executor():
+    """Exécuteur qui génère directement dans la boucle (ancien comportement)."""
+    from src.donkey_quoter.api.generation import GenerationExecutor
+
+    class InlineExecutor(GenerationExecutor):
+        async def run(self, func, *args):
+            return func(*args)
+
+    return InlineExecutor()
+
+
+def cmd_generation(args):
+    """Latence de /health et /quotes pendant des générations en cours."""
+    import asyncio
+    import os
+    import tempfile
+
+    import httpx
+
+    os.environ["DONKEY_QUOTER_DEV_MODE"] = "true"
+
+    from src.donkey_quoter.api import create_app
+    from src.donkey_quoter.api.auth import get_rate_limiter
+    from src.donkey_quoter.api.dependencies import (
+        get_anthropic_client,
+        get_generation_executor,
+        get_storage,
+    )
+    from src.donkey_quoter.config.settings import settings
+    from src.donkey_quoter.core.storage import DataStorage
+
+    # Requêtes identiques : sans ça, elles partageraient une seule génération
+    settings.generation.coalesce = "off"
+    settings.pool.enabled = False
+    print(
+        f"\n⏳ {args.concurrent} générations de {args.delay:.1f} s en cours"
+        " - latence des lectures"
+    )
+    get_rate_limiter().limit = 10**6
+
+    async def measure(app) -> dict[str, list[float]]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            generations = [
+                asyncio.create_task(
+                    client.post(
+                        "/haikus/generate",
+                        json={"quote_id": "c1", "force_new": True},
+                        headers={"X-API-Key": "dev-key-for-testing"},
+                    )
+                )
+                for _ in range(args.concurrent)
+            ]
+            await asyncio.sleep(0.05)
+
+            samples: dict[str, list[float]] = {"/health": [], "/quotes": []}
+            while not all(task.done() for task in generations):
+                for path, timings in samples.items():
+                    start = time.perf_counter()
+                    await client.get(path)
+                    timings.append(time.perf_counter() - start)
+                await asyncio.sleep(0.02)
+            await asyncio.gather(*generations)
+            return samples
+
+    def provide(value):
+        return lambda: value
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = DataStorage(Path(tmp))
+        fake = SlowClaudeClient(args.delay)
+        for label, executor in (
+            ("bloquant", inline_executor()),
+            ("pool dédié", get_generation_executor()),
+        ):
+            app = create_app()
+            app.dependency_overrides[get_storage] = lambda: storage
+            app.dependency_overrides[get_anthropic_client] = lambda: fake
+            app.dependency_overrides[get_generation_executor] = provide(executor)
+
+            start = time.perf_counter()
+            samples = asyncio.run(measure(app))
+            print_info(f"{label} : terminé en {time.perf_counter() - start:.2f} s")
+            for path, timings in samples.items():
+                if timings:
+                    print_timings(f"{path} [{label}]", timings)
+
+
+def cmd_admission(args):
+    """Rafale de générations : file non bornée vs file bornée (503 rapide)."""
+    import asyncio
+    import os
+    import tempfile
+
+    import httpx
+
+    os.environ["DONKEY_QUOTER_DEV_MODE"] = "true"
+
+    from src.donkey_quoter.api import create_app
+    from src.donkey_quoter.api.auth import get_rate_limiter
+    from src.donkey_quoter.api.dependencies import (
+        get_anthropic_client,
+        get_generation_executor,
+        get_storage,
+    )
+    from src.donkey_quoter.api.generation import GenerationExecutor
+    from src.donkey_quoter.config.settings import settings
+    from src.donkey_quoter.core.storage import DataStorage
+
+    settings.generation.coalesce = "off"
+    settings.pool.enabled = False
+    get_rate_limiter().limit = 10**6
+    print(
+        f"\n🚦 Rafale de {args.burst} générations de {args.delay:.1f} s"
+        f" - {args.workers} appels simultanés"
+    )
+
+    async def burst(app) -> list[tuple[int, float]]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=None
+        ) as client:
+
+            async def one() -> tuple[int, float]:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/haikus/generate",
+                    json={"quote_id": "c1", "force_new": True},
+                    headers={"X-API-Key": "dev-key-for-testing"},
+                )
+                return response.status_code, time.perf_counter() - start
+
+            results = await asyncio.gather(*(one() for _ in range(args.burst)))
+            health = (await client.get("/health")).json()["generation"]
+            print_info(
+                f"file max {health['max_queue']} : attente p95"
+                f" {health['wait_ms_p95']:.0f} ms, max {health['wait_ms_max']:.0f} ms"
+            )
+            return results
+
+    def provide(value):
+        return lambda: value
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = DataStorage(Path(tmp))
+        fake = SlowClaudeClient(args.delay)
+        for label, max_queue in (
+            ("non bornée", args.burst),
+            ("bornée", args.queue),
+        ):
+            executor = GenerationExecutor(
+                max_workers=args.workers,
+                max_queue=max_queue,
+                expected_seconds=args.delay,
+            )
+            app = create_app()
+            app.dependency_overrides[get_storage] = lambda: storage
+            app.dependency_overrides[get_anthropic_client] = lambda: fake
+            app.dependency_overrides[get_generation_executor] = provide(executor)
+
+            results = asyncio.run(burst(app))
+            accepted = [t for code, t in results if code == 200]
+            rejected = [t for code, t in results if code == 503]
+            print_info(f"{label} : {len(accepted)} acceptées, {len(rejected)} refusées")
+            if accepted:
+                print_timings(f"acceptées [{label}]", accepted)
+            if rejected:
+                print_timings(f"refusées (503) [{label}]", rejected)
+            executor.shutdown()
+
+
+def cmd_stream(args):
+    """Délai perçu : réponse complète vs premier fragment en flux (SSE)."""
+    import json
+    import os
+    import tempfile
+
+    os.environ["DONKEY_QUOTER_DEV_MODE"] = "true"
+
+    from fastapi.testclient import TestClient
+
+    from src.donkey_quoter.api import create_app
+    from src.donkey_quoter.api.auth import get_rate_limiter
+    from src.donkey_quoter.api.dependencies import get_anthropic_client, get_storage
+    from src.donkey_quoter.config.settings import settings
+    from src.donkey_quoter.core.storage import DataStorage
+
+    # Mesurer les appels à Claude, pas la réserve pré-générée
+    settings.pool.enabled = False
+    print(f"\n📡 Génération de {args.delay:.1f} s - {args.requests} requêtes")
+    get_rate_limiter().limit = 10**6
+    headers = {"X-API-Key": "dev-key-for-testing"}
+    body = {"quote_id": "c1", "force_new": True}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = DataStorage(Path(tmp))
+        fake = SlowClaudeClient(args.delay)
+        app = create_app()
+        app.dependency_overrides[get_storage] = lambda: storage
+        app.dependency_overrides[get_anthropic_client] = lambda: fake
+        client = TestClient(app)
+
+        complete = []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            client.post("/haikus/generate", json=body, headers=headers)
+            complete.append(time.perf_counter() - start)
+
+        # Le délai avant premier fragment est mesuré côté serveur (événement done)
+        first, last = [], []
+        for _ in range(args.requests):
+            response = client.post(
+                "/haikus/generate/stream", json=body, headers=headers
+            )
+            done = response.text.rsplit("data: ", 1)[1]
+            timings = json.loads(done)["timings"]
+            first.append(timings["ttft_ms"] / 1000)
+            last.append(timings["total_ms"] / 1000)
+
+    print_timings("/generate (réponse complète)", complete)
+    print_timings("/generate/stream (1er fragment)", first)
+    print_timings("/generate/stream (dernier)", last)
+
+
+class FailingMessages:
+    """API messages factice : chaque appel échoue après ``delay`` (ou timeout)."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+
+    def create(self, timeout=None, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay if timeout is None else min(self.delay, timeout))
+        raise ConnectionError("connection reset (benchmark)")
+
+
+def cmd_deadline(args):
+    """Latence du fallback quand Claude échoue : retries complets vs échéance."""
+    import os
+    import tempfile
+    from types import SimpleNamespace
+
+    os.environ["DONKEY_QUOTER_DEV_MODE"] = "true"
+
+    from fastapi.testclient import TestClient
+
+    from src.donkey_quoter.api import create_app
+    from src.donkey_quoter.api.auth import get_rate_limiter
+    from src.donkey_quoter.api.dependencies import get_anthropic_client, get_storage
+    from src.donkey_quoter.config.settings import settings
+    from src.donkey_quoter.core.storage import DataStorage
+    from src.donkey_quoter.infrastructure.anthropic_client import AnthropicClient
+
+    print(
+        f"\n⌛ Claude en échec (tentatives de {args.delay:.1f} s)"
+        f" - {args.requests} requêtes"
+    )
+    get_rate_limiter().limit = 10**6
+    settings.pool.enabled = False
+    settings.generation.max_deadline_seconds = 60.0
+    body = {"quote_id": "c1", "force_new": True}
+
+    # Vrai client (retries tenacity) sur une API factice
+    failing = AnthropicClient(api_key="benchmark", config_source="env")
+    failing._client = SimpleNamespace(messages=FailingMessages(args.delay))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = DataStorage(Path(tmp))
+        app = create_app()
+        app.dependency_overrides[get_storage] = lambda: storage
+        app.dependency_overrides[get_anthropic_client] = lambda: failing
+        client = TestClient(app)
+
+        for label, timeout in (
+            ("sans échéance (60 s)", 60.0),
+            (f"échéance {args.timeout:.1f} s", args.timeout),
+        ):
+            headers = {
+                "X-API-Key": "dev-key-for-testing",
+                "X-Request-Timeout": str(timeout),
+            }
+            samples = []
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                response = client.post("/haikus/generate", json=body, headers=headers)
+                samples.append(time.perf_counter() - start)
+            print_info(f"{label} : modèle {response.json()['model']}")
+            print_timings(f"fallback [{label}]", samples)
+
+
+def cmd_circuit(args):
+    """Claude en panne : retries à chaque requête vs coupe-circuit."""
+    import os
+    import tempfile
+    from types import SimpleNamespace
+
+    os.environ["DONKEY_QUOTER_DEV_MODE"] = "true"
+
+    from fastapi.testclient import TestClient
+
+    from src.donkey_quoter.api import create_app
+    from src.donkey_quoter.api.auth import get_rate_limiter
+    from src.donkey_quoter.api.dependencies import get_anthropic_client, get_storage
+    from src.donkey_quoter.config.settings import settings
+    from src.donkey_quoter.core.storage import DataStorage
+    from src.donkey_quoter.infrastructure.anthropic_client import (
+        AnthropicClient,
+        CircuitBreaker,
+    )
+
+    print(
+        f"\n🔌 Claude en panne (échecs en {args.delay:.1f} s)"
+        f" - {args.requests} requêtes, échéance {args.timeout:.1f} s"
+    )
+    get_rate_limiter().limit = 10**6
+    settings.pool.enabled = False
+    headers = {
+        "X-API-Key": "dev-key-for-testing",
+        "X-Request-Timeout": str(args.timeout),
+    }
+    body = {"quote_id": "c1", "force_new": True}
+
+    def provide(value):
+        return lambda: value
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = DataStorage(Path(tmp))
+        for label, breaker in (
+            (
+                "sans coupe-circuit",
+                CircuitBreaker(failure_threshold=10**9, min_calls=10**9),
+            ),
+            ("coupe-circuit", None),
+        ):
+            failing = AnthropicClient(api_key="benchmark", config_source="env")
+            failing._client = SimpleNamespace(messages=FailingMessages(args.delay))
+            if breaker is not None:
+                failing.breaker = breaker
+            app = create_app()
+            app.dependency_overrides[get_storage] = lambda: storage
+            app.dependency_overrides[get_anthropic_client] = provide(failing)
+            client = TestClient(app)
+
+            samples = []
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                client.post("/haikus/generate", json=body, headers=headers)
+                samples.append(time.perf_counter() - start)
+            state = client.get("/health").json()["circuit_breaker"]
+            print_info(
+                f"{label} : {sum(samples):.1f} s au total,"
+                f" {failing._client.messages.calls} appels à Claude,"
+                f" circuit {state['state']} ({state['rejected']} refus)"
+            )
+            print_timings(f"fallback [{label}]", samples)
+
+
+class ListRateLimiter:
+    """Ancien rate limiter : une date par génération, listes refiltrées."""
+
+    def __init__(self, limit: int = 5, window_hours: float = 24):
+        from collections import defaultdict
+        from datetime import timedelta
+
+        self.limit = limit
+        self.window = timedelta(hours=window_hours)
+        self._usage = defaultdict(list)
+
+    def _cleanup(self, api_key: str):
+        from datetime import datetime
+
+        cutoff = datetime.utcnow() - self.window
+        self._usage[api_key] = [ts for ts in self._usage[api_key] if ts > cutoff]
+
+    def check(self, api_key: str) -> tuple[bool, int]:
+        self._cleanup(api_key)
+        count = len(self._usage[api_key])
+        return count < self.limit, max(0, self.limit - count)
+
+    def record(self, api_key: str):
+        from datetime import datetime
+
+        self._usage[api_key].append(datetime.utcnow())
+
+    def __len__(self) -> int:
+        return len(self._usage)
+
+
+def cmd_ratelimit(args):
+    """Rate limiter : listes de dates vs GCRA (temps par appel, mémoire, éviction)."""
+    import tracemalloc
+
+    from src.donkey_quoter.api.auth import RateLimiter
+
+    print(f"\n🎫 Rate limiter - {args.keys:,} clés, limite {args.limit}")
+    keys = [f"key-{i}" for i in range(args.keys)]
+
+    def fill(limiter, uses: int):
+        for key in keys:
+            for _ in range(uses):
+                limiter.check(key)
+                limiter.record(key)
+
+    for label, factory in (
+        ("listes", ListRateLimiter),
+        ("GCRA", RateLimiter),
+    ):
+        limiter = factory(limit=args.limit)
+        start = time.perf_counter()
+        fill(limiter, 1)
+        elapsed = time.perf_counter() - start
+        print_info(
+            f"{label} : check + record {elapsed / args.keys * 1e6:.2f} µs par clé"
+        )
+
+        # Clé au quota épuisé : coût d'un check
+        hot = factory(limit=args.limit)
+        for _ in range(args.limit):
+            hot.record("hot")
+        samples = []
+        for _ in range(10_000):
+            start = time.perf_counter()
+            hot.check("hot")
+            samples.append(time.perf_counter() - start)
+        print_timings(f"check (quota épuisé) [{label}]", samples)
+
+        # Mémoire : chaque clé a consommé tout son quota
+        tracemalloc.start()
+        limiter = factory(limit=args.limit)
+        for key in keys:
+            for _ in range(args.limit):
+                limiter.record(key)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print_info(
+            f"{label} : {current / 1024**2:.0f} Mo pour {len(limiter):,} clés"
+            f" ({current / args.keys:.0f} octets par clé)"
+        )
+
+        # Clés inactives : fenêtre de 1 ms, toutes expirées au fil de l'eau
+        limiter = factory(limit=args.limit, window_hours=0.001 / 3600)
+        fill(limiter, 1)
+        time.sleep(0.01)
+        limiter.record("last")
+        print_info(f"{label} : {len(limiter):,} clés gardées après expiration")
+
+
+def _quota_worker(backend, keys: int, limit: int, atomic: bool, barrier, results):
+    """Worker : consomme tout le quota de chaque clé (reserve, ou check + record)."""
+    from src.donkey_quoter.api.auth import RateLimiter
+
+    limiter = RateLimiter(limit=limit, backend=backend)
+
+    def acquire(key: str) -> bool:
+        if atomic:
+            return limiter.reserve(key)
+        if limiter.check(key)[0]:
+            limiter.record(key)
+            return True
+        return False
+
+    granted = calls = 0
+    barrier.wait()
+    start = time.perf_counter()
+    for i in range(keys):
+        key = f"key-{i}"
+        calls += 1
+        while acquire(key):
+            granted += 1
+            calls += 1
+    results.put((granted, (time.perf_counter() - start) / calls))
+
+
+def _record_worker(backend, records: int, barrier, results):
+    """Worker : enregistre ``records`` générations sur une même clé."""
+    barrier.wait()
+    for _ in range(records):
+        backend.add("hot", time.time(), 1000.0)
+    results.put(records)
+
+
+def cmd_workers(args):
+    """Rate limit partagé entre workers : quotas accordés et mises à jour perdues."""
+    import multiprocessing
+    import queue
+    import tempfile
+    import threading
+
+    from src.donkey_quoter.api.rate_limit import (
+        MemoryRateLimitBackend,
+        SQLiteRateLimitBackend,
+    )
+
+    print(
+        f"\n👥 {args.workers} workers - {args.keys:,} clés, limite {args.limit}"
+        f" (attendu : {args.keys * args.limit:,} générations accordées)"
+    )
+
+    def run(target, make_args, use_threads: bool) -> list:
+        if use_threads:
+            barrier, results = threading.Barrier(args.workers), queue.Queue()
+            spawn = threading.Thread
+        else:
+            barrier = multiprocessing.Barrier(args.workers)
+            results = multiprocessing.Queue()
+            spawn = multiprocessing.Process
+        workers = [
+            spawn(target=target, args=(*make_args(), barrier, results))
+            for _ in range(args.workers)
+        ]
+        for worker in workers:
+            worker.start()
+        outcomes = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        return outcomes
+
+    with tempfile.TemporaryDirectory() as tmp:
+        shared = MemoryRateLimitBackend()
+        cases = (
+            ("mémoire par processus", MemoryRateLimitBackend, True, False),
+            ("mémoire partagée (threads)", lambda: shared, True, True),
+            (
+                "SQLite, check + record",
+                lambda: SQLiteRateLimitBackend(Path(tmp) / "check.sqlite3"),
+                False,
+                False,
+            ),
+            (
+                "SQLite, reserve",
+                lambda: SQLiteRateLimitBackend(Path(tmp) / "reserve.sqlite3"),
+                True,
+                False,
+            ),
+        )
+        for label, make_backend, atomic, use_threads in cases:
+            outcomes = run(
+                _quota_worker,
+                lambda make=make_backend, atomic=atomic: (
+                    make(),
+                    args.keys,
+                    args.limit,
+                    atomic,
+                ),
+                use_threads,
+            )
+            granted = sum(g for g, _ in outcomes)
+            per_call = statistics.median(t for _, t in outcomes)
+            print_info(
+                f"{label} : {granted:,} accordées, {per_call * 1e6:.1f} µs par appel"
+            )
+
+        # Mises à jour concurrentes d'une même clé : aucune ne doit se perdre
+        path = Path(tmp) / "hot.sqlite3"
+        SQLiteRateLimitBackend(path)
+        start = time.time()
+        run(
+            _record_worker,
+            lambda: (SQLiteRateLimitBackend(path), args.records),
+            False,
+        )
+        tat = SQLiteRateLimitBackend(path).get("hot")
+        counted = round((tat - start) / 1000.0)
+        expected = args.workers * args.records
+        print_info(
+            f"SQLite : {counted:,} générations comptées sur {expected:,}"
+            f" ({expected - counted} perdues)"
+        )
+
+
+def cmd_serialization(args):
+    """Benchmark de la sérialisation des réponses : validée vs de confiance."""
+    import asyncio
+    from datetime import datetime
+
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import APIRoute, serialize_response
+
+    from src.donkey_quoter.api.projection import QuoteFragments, projected_body
+    from src.donkey_quoter.api.routers import export_router, quotes_router
+    from src.donkey_quoter.api.schemas import ExportResponse, QuoteListResponse
+    from src.donkey_quoter.api.serialization import dump_trusted
+
+    print(f"\n🧾 Sérialisation - {args.size:,} citations")
+    quotes = synthetic_quotes(args.size)
+    haikus = synthetic_haikus(args.size)
+    fields = {
+        route.name: route.response_field
+        for route in (*export_router.routes, *quotes_router.routes)
+        if isinstance(route, APIRoute) and "GET" in route.methods
+    }
+
+    async def validated(model, name, **values) -> bytes:
+        # Chemin FastAPI classique : modèle construit puis revalidé
+        content = await serialize_response(
+            field=fields[name], response_content=model(**values)
+        )
+        return JSONResponse(content).body
+
+    def trusted(model, name, **values) -> bytes:
+        return dump_trusted(model, **values)
+
+    cases = [
+        (
+            "GET /quotes (100)",
+            QuoteListResponse,
+            "list_quotes",
+            {"data": quotes[:100], "total": len(quotes), "language": "fr"},
+            args.requests,
+        ),
+        (
+            "GET /export",
+            ExportResponse,
+            "export_all",
+            {
+                "quotes": quotes,
+                "haikus": haikus,
+                "export_date": datetime.utcnow(),
+                "total_quotes": len(quotes),
+            },
+            args.exports,
+        ),
+    ]
+
+    async def run():
+        for label, model, name, values, repeat in cases:
+            for mode in ("validée", "confiance"):
+                samples = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    if mode == "validée":
+                        await validated(model, name, **values)
+                    else:
+                        trusted(model, name, **values)
+                    samples.append(time.perf_counter() - start)
+                print_timings(f"{label} [{mode}]", samples)
+                print_info(f"Débit : {len(samples) / sum(samples):,.1f} réponses/s")
+
+    asyncio.run(run())
+
+    # Projection (?fields=id,text&only_lang=true) par fragments précalculés
+    page = quotes[:100]
+    views = [QuoteView.from_quote(q, "fr") for q in page]
+    fragments = QuoteFragments(views)
+    full = trusted(QuoteListResponse, "list_quotes", data=page, total=len(quotes))
+    samples = []
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        body = projected_body(
+            fragments.encode(views, ("id", "text")),
+            QuoteListResponse,
+            total=len(quotes),
+        )
+        samples.append(time.perf_counter() - start)
+    print_timings("GET /quotes (100) [fields+lang]", samples)
+    print_info(f"Octets : {len(full):,} -> {len(body):,}")
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Benchmarks de Donkey Quoter")
+    subparsers = parser.add_subparsers(dest="command", help="Benchmarks disponibles")
+
+    # Benchmark similarity
+    sim_parser = subparsers.add_parser(
+        "similarity", help="Recommandations de citations similaires"
+    )
+    sim_parser.add_argument("--size", type=int, default=100_000)
+    sim_parser.add_argument("--queries", type=int, default=200)
+    sim_parser.add_argument("-k", type=int, default=5)
+
+    # Benchmark export
+    export_parser = subparsers.add_parser(
+        "export", help="Export : octets transférés et latence"
+    )
+    export_parser.add_argument("--haikus", type=int, default=100_000)
+    export_parser.add_argument("--requests", type=int, default=50)
+    export_parser.add_argument("--cold", type=int, default=5)
+
+    # Benchmark download
+    download_parser = subparsers.add_parser(
+        "download", help="Export en flux : premier octet et pic mémoire"
+    )
+    download_parser.add_argument("--haikus", type=int, default=100_000)
+
+    # Benchmark generation
+    gen_parser = subparsers.add_parser(
+        "generation", help="Latence des lectures pendant des générations"
+    )
+    gen_parser.add_argument("--concurrent", type=int, default=4)
+    gen_parser.add_argument("--delay", type=float, default=1.0)
+
+    # Benchmark admission
+    adm_parser = subparsers.add_parser(
+        "admission", help="Rafale de générations avec file d'attente bornée"
+    )
+    adm_parser.add_argument("--burst", type=int, default=40)
+    adm_parser.add_argument("--workers", type=int, default=4)
+    adm_parser.add_argument("--queue", type=int, default=8)
+    adm_parser.add_argument("--delay", type=float, default=0.5)
+
+    # Benchmark stream
+    stream_parser = subparsers.add_parser(
+        "stream", help="Génération en flux : délai avant premier fragment"
+    )
+    stream_parser.add_argument("--requests", type=int, default=5)
+    stream_parser.add_argument("--delay", type=float, default=1.5)
+
+    # Benchmark deadline
+    deadline_parser = subparsers.add_parser(
+        "deadline", help="Échéance des générations : délai du fallback"
+    )
+    deadline_parser.add_argument("--requests", type=int, default=2)
+    deadline_parser.add_argument("--delay", type=float, default=1.0)
+    deadline_parser.add_argument("--timeout", type=float, default=2.0)
+
+    # Benchmark circuit
+    circuit_parser = subparsers.add_parser(
+        "circuit", help="Claude en panne : coupe-circuit et fallback"
+    )
+    circuit_parser.add_argument("--requests", type=int, default=8)
+    circuit_parser.add_argument("--delay", type=float, default=0.5)
+    circuit_parser.add_argument("--timeout", type=float, default=3.0)
+
+    # Benchmark ratelimit
+    rl_parser = subparsers.add_parser(
+        "ratelimit", help="Rate limiter : temps par appel, mémoire, éviction"
+    )
+    rl_parser.add_argument("--keys", type=int, default=1_000_000)
+    rl_parser.add_argument("--limit", type=int, default=5)
+
+    # Benchmark workers
+    workers_parser = subparsers.add_parser(
+        "workers", help="Rate limit partagé entre workers (SQLite)"
+    )
+    workers_parser.add_argument("--workers", type=int, default=4)
+    workers_parser.add_argument("--keys", type=int, default=2000)
+    workers_parser.add_argument("--limit", type=int, default=5)
+    workers_parser.add_argument("--records", type=int, default=5000)
+
+    # Benchmark serialization
+    ser_parser = subparsers.add_parser(
+        "serialization", help="Sérialisation des réponses (validée vs confiance)"
+    )
+    ser_parser.add_argument("--size", type=int, default=100_000)
+    ser_parser.add_argument("--requests", type=int, default=500)
+    ser_parser.add_argument("--exports", type=int, default=5)
+
+    args = parser.parse_args()
+
+    if args.command == "similarity":
+        cmd_similarity(args)
+    elif args.command == "export":
+        cmd_export(args)
+    elif args.command == "download":
+        cmd_download(args)
+    elif args.command == "generation":
+        cmd_generation(args)
+    elif args.command == "admission":
+        cmd_admission(args)
+    elif args.command == "stream":
+        cmd_stream(args)
+    elif args.command == "deadline":
+        cmd_deadline(args)
+    elif args.command == "circuit":
+        cmd_circuit(args)
+    elif args.command == "ratelimit":
+        cmd_ratelimit(args)
+    elif args.command == "workers":
+        cmd_workers(args)
+    elif args.command == "serialization":
+        cmd_serialization(args)
+    else:
+        parser.print_help()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
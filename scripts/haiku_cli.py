@@ -18,6 +18,7 @@ from dotenv import load_dotenv
 from src.donkey_quoter.core.haiku_manager import HaikuManager
 from src.donkey_quoter.infrastructure.anthropic_client import AnthropicClient
 from src.donkey_quoter.ui.cli_display import (
+    print_duplicate_report,
     print_error,
     print_progress,
     print_stats,
@@ -136,6 +137,12 @@ def cmd_stats(manager: HaikuManager):
     print_stats(stats)
 
 
+def cmd_duplicates(args, manager: HaikuManager):
+    """Commande duplicates."""
+    report = manager.find_near_duplicates(args.threshold)
+    print_duplicate_report(report)
+
+
 def cmd_export(args, manager: HaikuManager):
     """Commande export."""
     format_type = args.format or "json"
@@ -183,6 +190,14 @@ def main():
     # Commande stats
     subparsers.add_parser("stats", help="Affiche les statistiques")
 
+    # Commande duplicates
+    dup_parser = subparsers.add_parser(
+        "duplicates", help="Liste les grappes de quasi-doublons"
+    )
+    dup_parser.add_argument(
+        "--threshold", type=float, help="Seuil de similarité de Jaccard (0-1)"
+    )
+
     # Commande export
     export_parser = subparsers.add_parser("export", help="Exporte les haïkus")
     export_parser.add_argument(
@@ -213,6 +228,8 @@ def main():
         cmd_generate(args, manager, model)
     elif args.command == "stats":
         cmd_stats(manager)
+    elif args.command == "duplicates":
+        cmd_duplicates(args, manager)
     elif args.command == "export":
         cmd_export(args, manager)
 
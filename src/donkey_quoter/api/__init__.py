@@ -8,9 +8,26 @@ import os
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-
-from .routers import export_router, haikus_router, quotes_router
-from .schemas import HealthResponse
+from fastapi.middleware.gzip import GZipMiddleware
+
+from ..config.settings import settings
+from .dependencies import APIClient, Generation, Pool
+from .http_cache import response_cache
+from .middleware import ServerTimingMiddleware
+from .routers import (
+    corpus_router,
+    export_router,
+    haikus_router,
+    jobs_router,
+    quotes_router,
+)
+from .schemas import (
+    CircuitBreakerStats,
+    GenerationQueueStats,
+    HaikuPoolStats,
+    HealthResponse,
+    ResponseCacheStats,
+)
 
 
 def _get_cors_origins() -> list[str]:
@@ -53,10 +70,27 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Compression gzip négociée via Accept-Encoding, au-delà d'un seuil de taille
+    # (les réponses déjà compressées, comme l'export, sont laissées telles quelles)
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=settings.compression.minimum_size,
+        compresslevel=settings.compression.level,
+    )
+
+    # Chronométrage des étapes de chaque requête (en-tête Server-Timing)
+    if settings.timing.server_timing:
+        app.add_middleware(
+            ServerTimingMiddleware, log_requests=settings.timing.log_requests
+        )
+
     # Inclure les routers
     app.include_router(quotes_router)
+    # Avant /haikus : "/haikus/{quote_id}" masquerait "/haikus/jobs"
+    app.include_router(jobs_router)
     app.include_router(haikus_router)
     app.include_router(export_router)
+    app.include_router(corpus_router)
 
     @app.get("/", response_model=HealthResponse, tags=["health"])
     async def root():
@@ -64,9 +98,19 @@ def create_app() -> FastAPI:
         return HealthResponse()
 
     @app.get("/health", response_model=HealthResponse, tags=["health"])
-    async def health():
-        """Health check détaillé."""
-        return HealthResponse(status="healthy")
+    async def health(generation: Generation, pool: Pool, api_client: APIClient):
+        """
+        Health check détaillé (caches, file des générations, réserve,
+        coupe-circuit de l'API Claude).
+        """
+        breaker = getattr(api_client, "breaker", None)
+        return HealthResponse(
+            status="healthy",
+            response_cache=ResponseCacheStats(**response_cache.stats()),
+            generation=GenerationQueueStats(**generation.stats()),
+            haiku_pool=HaikuPoolStats(**pool.stats()),
+            circuit_breaker=CircuitBreakerStats(**breaker.stats()) if breaker else None,
+        )
 
     return app
 
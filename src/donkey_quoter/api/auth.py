@@ -2,14 +2,23 @@
 Authentification par API key et rate limiting.
 """
 
+import math
 import os
-from collections import defaultdict
-from datetime import datetime, timedelta
+import time
+from collections.abc import Iterator
+from pathlib import Path
 from typing import Annotated, Optional
 
 from fastapi import Depends, HTTPException, Security, status
 from fastapi.security import APIKeyHeader
 
+from ..config.settings import settings
+from .rate_limit import (
+    MemoryRateLimitBackend,
+    RateLimitBackend,
+    create_rate_limit_backend,
+)
+
 # Header pour l'API key
 API_KEY_HEADER = APIKeyHeader(name="X-API-Key", auto_error=False)
 
@@ -24,6 +33,8 @@ class APIKeyManager:
     def __init__(self):
         # Clés API valides (charger depuis env ou fichier)
         self._valid_keys: set[str] = set()
+        # Clés d'administration (jobs de génération en lot)
+        self._admin_keys: set[str] = set()
         self._load_keys()
 
     def _load_keys(self):
@@ -41,14 +52,27 @@ class APIKeyManager:
                 if key:
                     self._valid_keys.add(key)
 
+        # Clés d'administration (comma-separated), également valides
+        admin_keys = os.getenv("DONKEY_QUOTER_ADMIN_KEYS", "")
+        for key in admin_keys.split(","):
+            key = key.strip()
+            if key:
+                self._valid_keys.add(key)
+                self._admin_keys.add(key)
+
         # Clé de développement (uniquement si explicitement activée)
         if os.getenv("DONKEY_QUOTER_DEV_MODE", "").lower() == "true":
             self._valid_keys.add("dev-key-for-testing")
+            self._admin_keys.add("dev-key-for-testing")
 
     def is_valid(self, api_key: str) -> bool:
         """Vérifie si une clé API est valide."""
         return api_key in self._valid_keys
 
+    def is_admin(self, api_key: str) -> bool:
+        """Vérifie si une clé API a les droits d'administration."""
+        return api_key in self._admin_keys
+
     def add_key(self, api_key: str):
         """Ajoute une clé API (pour les tests)."""
         self._valid_keys.add(api_key)
@@ -56,21 +80,44 @@ class APIKeyManager:
 
 class RateLimiter:
     """
-    Rate limiter par API key.
+    Rate limiter par API key (GCRA, état constant par clé).
 
-    Limite le nombre de générations de haïkus par clé API.
+    Limite le nombre de générations de haïkus par clé API : ``limit``
+    générations d'affilée au plus, puis une nouvelle toutes les
+    ``window / limit`` (le quota se recharge en continu sur la fenêtre).
+
+    Seule l'heure théorique d'arrivée (TAT) de chaque clé est gardée, dans
+    un ``RateLimitBackend`` : la date à laquelle son quota serait de nouveau
+    plein. Une clé dont le quota est plein peut être oubliée (rien ne la
+    distingue d'une clé inconnue).
     """
 
-    def __init__(self, limit: int = 5, window_hours: int = 24):
+    def __init__(
+        self,
+        limit: int = 5,
+        window_hours: float = 24,
+        backend: Optional[RateLimitBackend] = None,
+    ):
+        """
+        Args:
+            limit: Générations par fenêtre
+            window_hours: Durée de la fenêtre (heures)
+            backend: Stockage des TAT (en mémoire par défaut)
+        """
         self.limit = limit
-        self.window = timedelta(hours=window_hours)
-        # {api_key: [datetime, datetime, ...]}
-        self._usage: dict[str, list[datetime]] = defaultdict(list)
+        self.window = window_hours * 3600
+        self.backend = MemoryRateLimitBackend() if backend is None else backend
 
-    def _cleanup(self, api_key: str):
-        """Nettoie les entrées expirées."""
-        cutoff = datetime.utcnow() - self.window
-        self._usage[api_key] = [ts for ts in self._usage[api_key] if ts > cutoff]
+    @property
+    def interval(self) -> float:
+        """Secondes nécessaires pour récupérer une génération."""
+        return self.window / self.limit
+
+    def _available(self, api_key: str, now: float) -> float:
+        """Générations disponibles (fractionnaires) pour une clé."""
+        tat = self.backend.get(api_key)
+        tat = now if tat is None else max(tat, now)
+        return (now + self.window - tat) / self.interval
 
     def check(self, api_key: str) -> tuple[bool, int]:
         """
@@ -79,23 +126,50 @@ class RateLimiter:
         Returns:
             (is_allowed, remaining_count)
         """
-        self._cleanup(api_key)
-        count = len(self._usage[api_key])
-        remaining = max(0, self.limit - count)
-        return count < self.limit, remaining
+        remaining = self.get_remaining(api_key)
+        return remaining > 0, remaining
 
     def record(self, api_key: str):
         """Enregistre une génération."""
-        self._usage[api_key].append(datetime.utcnow())
+        self.backend.add(api_key, time.time(), self.interval)
+
+    def reserve(self, api_key: str) -> bool:
+        """
+        Vérifie le quota et réserve une génération (atomique, même entre
+        workers partageant le stockage).
+
+        Returns:
+            True si la génération est réservée, False si le quota est épuisé
+        """
+        return self.backend.reserve(api_key, time.time(), self.interval, self.window)
+
+    def refund(self, api_key: str):
+        """Rend une génération réservée mais finalement pas décomptée."""
+        self.backend.refund(api_key, self.interval)
 
     def get_remaining(self, api_key: str) -> int:
         """Retourne le nombre de générations restantes."""
-        self._cleanup(api_key)
-        return max(0, self.limit - len(self._usage[api_key]))
+        # Marge pour les arrondis flottants (4.9999... doit compter pour 5)
+        available = math.floor(self._available(api_key, time.time()) + 1e-9)
+        return max(0, min(self.limit, available))
+
+    def retry_after(self, api_key: str) -> float:
+        """
+        Retourne le délai avant la prochaine génération autorisée.
+
+        Returns:
+            Secondes à attendre (0 si une génération est possible)
+        """
+        missing = 1 - self._available(api_key, time.time())
+        return max(0.0, missing * self.interval)
 
     def reset(self, api_key: str):
         """Reset le compteur pour une clé (pour les tests)."""
-        self._usage[api_key] = []
+        self.backend.delete(api_key)
+
+    def __len__(self) -> int:
+        """Nombre de clés suivies (quota entamé)."""
+        return len(self.backend)
 
 
 # Instances globales (singleton-like)
@@ -112,10 +186,16 @@ def get_api_key_manager() -> APIKeyManager:
 
 
 def get_rate_limiter() -> RateLimiter:
-    """Retourne le rate limiter (singleton)."""
+    """Retourne le rate limiter (singleton, stockage selon la configuration)."""
     global _rate_limiter
     if _rate_limiter is None:
-        _rate_limiter = RateLimiter()
+        _rate_limiter = RateLimiter(
+            limit=settings.rate_limit.limit,
+            window_hours=settings.rate_limit.window_hours,
+            backend=create_rate_limit_backend(
+                settings.rate_limit.backend, Path(settings.rate_limit.path)
+            ),
+        )
     return _rate_limiter
 
 
@@ -170,28 +250,113 @@ async def verify_api_key_optional(
     return api_key
 
 
-async def check_haiku_rate_limit(
+def _rate_limit_exceeded(limiter: RateLimiter, api_key: str) -> HTTPException:
+    """Erreur 429 avec le délai exact avant la prochaine génération."""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Rate limit exceeded. Try again later.",
+        headers={
+            "X-RateLimit-Limit": str(limiter.limit),
+            "X-RateLimit-Remaining": "0",
+            "Retry-After": str(math.ceil(limiter.retry_after(api_key))),
+        },
+    )
+
+
+def check_haiku_rate_limit(
     api_key: str = Depends(verify_api_key),
 ) -> str:
     """
     Vérifie le rate limit pour la génération de haïkus.
 
-    Lève une exception 429 si la limite est atteinte.
+    Lève une exception 429 si la limite est atteinte. Synchrone : le stockage
+    (SQLite) est bloquant, FastAPI l'exécute dans son pool de threads.
     """
     limiter = get_rate_limiter()
-    allowed, remaining = limiter.check(api_key)
+    allowed, _ = limiter.check(api_key)
 
     if not allowed:
+        raise _rate_limit_exceeded(limiter, api_key)
+
+    return api_key
+
+
+class GenerationReservation:
+    """
+    Génération réservée sur le quota d'une clé, le temps d'une requête.
+
+    La route appelle ``charge()`` quand elle sert réellement une génération ;
+    sinon (haïku stocké, fallback, erreur) la réservation est rendue. Une
+    réponse en flux appelle ``hold()`` : la réservation survit alors à la fin
+    de la requête, jusqu'à ``charge()`` ou ``release()`` en fin de flux.
+    """
+
+    def __init__(self, limiter: RateLimiter, api_key: str):
+        self.limiter = limiter
+        self.api_key = api_key
+        self.charged = False
+        self.released = False
+        self.held = False
+
+    def hold(self):
+        """Garde la réservation après la fin de la requête (réponse en flux)."""
+        self.held = True
+
+    def charge(self):
+        """Décompte la génération réservée."""
+        if self.charged:
+            return
+        if self.released:
+            # Réservation déjà rendue : la reprendre, sans dépasser le quota
+            self.charged = self.limiter.reserve(self.api_key)
+            self.released = not self.charged
+            return
+        self.charged = True
+
+    def release(self):
+        """Rend la réservation si elle n'a pas été décomptée."""
+        if not (self.charged or self.released):
+            self.released = True
+            self.limiter.refund(self.api_key)
+
+
+def reserve_haiku_generation(
+    api_key: str = Depends(verify_api_key),
+) -> Iterator[GenerationReservation]:
+    """
+    Réserve une génération sur le quota de la clé, atomiquement.
+
+    Contrairement à ``check_haiku_rate_limit``, deux requêtes simultanées
+    (même sur des workers différents) ne peuvent pas dépasser le quota.
+    Lève une exception 429 si la limite est atteinte ; la réservation non
+    décomptée est rendue à la fin de la requête. Synchrone, comme
+    ``check_haiku_rate_limit``, pour ne pas bloquer la boucle d'événements.
+    """
+    limiter = get_rate_limiter()
+    if not limiter.reserve(api_key):
+        raise _rate_limit_exceeded(limiter, api_key)
+
+    reservation = GenerationReservation(limiter, api_key)
+    try:
+        yield reservation
+    finally:
+        if not reservation.held:
+            reservation.release()
+
+
+async def verify_admin_key(
+    api_key: str = Depends(verify_api_key),
+) -> str:
+    """
+    Vérifie que l'API key a les droits d'administration.
+
+    Lève une exception 403 sinon.
+    """
+    if not get_api_key_manager().is_admin(api_key):
         raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Rate limit exceeded. Try again later.",
-            headers={
-                "X-RateLimit-Limit": str(limiter.limit),
-                "X-RateLimit-Remaining": "0",
-                "Retry-After": "3600",
-            },
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin API key required",
         )
-
     return api_key
 
 
@@ -199,3 +364,5 @@ async def check_haiku_rate_limit(
 VerifiedAPIKey = Annotated[str, Depends(verify_api_key)]
 OptionalAPIKey = Annotated[Optional[str], Depends(verify_api_key_optional)]
 RateLimitedAPIKey = Annotated[str, Depends(check_haiku_rate_limit)]
+ReservedGeneration = Annotated[GenerationReservation, Depends(reserve_haiku_generation)]
+AdminAPIKey = Annotated[str, Depends(verify_admin_key)]
@@ -4,12 +4,16 @@ Client HTTP pour appeler l'API REST Donkey Quoter.
 Utilisé par Streamlit pour communiquer avec le backend API.
 """
 
+import json
 import os
-from typing import Optional
+from collections import OrderedDict
+from collections.abc import Iterator
+from typing import Any, Optional
 
 import httpx
 
 from ..core.models import Quote
+from .schemas import MAX_BATCH_IDS
 
 
 class DonkeyQuoterAPIClient:
@@ -25,6 +29,7 @@ class DonkeyQuoterAPIClient:
         base_url: Optional[str] = None,
         api_key: Optional[str] = None,
         timeout: float = 30.0,
+        max_cached_responses: int = 256,
     ):
         """
         Initialise le client API.
@@ -33,11 +38,17 @@ class DonkeyQuoterAPIClient:
             base_url: URL de base de l'API (défaut: depuis env ou localhost:8000)
             api_key: Clé API pour l'authentification
             timeout: Timeout pour les requêtes HTTP
+            max_cached_responses: Nombre max de réponses gardées avec leur ETag
         """
         self.base_url = base_url or os.getenv("API_BASE_URL", "http://localhost:8000")
         self.api_key = api_key or os.getenv("DONKEY_QUOTER_API_KEY")
         self.timeout = timeout
         self._client: Optional[httpx.Client] = None
+        # {(path, params): (etag, données JSON)} en ordre LRU
+        self._validated: OrderedDict[tuple, tuple[str, Any]] = OrderedDict()
+        self.max_cached_responses = max_cached_responses
+        # Dernier corpus téléchargé : (version, citations)
+        self._corpus: Optional[tuple[str, list[Quote]]] = None
 
     @property
     def client(self) -> httpx.Client:
@@ -65,6 +76,36 @@ class DonkeyQuoterAPIClient:
     def __exit__(self, *args):
         self.close()
 
+    def _get_json(self, path: str, params: Optional[dict] = None) -> Any:
+        """
+        Effectue un GET conditionnel et retourne le JSON de la réponse.
+
+        Envoie l'ETag de la dernière réponse reçue pour la même requête : sur
+        un 304, le corps gardé en cache est réutilisé sans retransfert.
+
+        Raises:
+            httpx.HTTPStatusError: Pour les réponses en erreur
+        """
+        key = (path, tuple(sorted((params or {}).items())))
+        cached = self._validated.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else None
+
+        response = self.client.get(path, params=params, headers=headers)
+        if response.status_code == 304 and cached:
+            self._validated.move_to_end(key)
+            return cached[1]
+
+        response.raise_for_status()
+        data = response.json()
+
+        etag = response.headers.get("ETag")
+        if etag:
+            self._validated[key] = (etag, data)
+            self._validated.move_to_end(key)
+            while len(self._validated) > self.max_cached_responses:
+                self._validated.popitem(last=False)
+        return data
+
     # ================================================================
     # Quotes API
     # ================================================================
@@ -96,10 +137,7 @@ class DonkeyQuoterAPIClient:
         if quote_type:
             params["type"] = quote_type
 
-        response = self.client.get("/quotes", params=params)
-        response.raise_for_status()
-
-        data = response.json()
+        data = self._get_json("/quotes", params=params)
         return [Quote(**q) for q in data["data"]]
 
     def get_random_quote(
@@ -129,6 +167,34 @@ class DonkeyQuoterAPIClient:
         except httpx.HTTPStatusError:
             return None
 
+    def get_daily_quote(
+        self,
+        language: str = "fr",
+        category: Optional[str] = None,
+    ) -> Optional[dict]:
+        """
+        Récupère la citation du jour et son haïku stocké.
+
+        Args:
+            language: Langue (fr/en)
+            category: Filtrer par catégorie
+
+        Returns:
+            Dict avec data (citation), date et haiku, ou None
+        """
+        params = {"lang": language}
+        if category:
+            params["category"] = category
+
+        try:
+            response = self.client.get("/quotes/daily", params=params)
+            response.raise_for_status()
+            data = response.json()
+            data["data"] = Quote(**data["data"])
+            return data
+        except httpx.HTTPStatusError:
+            return None
+
     def get_quote_by_id(
         self,
         quote_id: str,
@@ -145,13 +211,71 @@ class DonkeyQuoterAPIClient:
             Citation ou None
         """
         try:
-            response = self.client.get(f"/quotes/{quote_id}", params={"lang": language})
-            response.raise_for_status()
-            data = response.json()
+            data = self._get_json(f"/quotes/{quote_id}", params={"lang": language})
             return Quote(**data["data"])
         except httpx.HTTPStatusError:
             return None
 
+    def get_quotes_batch(
+        self,
+        quote_ids: list[str],
+        language: str = "fr",
+    ) -> dict[str, Optional[Quote]]:
+        """
+        Récupère plusieurs citations, par requêtes groupées.
+
+        Les IDs sont envoyés par paquets de ``MAX_BATCH_IDS`` (limite du
+        serveur).
+
+        Args:
+            quote_ids: IDs des citations
+            language: Langue (fr/en)
+
+        Returns:
+            Dict {id: citation ou None si inconnue}
+
+        Raises:
+            httpx.HTTPStatusError: Pour les réponses en erreur
+        """
+        quotes = {}
+        for chunk in _chunks(quote_ids, MAX_BATCH_IDS):
+            response = self.client.post(
+                "/quotes/batch-get",
+                json={"ids": chunk},
+                params={"lang": language},
+            )
+            response.raise_for_status()
+            for quote_id, quote in response.json()["data"].items():
+                quotes[quote_id] = Quote(**quote) if quote else None
+        return quotes
+
+    def get_similar_quotes(
+        self,
+        quote_id: str,
+        language: str = "fr",
+        k: int = 5,
+    ) -> list[Quote]:
+        """
+        Récupère les citations similaires à une citation.
+
+        Args:
+            quote_id: ID de la citation
+            language: Langue (fr/en)
+            k: Nombre de recommandations
+
+        Returns:
+            Liste de citations (vide si la citation n'existe pas)
+        """
+        try:
+            response = self.client.get(
+                f"/quotes/{quote_id}/similar", params={"lang": language, "k": k}
+            )
+            response.raise_for_status()
+            data = response.json()
+            return [Quote(**item["quote"]) for item in data["data"]]
+        except httpx.HTTPStatusError:
+            return []
+
     def create_quote(
         self,
         text: str,
@@ -183,6 +307,32 @@ class DonkeyQuoterAPIClient:
         except httpx.HTTPStatusError:
             return None
 
+    def get_corpus(self) -> list[Quote]:
+        """
+        Récupère le corpus complet via son URL versionnée.
+
+        Seul le petit pointeur ``/corpus/version`` est consulté tant que la
+        version ne change pas ; le corpus lui-même n'est téléchargé qu'à
+        chaque nouvelle version (et peut venir d'un cache HTTP/CDN).
+
+        Returns:
+            Liste de citations (vide si l'API est indisponible)
+        """
+        try:
+            response = self.client.get("/corpus/version")
+            response.raise_for_status()
+            pointer = response.json()
+            if self._corpus and self._corpus[0] == pointer["version"]:
+                return self._corpus[1]
+
+            response = self.client.get(pointer["url"])
+            response.raise_for_status()
+            quotes = [Quote(**q) for q in response.json()["quotes"]]
+            self._corpus = (pointer["version"], quotes)
+            return quotes
+        except httpx.HTTPStatusError:
+            return self._corpus[1] if self._corpus else []
+
     # ================================================================
     # Haikus API
     # ================================================================
@@ -209,6 +359,84 @@ class DonkeyQuoterAPIClient:
         except httpx.HTTPStatusError:
             return None
 
+    def get_haikus_batch(
+        self,
+        quote_ids: list[str],
+        languages: Optional[list[str]] = None,
+        language: str = "fr",
+    ) -> dict[str, dict[str, dict]]:
+        """
+        Récupère les haïkus de plusieurs citations, par requêtes groupées.
+
+        Les IDs sont envoyés par paquets de ``MAX_BATCH_IDS`` (limite du
+        serveur).
+
+        Args:
+            quote_ids: IDs des citations
+            languages: Langues voulues (défaut: ``language``)
+            language: Langue par défaut (fr/en)
+
+        Returns:
+            Dict {id: {langue: {haiku: dict ou None, count: int}}}
+
+        Raises:
+            httpx.HTTPStatusError: Pour les réponses en erreur
+        """
+        haikus = {}
+        for chunk in _chunks(quote_ids, MAX_BATCH_IDS):
+            payload: dict[str, Any] = {"quote_ids": chunk}
+            if languages:
+                payload["languages"] = languages
+            response = self.client.post(
+                "/haikus/batch-get", json=payload, params={"lang": language}
+            )
+            response.raise_for_status()
+            haikus.update(response.json()["data"])
+        return haikus
+
+    def create_haiku_job(
+        self,
+        quote_ids: Optional[list[str]] = None,
+        all_missing: bool = False,
+    ) -> Optional[dict]:
+        """
+        Lance un job de génération en lot (clé d'administration requise).
+
+        Args:
+            quote_ids: Citations à (re)générer
+            all_missing: Toutes les citations sans haïku FR et EN
+
+        Returns:
+            État initial du job ou None en cas d'erreur
+        """
+        payload: dict[str, Any] = {"all_missing": all_missing}
+        if quote_ids:
+            payload["quote_ids"] = quote_ids
+
+        try:
+            response = self.client.post("/haikus/jobs", json=payload)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError:
+            return None
+
+    def get_haiku_job(self, job_id: str) -> Optional[dict]:
+        """
+        Récupère l'état d'un job de génération en lot.
+
+        Args:
+            job_id: ID du job
+
+        Returns:
+            Statut, résultats par citation et coût, ou None si introuvable
+        """
+        try:
+            response = self.client.get(f"/haikus/jobs/{job_id}")
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError:
+            return None
+
     def generate_haiku(
         self,
         quote_id: str,
@@ -240,6 +468,45 @@ class DonkeyQuoterAPIClient:
                 return {"error": "rate_limit", "detail": "Rate limit exceeded"}
             return None
 
+    def stream_haiku(
+        self,
+        quote_id: str,
+        language: str = "fr",
+        force_new: bool = False,
+    ) -> Iterator[tuple[str, dict]]:
+        """
+        Génère un haïku en flux (Server-Sent Events).
+
+        Args:
+            quote_id: ID de la citation
+            language: Langue (fr/en)
+            force_new: Forcer une nouvelle génération
+
+        Yields:
+            (événement, données) : ("start", ...), ("token", {"text": ...})*,
+            ("error", ...)?, puis ("done", {"haiku": ..., "stored": ...})
+
+        Raises:
+            httpx.HTTPStatusError: Pour les réponses en erreur (404, 429, 503)
+        """
+        with self.client.stream(
+            "POST",
+            "/haikus/generate/stream",
+            json={"quote_id": quote_id, "force_new": force_new},
+            params={"lang": language},
+        ) as response:
+            if response.is_error:
+                response.read()
+                response.raise_for_status()
+
+            event = None
+            for line in response.iter_lines():
+                if line.startswith("event: "):
+                    event = line[len("event: ") :]
+                elif line.startswith("data: ") and event:
+                    yield event, json.loads(line[len("data: ") :])
+                    event = None
+
     def haiku_exists(
         self,
         quote_id: str,
@@ -256,11 +523,9 @@ class DonkeyQuoterAPIClient:
             True si un haïku existe
         """
         try:
-            response = self.client.get(
+            data = self._get_json(
                 f"/haikus/{quote_id}/exists", params={"lang": language}
             )
-            response.raise_for_status()
-            data = response.json()
             return data.get("exists", False)
         except httpx.HTTPStatusError:
             return False
@@ -291,9 +556,7 @@ class DonkeyQuoterAPIClient:
             Dict avec quotes, haikus, export_date ou None
         """
         try:
-            response = self.client.get("/export")
-            response.raise_for_status()
-            return response.json()
+            return self._get_json("/export")
         except httpx.HTTPStatusError:
             return None
 
@@ -315,6 +578,12 @@ class DonkeyQuoterAPIClient:
             return False
 
 
+def _chunks(items: list[str], size: int) -> Iterator[list[str]]:
+    """Découpe une liste en paquets d'au plus ``size`` éléments."""
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
 # Singleton pour usage global
 _api_client: Optional[DonkeyQuoterAPIClient] = None
 
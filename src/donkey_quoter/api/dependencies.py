@@ -2,50 +2,196 @@
 Injection de dépendances pour l'API FastAPI.
 """
 
+import hashlib
+import time
+from datetime import datetime, timezone
 from functools import lru_cache
 from pathlib import Path
 from typing import Annotated, Optional
 
 from dotenv import load_dotenv
-from fastapi import Depends, Header, Query
+from fastapi import Depends, Header, HTTPException, Query
+from pydantic import TypeAdapter
 
+from ..config.settings import settings
+from ..core.daily import DailySchedule
 from ..core.data_loader import DataLoader
-from ..core.models import Quote
+from ..core.models import Quote, QuoteView
+from ..core.near_duplicates import NearDuplicateIndex
 from ..core.services import DonkeyQuoterService
+from ..core.similarity import QuoteSimilarityIndex
 from ..core.storage import DataStorage
 from ..infrastructure.anthropic_client import AnthropicClient
+from .generation import GenerationExecutor
+from .haiku_pool import HaikuPool
+from .jobs import JobRunner, JobStore
+from .projection import QuoteFragments
+
+# Sérialisation canonique du corpus (empreinte de contenu)
+_QUOTE_LIST = TypeAdapter(list[Quote])
 
 
 class QuoteRepository:
     """
     Repository pour les citations.
 
-    Gère le chargement et le cache des citations.
+    Gère le chargement et le cache des citations, ainsi que leurs vues à plat
+    par langue, précalculées au chargement.
     """
 
+    LANGUAGES = ("fr", "en")
+
     def __init__(self):
         self.data_loader = DataLoader()
         self._quotes: Optional[list[Quote]] = None
+        self._by_id: dict[str, Quote] = {}
+        self._views: dict[str, list[QuoteView]] = {}
+        self._views_by_id: dict[str, dict[str, QuoteView]] = {}
+        self.similarity = QuoteSimilarityIndex()
+        self._near_duplicates: Optional[dict[str, NearDuplicateIndex]] = None
+        self._daily: dict[str, DailySchedule] = {}
+        # Fragments JSON par forme : None (bilingue) ou langue (vue à plat)
+        self._fragments: dict[Optional[str], QuoteFragments] = {}
+        # Version du corpus : incrémentée à chaque chargement
+        self._version = 0
+        self._last_modified = datetime.now(timezone.utc)
+        self._content_hash = ""
+
+    def _load(self):
+        """Charge les citations et précalcule les index et vues par langue."""
+        path = self.data_loader.get_default_quotes_path()
+        quotes = self.data_loader.load_quotes(path)
+        self._by_id = {q.id: q for q in quotes}
+        self._views = {
+            lang: [QuoteView.from_quote(q, lang) for q in quotes]
+            for lang in self.LANGUAGES
+        }
+        self._views_by_id = {
+            lang: {view.id: view for view in views}
+            for lang, views in self._views.items()
+        }
+        self._fragments = {}
+        self._content_hash = hashlib.blake2b(
+            _QUOTE_LIST.dump_json(quotes), digest_size=8
+        ).hexdigest()
+        self._quotes = quotes
+        self._version += 1
+        self._last_modified = datetime.fromtimestamp(path.stat().st_mtime, timezone.utc)
+
+    @property
+    def version(self) -> int:
+        """Version du corpus chargé (change à chaque rechargement)."""
+        if self._quotes is None:
+            self._load()
+        return self._version
+
+    @property
+    def last_modified(self) -> datetime:
+        """Date de dernière modification du fichier de citations chargé."""
+        if self._quotes is None:
+            self._load()
+        return self._last_modified
+
+    @property
+    def content_hash(self) -> str:
+        """Empreinte du contenu du corpus (identique d'un worker à l'autre)."""
+        if self._quotes is None:
+            self._load()
+        return self._content_hash
 
     @property
     def quotes(self) -> list[Quote]:
         """Retourne la liste des citations (lazy loading)."""
         if self._quotes is None:
-            self._quotes = self.data_loader.load_quotes(
-                self.data_loader.get_default_quotes_path()
-            )
+            self._load()
         return self._quotes
 
+    def views(self, language: str) -> list[QuoteView]:
+        """Retourne les vues à plat des citations dans une langue."""
+        if self._quotes is None:
+            self._load()
+        return self._views.get(language, self._views["fr"])
+
+    def fragments(self, language: Optional[str] = None) -> QuoteFragments:
+        """
+        Retourne les fragments JSON par champ d'une forme du corpus.
+
+        Args:
+            language: Langue des vues à plat, None pour les citations bilingues
+
+        Returns:
+            Fragments précalculés (construits au premier usage)
+        """
+        if self._quotes is None:
+            self._load()
+        if language not in self._fragments:
+            items = self._quotes if language is None else self.views(language)
+            self._fragments[language] = QuoteFragments(items)
+        return self._fragments[language]
+
     def reload(self):
         """Force le rechargement des citations depuis le disque."""
         self._quotes = None
+        self._near_duplicates = None
+        self._daily = {}
 
     def get_by_id(self, quote_id: str) -> Optional[Quote]:
         """Trouve une citation par son ID."""
-        for quote in self.quotes:
-            if quote.id == quote_id:
-                return quote
-        return None
+        if self._quotes is None:
+            self._load()
+        return self._by_id.get(quote_id)
+
+    def get_view(self, quote_id: str, language: str) -> Optional[QuoteView]:
+        """Trouve la vue à plat d'une citation par son ID."""
+        if self._quotes is None:
+            self._load()
+        return self._views_by_id.get(language, self._views_by_id["fr"]).get(quote_id)
+
+    def get_daily_schedule(self, category: str = "all") -> DailySchedule:
+        """
+        Retourne le planning de la citation du jour pour une catégorie.
+
+        Args:
+            category: Catégorie ("all" pour tout le corpus)
+
+        Returns:
+            Planning déterministe (mis en cache jusqu'au prochain reload)
+        """
+        if category not in self._daily:
+            ids = [
+                q.id for q in self.quotes if category == "all" or q.category == category
+            ]
+            self._daily[category] = DailySchedule(ids, seed=settings.daily.seed)
+        return self._daily[category]
+
+    def find_near_duplicate(self, text: str, language: str = "fr") -> Optional[str]:
+        """
+        Cherche une citation quasi identique (MinHash/LSH).
+
+        Args:
+            text: Texte de la citation à comparer
+            language: Langue du texte
+
+        Returns:
+            ID de la citation la plus proche au-dessus du seuil, ou None
+        """
+        if self._near_duplicates is None:
+            self._near_duplicates = {
+                lang: NearDuplicateIndex.from_items(
+                    (q.id, q.text[lang]) for q in self.quotes if q.text.get(lang)
+                )
+                for lang in ("fr", "en")
+            }
+        index = self._near_duplicates.get(language, self._near_duplicates["fr"])
+        return index.find(text)
+
+    def get_similar(
+        self, quote_id: str, language: str = "fr", k: int = 5
+    ) -> Optional[list[tuple[Quote, float]]]:
+        """Retourne les k citations les plus proches (TF-IDF, cosinus)."""
+        # Reconstruit l'index si le corpus a été rechargé (en arrière-plan)
+        self.similarity.ensure(self.quotes)
+        return self.similarity.similar(quote_id, language, k)
 
 
 @lru_cache
@@ -60,6 +206,36 @@ def get_storage() -> DataStorage:
     return DataStorage(Path("data"))
 
 
+@lru_cache
+def get_generation_executor() -> GenerationExecutor:
+    """Singleton pour le pool de threads des générations."""
+    return GenerationExecutor(
+        max_workers=settings.generation.max_workers,
+        max_queue=settings.generation.max_queue,
+        expected_seconds=settings.generation.expected_seconds,
+    )
+
+
+@lru_cache
+def get_haiku_pool() -> HaikuPool:
+    """Singleton pour la réserve de haïkus pré-générés."""
+    return HaikuPool(
+        size=settings.pool.size,
+        hot_quotes=settings.pool.hot_quotes,
+        batch_size=settings.pool.batch_size,
+        refill_concurrency=settings.pool.refill_concurrency,
+        daily_budget_usd=settings.pool.daily_budget_usd,
+        idle_poll_seconds=settings.pool.idle_poll_seconds,
+    )
+
+
+@lru_cache
+def get_job_runner() -> JobRunner:
+    """Singleton pour l'exécuteur des jobs de génération en lot."""
+    store = JobStore(get_storage().data_dir / settings.jobs.directory)
+    return JobRunner(store, max_concurrent_batches=settings.jobs.max_concurrent_batches)
+
+
 _anthropic_client: Optional[AnthropicClient] = None
 
 
@@ -114,9 +290,42 @@ def get_language(
     return "fr"
 
 
+def get_deadline(
+    request_timeout: Annotated[
+        Optional[str],
+        Header(
+            alias="X-Request-Timeout",
+            description="Délai maximal de la requête, en secondes",
+        ),
+    ] = None,
+) -> float:
+    """
+    Calcule l'échéance de la requête (``time.monotonic()``).
+
+    Délai depuis l'en-tête X-Request-Timeout (plafonné), ou défaut serveur.
+    """
+    timeout = settings.generation.deadline_seconds
+    if request_timeout is not None:
+        try:
+            timeout = float(request_timeout)
+        except ValueError:
+            timeout = 0.0
+        if not timeout > 0:
+            raise HTTPException(
+                status_code=400,
+                detail=f"En-tête X-Request-Timeout invalide : {request_timeout}",
+            )
+        timeout = min(timeout, settings.generation.max_deadline_seconds)
+    return time.monotonic() + timeout
+
+
 # Type aliases pour les signatures de routes
 QuoteRepo = Annotated[QuoteRepository, Depends(get_quote_repository)]
 Storage = Annotated[DataStorage, Depends(get_storage)]
 Service = Annotated[DonkeyQuoterService, Depends(get_service)]
 Language = Annotated[str, Depends(get_language)]
 APIClient = Annotated[Optional[AnthropicClient], Depends(get_anthropic_client)]
+Generation = Annotated[GenerationExecutor, Depends(get_generation_executor)]
+Deadline = Annotated[float, Depends(get_deadline)]
+Pool = Annotated[HaikuPool, Depends(get_haiku_pool)]
+Jobs = Annotated[JobRunner, Depends(get_job_runner)]
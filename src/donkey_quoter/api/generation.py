@@ -0,0 +1,315 @@
+"""
+Exécution des générations de haïkus hors de la boucle d'événements.
+
+``AnthropicClient.call_claude`` est synchrone (SDK bloquant, attentes de
+tenacity entre deux tentatives). Appelé directement depuis une route
+``async``, il gèlerait toutes les autres requêtes du worker. Les générations
+passent donc par un pool de threads dédié et borné : les lectures rapides
+gardent la boucle d'événements et le pool par défaut pour elles.
+
+Les requêtes identiques simultanées sont fusionnées (« single-flight ») : une
+seule génération est lancée et toutes les requêtes reçoivent son résultat.
+
+Le nombre d'appels Claude simultanés est borné, ainsi que la file d'attente
+devant eux : au-delà, la génération est refusée immédiatement
+(``GenerationOverloadedError``) avec un délai de nouvel essai estimé, au lieu
+d'empiler des requêtes qui finiraient en 429 amont et en tempêtes de retries.
+"""
+
+import asyncio
+import contextvars
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Hashable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from ..timing import current_timer
+
+T = TypeVar("T")
+
+# Marque de fin d'un générateur relayé par ``GenerationExecutor.stream``
+_END = object()
+
+
+class GenerationOverloadedError(Exception):
+    """Levée quand la file d'attente des générations est pleine."""
+
+    def __init__(self, retry_after: int):
+        """
+        Args:
+            retry_after: Délai estimé avant qu'une place se libère (secondes)
+        """
+        super().__init__(f"File de génération pleine, réessayer dans {retry_after} s")
+        self.retry_after = retry_after
+
+
+class SingleFlight:
+    """
+    Fusion des appels concurrents identiques.
+
+    Le premier appelant d'une clé lance le travail ; ceux qui arrivent pendant
+    qu'il est en cours l'attendent au lieu de le relancer. Le travail tourne
+    dans sa propre tâche : l'annulation d'un appelant (client déconnecté)
+    n'interrompt pas les autres.
+    """
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(
+        self, key: Hashable, func: Callable[[], Awaitable[T]]
+    ) -> tuple[T, bool]:
+        """
+        Exécute ``func`` une seule fois par clé parmi les appels simultanés.
+
+        Args:
+            key: Clé identifiant le travail
+            func: Coroutine à lancer si aucun travail n'est en cours
+
+        Returns:
+            (résultat, True si l'appel a rejoint un travail déjà en cours)
+
+        Raises:
+            Exception: L'erreur du travail, propagée à tous les appelants
+        """
+        task = self._inflight.get(key)
+        joined = task is not None
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task), joined
+
+
+class GenerationExecutor:
+    """Pool de threads borné réservé aux appels de génération."""
+
+    # Nombre d'attentes récentes conservées pour les percentiles
+    WAIT_SAMPLES = 512
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_queue: int = 16,
+        expected_seconds: float = 3.0,
+    ):
+        """
+        Initialise le pool.
+
+        Args:
+            max_workers: Nombre maximal de générations simultanées
+            max_queue: Nombre maximal de générations en attente d'une place
+            expected_seconds: Durée estimée d'une génération avant la
+                première mesure (sert au calcul de Retry-After)
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="haiku-generation"
+        )
+        # Créé à la première génération, dans la boucle d'événements (voir
+        # ``_semaphore``)
+        self._slots: Optional[asyncio.Semaphore] = None
+        # Générations en cours, par (quote_id, langue, mode)
+        self.flights = SingleFlight()
+
+        # Compteurs (modifiés uniquement depuis la boucle d'événements)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._avg_seconds = expected_seconds
+        self._waits: deque[float] = deque(maxlen=self.WAIT_SAMPLES)
+        self._max_wait = 0.0
+
+    @property
+    def _semaphore(self) -> asyncio.Semaphore:
+        """
+        Places de génération, créées au premier usage.
+
+        Le pool est construit par une dépendance synchrone, que FastAPI
+        exécute dans un thread sans boucle d'événements : sous Python 3.9,
+        ``asyncio.Semaphore()`` y lèverait RuntimeError (``get_event_loop``).
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        return self._slots
+
+    def retry_after(self) -> int:
+        """
+        Estime le délai avant qu'une nouvelle génération puisse démarrer.
+
+        Returns:
+            Délai en secondes (au moins 1)
+        """
+        rounds = self.waiting // self.max_workers + 1
+        return max(1, math.ceil(rounds * self._avg_seconds))
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        """
+        Exécute une fonction bloquante dans le pool et attend son résultat.
+
+        Le contexte courant (timer Server-Timing, ...) est propagé au thread.
+        Si toutes les places sont prises, l'appel attend dans la file ; si la
+        file est pleine, il est refusé immédiatement.
+
+        Args:
+            func: Fonction synchrone à exécuter
+            *args: Arguments de la fonction
+
+        Returns:
+            Le résultat de la fonction
+
+        Raises:
+            GenerationOverloadedError: Si la file d'attente est pleine
+        """
+        future = await self._submit(func, *args)
+        return await asyncio.wrap_future(future)
+
+    async def stream(self, func: Callable[..., Iterator[T]], *args) -> AsyncIterator[T]:
+        """
+        Exécute un générateur bloquant dans le pool et relaie ses éléments.
+
+        La place est gardée jusqu'à la fin du générateur. Si le consommateur
+        s'arrête (client déconnecté), le générateur est fermé au prochain
+        élément produit, et la place libérée quand le thread s'arrête.
+
+        Args:
+            func: Fonction synchrone retournant un itérateur
+            *args: Arguments de la fonction
+
+        Yields:
+            Les éléments du générateur, au fil de leur production
+
+        Raises:
+            GenerationOverloadedError: Si la file d'attente est pleine
+        """
+        loop = asyncio.get_running_loop()
+        items: asyncio.Queue = asyncio.Queue()
+        stopped = threading.Event()
+
+        def produce():
+            try:
+                for item in func(*args):
+                    if stopped.is_set():
+                        break
+                    loop.call_soon_threadsafe(items.put_nowait, (item, None))
+            except Exception as e:
+                loop.call_soon_threadsafe(items.put_nowait, (_END, e))
+            else:
+                loop.call_soon_threadsafe(items.put_nowait, (_END, None))
+
+        await self._submit(produce)
+        try:
+            while True:
+                item, error = await items.get()
+                if item is _END:
+                    if error is not None:
+                        raise error
+                    break
+                yield item
+        finally:
+            stopped.set()
+
+    def check_capacity(self):
+        """
+        Refuse d'avance une génération si la file est pleine.
+
+        Utile avant d'envoyer une réponse en flux, dont le statut HTTP ne
+        peut plus changer une fois le premier octet parti.
+
+        Raises:
+            GenerationOverloadedError: Si la file d'attente est pleine
+        """
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise GenerationOverloadedError(self.retry_after())
+
+    async def _submit(self, func: Callable[..., T], *args) -> Future:
+        """
+        Attend une place (ou refuse si la file est pleine) et lance ``func``.
+
+        La place est libérée par le thread lui-même, quand ``func`` se
+        termine : l'annulation de l'appelant (délai dépassé, client
+        déconnecté) n'interrompt pas le thread, qui doit rester compté.
+
+        Returns:
+            Le futur du thread
+        """
+        self.check_capacity()
+
+        self.waiting += 1
+        queued = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self._record_wait(time.perf_counter() - queued)
+
+        self.active += 1
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        try:
+            future = self._executor.submit(context.run, func, *args)
+        except BaseException:
+            self._release(started)
+            raise
+        future.add_done_callback(lambda _: self._release_threadsafe(loop, started))
+        return future
+
+    def _release_threadsafe(self, loop: asyncio.AbstractEventLoop, started: float):
+        """Rend la place depuis le thread, via la boucle d'événements."""
+        try:
+            loop.call_soon_threadsafe(self._release, started)
+        except RuntimeError:
+            # Boucle fermée (arrêt du serveur) : plus personne n'attend de place
+            pass
+
+    def _release(self, started: float):
+        # Moyenne glissante de la durée d'une génération
+        duration = time.perf_counter() - started
+        self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * duration
+        self.active -= 1
+        self._semaphore.release()
+
+    def _record_wait(self, seconds: float):
+        self.admitted += 1
+        self._waits.append(seconds)
+        self._max_wait = max(self._max_wait, seconds)
+        timer = current_timer()
+        if timer is not None:
+            timer.record("queue_wait", seconds)
+
+    def stats(self) -> dict:
+        """
+        Retourne l'état de la file des générations.
+
+        Returns:
+            Places, file, compteurs et temps d'attente (ms, sur les
+            ``WAIT_SAMPLES`` dernières générations admises)
+        """
+        waits = sorted(self._waits)
+        p95 = waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0
+        return {
+            "active": self.active,
+            "max_workers": self.max_workers,
+            "waiting": self.waiting,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "wait_ms_avg": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+            "wait_ms_p95": round(p95 * 1000, 1),
+            "wait_ms_max": round(self._max_wait * 1000, 1),
+            "generation_ms_avg": round(self._avg_seconds * 1000, 1),
+        }
+
+    def shutdown(self):
+        """Arrête le pool (sans attendre les générations en cours)."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
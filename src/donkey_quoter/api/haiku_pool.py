@@ -0,0 +1,263 @@
+"""
+Réserve de haïkus pré-générés pour les demandes ``force_new``.
+
+Pour les citations les plus demandées en ``force_new``, une tâche de fond
+garde ``size`` variantes inédites par (citation, langue). Elles sont générées
+par lots avec le prompt bilingue de ``HaikuManager`` (une variante FR et une
+EN par citation et par appel), uniquement quand le pool des générations a de
+la place libre, et dans la limite d'un budget quotidien. Une demande
+``force_new`` prend une variante en réserve au lieu d'appeler Claude ; la
+variante n'est enregistrée dans le stockage qu'à ce moment-là.
+
+La réserve vit en mémoire : elle est perdue au redémarrage et se reconstitue
+au fil des demandes.
+"""
+
+import asyncio
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from ..config.settings import settings
+from ..core.haiku_manager import HaikuManager
+from ..core.models import Quote
+from ..infrastructure.anthropic_client import CircuitOpenError
+from ..timing import create_background_task
+from .generation import GenerationExecutor, GenerationOverloadedError
+
+LANGUAGES = ("fr", "en")
+
+
+class HaikuPool:
+    """Variantes de haïkus prêtes à servir, par (citation, langue)."""
+
+    def __init__(
+        self,
+        size: int = 2,
+        hot_quotes: int = 20,
+        batch_size: int = 5,
+        refill_concurrency: int = 1,
+        daily_budget_usd: float = 0.50,
+        idle_poll_seconds: float = 1.0,
+    ):
+        """
+        Args:
+            size: Variantes gardées par (citation, langue)
+            hot_quotes: Nombre de citations approvisionnées (les plus demandées)
+            batch_size: Citations par appel Claude
+            refill_concurrency: Appels de remplissage simultanés
+            daily_budget_usd: Dépense maximale de remplissage par jour (UTC)
+            idle_poll_seconds: Attente quand le pool de génération est occupé
+        """
+        self.size = size
+        self.hot_quotes = hot_quotes
+        self.batch_size = batch_size
+        self.refill_concurrency = refill_concurrency
+        self.daily_budget_usd = daily_budget_usd
+        self.idle_poll_seconds = idle_poll_seconds
+
+        self._variants: dict[tuple[str, str], deque[str]] = {}
+        # Demandes force_new par citation (choix des citations à approvisionner)
+        self._demand: Counter[str] = Counter()
+        # Créé par ``start``, dans la boucle d'événements : sous Python 3.9,
+        # asyncio.Event() lève RuntimeError dans le thread où FastAPI exécute
+        # la dépendance synchrone qui construit la réserve
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.model: Optional[str] = None
+
+        # Compteurs
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self._spent_day = None
+        self._spent_usd = 0.0
+
+    def take(self, quote_id: str, language: str) -> Optional[str]:
+        """
+        Retire une variante de la réserve et note la demande.
+
+        Args:
+            quote_id: ID de la citation
+            language: Langue voulue
+
+        Returns:
+            Un haïku inédit, ou None si la réserve est vide
+        """
+        self._demand[quote_id] += 1
+        variants = self._variants.get((quote_id, language))
+        if variants:
+            self.hits += 1
+            haiku = variants.popleft()
+        else:
+            self.misses += 1
+            haiku = None
+        # Remplacer la variante servie (ou approvisionner une citation demandée)
+        if self._wake is not None:
+            self._wake.set()
+        return haiku
+
+    @property
+    def running(self) -> bool:
+        """Vrai si la tâche de remplissage tourne."""
+        return self._task is not None and not self._task.done()
+
+    def start(
+        self,
+        lookup: Callable[[str], Optional[Quote]],
+        manager: HaikuManager,
+        generation: GenerationExecutor,
+    ):
+        """
+        Démarre la tâche de remplissage.
+
+        Args:
+            lookup: Recherche d'une citation par ID
+            manager: Gestionnaire de haïkus (client Claude)
+            generation: Pool des générations
+        """
+        self.model = manager.model
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        # Démarrée par une requête, mais hors de son timer Server-Timing
+        self._task = create_background_task(
+            self._refill_loop(lookup, manager, generation)
+        )
+
+    def spent_today(self) -> float:
+        """Dépense de remplissage du jour (USD, jour UTC)."""
+        if self._spent_day != datetime.now(timezone.utc).date():
+            return 0.0
+        return self._spent_usd
+
+    def _spend(self, usage: Optional[dict[str, int]]):
+        if not usage:
+            return
+        today = datetime.now(timezone.utc).date()
+        if self._spent_day != today:
+            self._spent_day, self._spent_usd = today, 0.0
+        self._spent_usd += settings.pricing.cost(
+            self.model, usage["input_tokens"], usage["output_tokens"]
+        )
+
+    def _affordable(
+        self, batches: list[list[Quote]], manager: HaikuManager
+    ) -> list[list[Quote]]:
+        """
+        Garde les lots dont le coût maximal estimé tient dans le budget du jour.
+
+        Le coût réel n'est connu qu'après l'appel : l'estimation (sortie
+        bornée par ``max_tokens``) évite de dépasser le budget d'un lot entier.
+        """
+        remaining = self.daily_budget_usd - self.spent_today()
+        affordable = []
+        for batch in batches:
+            usage = manager.estimate_batch_usage(batch)
+            cost = settings.pricing.cost(
+                self.model, usage["input_tokens"], usage["output_tokens"]
+            )
+            if cost > remaining:
+                break
+            remaining -= cost
+            affordable.append(batch)
+        return affordable
+
+    def _needing_refill(self) -> list[str]:
+        """Citations les plus demandées auxquelles il manque des variantes."""
+        return [
+            quote_id
+            for quote_id, _ in self._demand.most_common(self.hot_quotes)
+            if any(
+                len(self._variants.get((quote_id, lang), ())) < self.size
+                for lang in LANGUAGES
+            )
+        ]
+
+    def _has_idle_capacity(self, generation: GenerationExecutor) -> bool:
+        # Toujours laisser au moins une place aux requêtes interactives
+        busy = generation.active + generation.waiting + self.refill_concurrency
+        return busy < generation.max_workers
+
+    async def _refill_loop(
+        self,
+        lookup: Callable[[str], Optional[Quote]],
+        manager: HaikuManager,
+        generation: GenerationExecutor,
+    ):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+
+            while True:
+                pending = self._needing_refill()
+                if not pending or self.spent_today() >= self.daily_budget_usd:
+                    break
+                if not self._has_idle_capacity(generation):
+                    await asyncio.sleep(self.idle_poll_seconds)
+                    continue
+
+                quotes = [q for q in map(lookup, pending) if q is not None]
+                batches = [
+                    quotes[i : i + self.batch_size]
+                    for i in range(0, len(quotes), self.batch_size)
+                ][: self.refill_concurrency]
+                batches = self._affordable(batches, manager)
+                if not batches:
+                    # Le prochain lot dépasserait le budget du jour
+                    break
+                results = await asyncio.gather(
+                    *(self._refill(batch, manager, generation) for batch in batches)
+                )
+                if not any(results):
+                    # Aucune variante obtenue : attendre la prochaine demande
+                    break
+
+    async def _refill(
+        self,
+        quotes: list[Quote],
+        manager: HaikuManager,
+        generation: GenerationExecutor,
+    ) -> int:
+        try:
+            haikus, usage = await generation.run(
+                manager.generate_batch_with_usage, quotes
+            )
+        except GenerationOverloadedError as e:
+            await asyncio.sleep(e.retry_after)
+            return 1  # Rien d'obtenu mais réessayer
+        except CircuitOpenError:
+            # API Claude en panne : attendre la prochaine demande
+            return 0
+        except Exception as e:
+            print(f"[API] Remplissage de la réserve de haïkus impossible : {e}")
+            return 0
+
+        self._spend(usage)
+        added = 0
+        for quote in quotes:
+            result = haikus.get(quote.id) or {}
+            for lang in LANGUAGES:
+                variants = self._variants.setdefault((quote.id, lang), deque())
+                if result.get(lang) and len(variants) < self.size:
+                    variants.append(result[lang])
+                    added += 1
+        self.generated += added
+        return added
+
+    def stats(self) -> dict:
+        """
+        Retourne l'état de la réserve.
+
+        Returns:
+            Variantes en réserve, citations approvisionnées, succès/échecs
+            de ``take`` et dépense du jour
+        """
+        return {
+            "variants": sum(len(v) for v in self._variants.values()),
+            "quotes": len({quote_id for quote_id, _ in self._variants}),
+            "hits": self.hits,
+            "misses": self.misses,
+            "generated": self.generated,
+            "spent_today_usd": round(self.spent_today(), 6),
+            "daily_budget_usd": self.daily_budget_usd,
+        }
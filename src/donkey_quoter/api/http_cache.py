@@ -0,0 +1,357 @@
+"""
+Cache HTTP pour les endpoints de lecture.
+
+- Validateurs (ETag / Last-Modified) : les ETags sont dérivés des empreintes
+  du contenu du corpus et des haïkus, plus les paramètres de la requête. Tant
+  que les données ne changent pas, un client qui renvoie son ETag reçoit un
+  304 sans corps, quel que soit le worker qui répond.
+- Charges utiles précompressées : les gros corps quasi statiques (export) sont
+  sérialisés et compressés une fois par version des données.
+- Cache de corps encodés : les réponses des endpoints de lecture chauds sont
+  gardées (LRU borné) sous leur ETag, qui dépend de la route, des paramètres
+  et du contenu des données.
+"""
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Optional
+
+from fastapi import HTTPException, Request, Response, status
+
+from ..config.settings import settings
+from .dependencies import Language, QuoteRepo, Storage
+
+
+def compute_etag(*parts: object) -> str:
+    """
+    Calcule un ETag fort à partir d'éléments quelconques.
+
+    Args:
+        *parts: Éléments identifiant la représentation (route, versions, ...)
+
+    Returns:
+        ETag entre guillemets
+    """
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=12)
+    return f'"{digest.hexdigest()}"'
+
+
+def format_http_date(value: datetime) -> str:
+    """Formate une date au format HTTP (RFC 7231)."""
+    return format_datetime(value.replace(microsecond=0), usegmt=True)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Vérifie un en-tête If-None-Match (comparaison faible, RFC 7232).
+
+    Args:
+        if_none_match: Valeur de l'en-tête (peut lister plusieurs ETags)
+        etag: ETag courant
+
+    Returns:
+        True si l'un des ETags correspond
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+def not_modified_since(
+    if_modified_since: Optional[str], last_modified: datetime
+) -> bool:
+    """Vérifie un en-tête If-Modified-Since (à la seconde près)."""
+    if not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return last_modified.replace(microsecond=0) <= since
+
+
+def check_conditional(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: datetime,
+):
+    """
+    Pose les validateurs sur la réponse et court-circuite en 304 si possible.
+
+    If-None-Match est prioritaire sur If-Modified-Since (RFC 7232).
+
+    Raises:
+        HTTPException: 304 Not Modified avec les validateurs
+    """
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_http_date(last_modified),
+        "Vary": "Accept-Language",
+    }
+
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        unchanged = etag_matches(if_none_match, etag)
+    else:
+        unchanged = not_modified_since(
+            request.headers.get("If-Modified-Since"), last_modified
+        )
+
+    if unchanged:
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+
+
+def conditional_get(quotes: bool = False, haikus: bool = False) -> Callable:
+    """
+    Crée une dépendance de requête conditionnelle pour une route GET.
+
+    Args:
+        quotes: La représentation dépend du corpus de citations
+        haikus: La représentation dépend des haïkus stockés
+
+    Returns:
+        Dépendance FastAPI à placer dans ``dependencies=[Depends(...)]``
+    """
+
+    async def dependency(
+        request: Request,
+        response: Response,
+        repo: QuoteRepo,
+        storage: Storage,
+        lang: Language,
+    ):
+        versions = []
+        modified = []
+        # Empreintes du contenu, et non compteurs propres au processus : tous
+        # les workers produisent le même ETag pour les mêmes données
+        if quotes:
+            versions.append(f"q{repo.content_hash}")
+            modified.append(repo.last_modified)
+        if haikus:
+            versions.append(f"h{storage.content_hash}")
+            modified.append(storage.last_modified)
+
+        params = sorted(request.query_params.multi_items())
+        etag = compute_etag(request.url.path, params, lang, *versions)
+        check_conditional(request, response, etag, max(modified))
+        # Clé de la représentation, reprise par le cache de réponses
+        request.state.etag = etag
+
+    return dependency
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """
+    Vérifie si le client accepte gzip (en-tête Accept-Encoding).
+
+    Args:
+        accept_encoding: Valeur de l'en-tête
+
+    Returns:
+        True si gzip (ou *) est accepté avec un q non nul
+    """
+    for item in (accept_encoding or "").lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        if coding.strip() not in ("gzip", "*"):
+            continue
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                return float(quality[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+class CompressedPayload:
+    """Corps de réponse sérialisé, avec sa version gzip."""
+
+    __slots__ = ("raw", "gzipped")
+
+    def __init__(self, raw: bytes, compresslevel: int = 6):
+        self.raw = raw
+        # mtime=0 : compression déterministe (mêmes octets à chaque build)
+        self.gzipped = gzip.compress(raw, compresslevel=compresslevel, mtime=0)
+
+
+class PayloadCache:
+    """
+    Cache de corps de réponse précompressés, un par nom et par version.
+
+    Seule la dernière version de chaque charge utile est gardée : une
+    nouvelle version des données remplace (et libère) l'ancienne.
+    """
+
+    def __init__(self, compresslevel: int = 6):
+        self.compresslevel = compresslevel
+        self._entries: dict[str, tuple[Hashable, CompressedPayload]] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self, name: str, version: Hashable, build: Callable[[], bytes]
+    ) -> CompressedPayload:
+        """
+        Retourne la charge utile d'une version, en la construisant au besoin.
+
+        Args:
+            name: Nom de la charge utile (ex: "export")
+            version: Version des données dont elle dépend
+            build: Fonction produisant le corps sérialisé
+
+        Returns:
+            La charge utile (brute et gzip)
+        """
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        # Un seul build par version, même avec des requêtes concurrentes
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry[0] != version:
+                entry = (version, CompressedPayload(build(), self.compresslevel))
+                self._entries[name] = entry
+        return entry[1]
+
+    def clear(self):
+        """Vide le cache."""
+        self._entries.clear()
+
+
+def payload_response(
+    request: Request,
+    payload: CompressedPayload,
+    media_type: str = "application/json",
+    headers: Optional[dict[str, str]] = None,
+) -> Response:
+    """
+    Construit la réponse d'une charge utile selon l'Accept-Encoding du client.
+
+    Args:
+        request: Requête entrante
+        payload: Charge utile précompressée
+        media_type: Type de contenu
+        headers: En-têtes supplémentaires
+
+    Returns:
+        Réponse gzip si acceptée, sinon brute
+    """
+    headers = dict(headers or {})
+    vary = headers.get("Vary")
+    headers["Vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+
+    if accepts_gzip(request.headers.get("Accept-Encoding")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(payload.gzipped, media_type=media_type, headers=headers)
+    return Response(payload.raw, media_type=media_type, headers=headers)
+
+
+class ResponseCache:
+    """
+    Cache LRU borné de corps de réponse encodés.
+
+    Les clés incluent la version des données : après un rechargement du
+    corpus ou l'ajout d'un haïku, les anciennes entrées ne sont plus jamais
+    demandées et sortent du cache par éviction LRU.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        """
+        Initialise le cache.
+
+        Args:
+            max_entries: Nombre maximal de corps gardés
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Retourne le corps associé à une clé (et le marque récent)."""
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: str, body: bytes):
+        """Enregistre un corps, en évinçant les plus anciens si besoin."""
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Vide le cache (les compteurs sont conservés)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Compteurs du cache."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+
+response_cache = ResponseCache(max_entries=settings.response_cache.max_entries)
+
+
+def cached_response(request: Request, response: Response) -> Optional[Response]:
+    """
+    Retourne la réponse en cache pour la représentation demandée.
+
+    À appeler dans une route protégée par ``conditional_get`` (qui fournit la
+    clé). Les en-têtes posés sur ``response`` (ETag, ...) sont repris.
+
+    Returns:
+        Réponse prête à l'envoi, ou None si absente du cache
+    """
+    key = getattr(request.state, "etag", None)
+    body = response_cache.get(key) if key else None
+    if body is None:
+        return None
+    return Response(body, media_type="application/json", headers=dict(response.headers))
+
+
+def store_response(request: Request, result: Response) -> Response:
+    """
+    Met en cache le corps d'une réponse réussie, puis la retourne.
+
+    Args:
+        request: Requête (porte la clé posée par ``conditional_get``)
+        result: Réponse produite par la route
+
+    Returns:
+        La même réponse
+    """
+    key = getattr(request.state, "etag", None)
+    if key and result.status_code == 200:
+        response_cache.put(key, bytes(result.body))
+    return result
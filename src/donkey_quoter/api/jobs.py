@@ -0,0 +1,295 @@
+"""
+Jobs de génération de haïkus en lot, exécutés en arrière-plan.
+
+Un job découpe ses citations en lots envoyés avec le prompt bilingue de
+``HaikuManager`` (un appel Claude par lot, FR + EN). Les lots passent par le
+pool des générations de l'API : ils respectent la limite d'appels simultanés
+et patientent quand la file est pleine au lieu d'échouer. La progression est
+écrite sur disque après chaque lot ; un job interrompu par un redémarrage est
+marqué ``interrupted`` et peut être relancé (mode « manquants »).
+"""
+
+import asyncio
+import json
+import os
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from ..config.settings import settings
+from ..core.haiku_manager import HaikuManager
+from ..core.models import Quote
+from ..core.storage import DataStorage
+from ..infrastructure.anthropic_client import CircuitOpenError
+from ..timing import create_background_task
+from .generation import GenerationExecutor, GenerationOverloadedError
+
+# Statuts d'un job et de ses éléments
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+INTERRUPTED = "interrupted"
+DONE = "done"
+
+
+@dataclass
+class HaikuJob:
+    """État persistant d'un job de génération en lot."""
+
+    id: str
+    model: str
+    batch_size: int
+    # {quote_id: {"status": ..., "fr": ..., "en": ..., "error": ...}}
+    items: dict[str, dict]
+    status: str = PENDING
+    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+    # Erreur qui a interrompu le job (statut failed)
+    error: Optional[str] = None
+
+    def count(self, status: str) -> int:
+        """Nombre d'éléments dans un statut."""
+        return sum(1 for item in self.items.values() if item["status"] == status)
+
+    def record_usage(self, usage: Optional[dict[str, int]]):
+        """
+        Ajoute la consommation d'un appel au total du job.
+
+        Args:
+            usage: {"input_tokens": ..., "output_tokens": ...} ou None
+        """
+        if not usage:
+            return
+        self.input_tokens += usage["input_tokens"]
+        self.output_tokens += usage["output_tokens"]
+        self.cost_usd += settings.pricing.cost(
+            self.model, usage["input_tokens"], usage["output_tokens"]
+        )
+
+
+class JobStore:
+    """Jobs en mémoire, chacun écrit dans un fichier JSON."""
+
+    def __init__(self, directory: Path):
+        """
+        Charge les jobs existants.
+
+        Les jobs qui n'étaient pas terminés au dernier arrêt sont marqués
+        ``interrupted``.
+
+        Args:
+            directory: Dossier des fichiers de jobs
+        """
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._jobs: dict[str, HaikuJob] = {}
+        for path in sorted(self.directory.glob("*.json")):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    job = HaikuJob(**json.load(f))
+            except Exception as e:
+                print(f"[API] Job illisible {path.name} : {e}")
+                continue
+            if job.status in (PENDING, RUNNING):
+                job.status = INTERRUPTED
+            self._jobs[job.id] = job
+
+    def create(self, quotes: list[Quote], model: str, batch_size: int) -> HaikuJob:
+        """
+        Crée et enregistre un nouveau job.
+
+        Args:
+            quotes: Citations à traiter
+            model: Modèle Claude utilisé
+            batch_size: Citations par appel
+
+        Returns:
+            Le job, en attente
+        """
+        job = HaikuJob(
+            id=uuid.uuid4().hex[:12],
+            model=model,
+            batch_size=batch_size,
+            items={quote.id: {"status": PENDING} for quote in quotes},
+        )
+        self._jobs[job.id] = job
+        self.save(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[HaikuJob]:
+        """Retourne un job par son ID."""
+        return self._jobs.get(job_id)
+
+    def list(self) -> list[HaikuJob]:
+        """Retourne les jobs, du plus récent au plus ancien."""
+        return sorted(self._jobs.values(), key=lambda j: j.created_at, reverse=True)
+
+    def save(self, job: HaikuJob):
+        """Écrit l'état d'un job (remplacement atomique du fichier)."""
+        path = self.directory / f"{job.id}.json"
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(asdict(job), f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+
+
+class JobRunner:
+    """Exécute les jobs en tâches de fond, avec un nombre borné de lots actifs."""
+
+    def __init__(self, store: JobStore, max_concurrent_batches: int = 2):
+        """
+        Args:
+            store: Stockage des jobs
+            max_concurrent_batches: Lots en cours, tous jobs confondus
+        """
+        self.store = store
+        self.max_concurrent_batches = max_concurrent_batches
+        # Créé au premier job, dans la boucle d'événements : sous Python 3.9,
+        # asyncio.Semaphore() lève RuntimeError dans le thread où FastAPI
+        # exécute la dépendance synchrone qui construit le runner
+        self._batches: Optional[asyncio.Semaphore] = None
+        # Références fortes vers les tâches (sinon elles peuvent être collectées)
+        self._tasks: set[asyncio.Task] = set()
+
+    def submit(
+        self,
+        job: HaikuJob,
+        quotes: list[Quote],
+        manager: HaikuManager,
+        generation: GenerationExecutor,
+    ):
+        """
+        Lance un job en arrière-plan.
+
+        Args:
+            job: Job créé par le store
+            quotes: Citations du job
+            manager: Gestionnaire de haïkus (client Claude et stockage)
+            generation: Pool des générations
+        """
+        if self._batches is None:
+            self._batches = asyncio.Semaphore(self.max_concurrent_batches)
+        # Hors du timer Server-Timing de la requête qui soumet le job
+        task = create_background_task(self._run(job, quotes, manager, generation))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(
+        self,
+        job: HaikuJob,
+        quotes: list[Quote],
+        manager: HaikuManager,
+        generation: GenerationExecutor,
+    ):
+        try:
+            job.status = RUNNING
+            job.started_at = datetime.utcnow().isoformat()
+            await run_in_threadpool(self.store.save, job)
+
+            batches = [
+                quotes[i : i + job.batch_size]
+                for i in range(0, len(quotes), job.batch_size)
+            ]
+            # Laisser finir les autres lots avant de conclure sur une erreur
+            results = await asyncio.gather(
+                *(
+                    self._run_batch(job, batch, manager, generation)
+                    for batch in batches
+                ),
+                return_exceptions=True,
+            )
+            errors = [r for r in results if isinstance(r, Exception)]
+            if errors:
+                raise errors[0]
+            job.status = COMPLETED if job.count(DONE) else FAILED
+        except Exception as e:
+            # Erreur imprévue (disque, SDK) : le job doit tout de même finir
+            job.status = FAILED
+            job.error = f"{type(e).__name__}: {e}"
+            for item in job.items.values():
+                if item["status"] == PENDING:
+                    item.update(status=FAILED, error=job.error)
+
+        job.finished_at = datetime.utcnow().isoformat()
+        try:
+            await run_in_threadpool(self.store.save, job)
+        except Exception as e:
+            print(f"[API] Job {job.id} : état final non enregistré : {e}")
+        print(
+            f"[API] Job {job.id} {job.status} : {job.count(DONE)} ok,"
+            f" {job.count(FAILED)} échecs, ${job.cost_usd:.4f}"
+            + (f" ({job.error})" if job.error else "")
+        )
+
+    async def _run_batch(
+        self,
+        job: HaikuJob,
+        batch: list[Quote],
+        manager: HaikuManager,
+        generation: GenerationExecutor,
+    ):
+        async with self._batches:
+            try:
+                haikus, usage = await self._generate(batch, manager, generation)
+            except Exception as e:
+                for quote in batch:
+                    job.items[quote.id] = {"status": FAILED, "error": str(e)}
+                await run_in_threadpool(self.store.save, job)
+                return
+
+            job.record_usage(usage)
+            for quote in batch:
+                result = haikus.get(quote.id) or {}
+                if not (result.get("fr") and result.get("en")):
+                    job.items[quote.id] = {
+                        "status": FAILED,
+                        "error": "Haïku absent de la réponse",
+                    }
+                    continue
+                job.items[quote.id] = {"status": DONE}
+                for lang in ("fr", "en"):
+                    job.items[quote.id][lang] = await run_in_threadpool(
+                        _store_haiku,
+                        manager.storage,
+                        quote.id,
+                        result[lang],
+                        lang,
+                        job.model,
+                    )
+            await run_in_threadpool(self.store.save, job)
+
+    async def _generate(
+        self, batch: list[Quote], manager: HaikuManager, generation: GenerationExecutor
+    ) -> tuple[dict[str, dict[str, str]], Optional[dict[str, int]]]:
+        # File pleine ou API Claude en panne (circuit ouvert) : patienter
+        # plutôt que d'échouer (les requêtes interactives restent prioritaires)
+        while True:
+            try:
+                return await generation.run(manager.generate_batch_with_usage, batch)
+            except (GenerationOverloadedError, CircuitOpenError) as e:
+                await asyncio.sleep(e.retry_after)
+
+
+def _store_haiku(
+    storage: DataStorage, quote_id: str, haiku: str, language: str, model: str
+) -> str:
+    """
+    Enregistre un haïku du lot et retourne le texte à rapporter.
+
+    Un haïku refusé comme doublon (ou quasi-doublon) est remplacé par
+    celui déjà stocké, pour que le job ne rapporte que des haïkus
+    effectivement disponibles.
+    """
+    if storage.add_haiku(quote_id, haiku, language, model):
+        return haiku
+    existing = storage.get_duplicate_haiku(quote_id, haiku, language)
+    return existing["text"] if existing else haiku
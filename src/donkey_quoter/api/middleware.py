@@ -0,0 +1,45 @@
+"""
+Middlewares ASGI de l'API.
+"""
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..timing import start_timer, stop_timer
+
+
+class ServerTimingMiddleware:
+    """
+    Chronomètre chaque requête et expose ses étapes dans ``Server-Timing``.
+
+    Middleware ASGI pur (sans ``BaseHTTPMiddleware``) : il pose un timer dans
+    le contexte de la requête, puis ajoute l'en-tête au début de la réponse.
+    Les étapes enregistrées après l'envoi des en-têtes (flux) sont ignorées.
+    """
+
+    def __init__(self, app: ASGIApp, log_requests: bool = False):
+        self.app = app
+        self.log_requests = log_requests
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timer, token = start_timer()
+
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start":
+                header = timer.header()
+                MutableHeaders(scope=message).append("Server-Timing", header)
+                if self.log_requests:
+                    print(
+                        f"[API] {scope['method']} {scope['path']}"
+                        f" {message['status']} | {header}"
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            stop_timer(token)
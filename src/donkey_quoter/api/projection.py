@@ -0,0 +1,146 @@
+"""
+Projection des citations : sélection de champs (``?fields=``) et langue unique.
+
+Chaque champ de chaque citation est encodé une fois en fragment JSON
+(``"text":{...}``) pour chaque forme (bilingue ou à plat dans une langue).
+Une réponse projetée n'est ensuite qu'une concaténation de fragments, sans
+filtrage de dictionnaires ni sérialisation à chaque requête.
+"""
+
+from collections.abc import Iterable
+from typing import Optional, Union
+
+from fastapi import HTTPException, Query, Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+from ..core.models import Quote, QuoteView
+
+# Champs projetables, dans l'ordre de sortie
+QUOTE_FIELDS = ("id", "text", "author", "category", "type")
+
+FIELDS_QUERY = Query(
+    None, description="Champs à renvoyer, séparés par des virgules (ex: id,text)"
+)
+ONLY_LANG_QUERY = Query(
+    False, description="Ne renvoyer que la langue demandée (vue à plat)"
+)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[tuple[str, ...]]:
+    """
+    Valide le paramètre ``fields``.
+
+    Args:
+        fields: Liste de champs séparés par des virgules (ou None)
+
+    Returns:
+        Champs demandés dans l'ordre canonique, ou None pour tous
+
+    Raises:
+        HTTPException: 400 si un champ est inconnu ou si la liste est vide
+    """
+    if fields is None:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested.difference(QUOTE_FIELDS)
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Champs inconnus : {', '.join(sorted(unknown)) or '(vide)'}",
+        )
+    return tuple(field for field in QUOTE_FIELDS if field in requested)
+
+
+def _encode_fields(item: Union[Quote, QuoteView]) -> dict[str, bytes]:
+    return {
+        field: to_json(field) + b":" + to_json(getattr(item, field))
+        for field in QUOTE_FIELDS
+    }
+
+
+class QuoteFragments:
+    """Fragments JSON précalculés par citation et par champ, pour une forme."""
+
+    def __init__(self, items: Iterable[Union[Quote, QuoteView]]):
+        """
+        Encode chaque champ de chaque citation.
+
+        Args:
+            items: Citations bilingues ou vues à plat d'une langue
+        """
+        self._fragments = {item.id: _encode_fields(item) for item in items}
+
+    def _object(self, item: Union[Quote, QuoteView], fields: tuple[str, ...]) -> bytes:
+        fragments = self._fragments.get(item.id)
+        if fragments is None:
+            # Citation hors corpus (ex: créée à la volée)
+            fragments = _encode_fields(item)
+        return b"{" + b",".join(fragments[field] for field in fields) + b"}"
+
+    def encode(
+        self, items: Iterable[Union[Quote, QuoteView]], fields: tuple[str, ...]
+    ) -> bytes:
+        """
+        Encode des citations projetées en tableau JSON.
+
+        Args:
+            items: Citations de la forme de ces fragments
+            fields: Champs à garder
+
+        Returns:
+            Tableau JSON encodé
+        """
+        return b"[" + b",".join(self._object(item, fields) for item in items) + b"]"
+
+    def encode_one(
+        self, item: Union[Quote, QuoteView], fields: tuple[str, ...]
+    ) -> bytes:
+        """Encode une seule citation projetée en objet JSON."""
+        return self._object(item, fields)
+
+
+def projected_body(data: bytes, model: type[BaseModel], **fields) -> bytes:
+    """
+    Construit le corps d'une réponse dont ``data`` est déjà encodé.
+
+    Args:
+        data: Valeur JSON encodée du champ ``data``
+        model: Modèle de réponse (pour les valeurs par défaut des autres champs)
+        **fields: Autres champs de la réponse
+
+    Returns:
+        Objet JSON encodé
+    """
+    rest = {
+        name: fields.get(name, info.default)
+        for name, info in model.model_fields.items()
+        if name != "data"
+    }
+    return b'{"data":' + data + b"," + to_json(rest)[1:]
+
+
+def projected_response(
+    data: bytes,
+    model: type[BaseModel],
+    response: Optional[Response] = None,
+    **fields,
+) -> Response:
+    """
+    Construit une réponse JSON dont ``data`` est déjà encodé.
+
+    Args:
+        data: Valeur JSON encodée du champ ``data``
+        model: Modèle de réponse
+        response: Réponse injectée par FastAPI, dont on reprend les en-têtes
+        **fields: Autres champs de la réponse
+
+    Returns:
+        Réponse prête à l'envoi
+    """
+    headers = dict(response.headers) if response is not None else None
+    return Response(
+        projected_body(data, model, **fields),
+        media_type="application/json",
+        headers=headers,
+    )
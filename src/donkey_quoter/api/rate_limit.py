@@ -0,0 +1,307 @@
+"""
+Stockage de l'état du rate limiter (une heure théorique d'arrivée par clé).
+
+Le ``RateLimiter`` (GCRA) ne garde qu'un nombre par clé API : la date à
+laquelle son quota sera de nouveau plein (TAT). Ce module fournit où le
+garder :
+
+- ``MemoryRateLimitBackend`` : en mémoire, propre au processus (tests,
+  worker unique). Protégé par un verrou, une même instance peut être
+  partagée entre threads pour simuler plusieurs workers.
+- ``SQLiteRateLimitBackend`` : base SQLite locale partagée par tous les
+  workers d'une machine ; chaque mise à jour est une seule requête
+  atomique (``UPSERT ... RETURNING``, SQLite >= 3.35, sinon une
+  transaction ``BEGIN IMMEDIATE``), et les quotas survivent aux
+  redémarrages.
+"""
+
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+MEMORY = "memory"
+SQLITE = "sqlite"
+
+# ``INSERT ... ON CONFLICT ... RETURNING`` n'existe que depuis SQLite 3.35
+HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+class RateLimitBackend:
+    """Interface des stockages de TAT (timestamps en secondes)."""
+
+    def get(self, api_key: str) -> Optional[float]:
+        """Retourne la TAT d'une clé, ou None si elle n'est pas suivie."""
+        raise NotImplementedError
+
+    def add(self, api_key: str, now: float, interval: float) -> float:
+        """
+        Enregistre une génération, atomiquement : TAT = max(TAT, now) + interval.
+
+        Les clés dont la TAT est passée (quota plein) peuvent être oubliées
+        au passage.
+
+        Args:
+            api_key: Clé API
+            now: Instant courant (timestamp)
+            interval: Secondes ajoutées par génération
+
+        Returns:
+            La nouvelle TAT
+        """
+        raise NotImplementedError
+
+    def reserve(self, api_key: str, now: float, interval: float, window: float) -> bool:
+        """
+        Vérifie le quota et réserve une génération, en une opération atomique.
+
+        La TAT n'avance que si le résultat reste dans la fenêtre :
+        max(TAT, now) + interval <= now + window.
+
+        Args:
+            api_key: Clé API
+            now: Instant courant (timestamp)
+            interval: Secondes ajoutées par génération
+            window: Durée de la fenêtre (secondes)
+
+        Returns:
+            True si la génération est réservée
+        """
+        raise NotImplementedError
+
+    def refund(self, api_key: str, interval: float):
+        """Rend une génération réservée (TAT reculée de ``interval``)."""
+        raise NotImplementedError
+
+    def delete(self, api_key: str):
+        """Oublie une clé."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        """Nombre de clés suivies."""
+        raise NotImplementedError
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """TAT en mémoire, de la clé la moins récemment utilisée à la plus récente."""
+
+    # Clés expirées retirées au plus à chaque enregistrement
+    EVICT_BATCH = 8
+
+    def __init__(self):
+        self._tat: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, api_key: str) -> Optional[float]:
+        return self._tat.get(api_key)
+
+    def add(self, api_key: str, now: float, interval: float) -> float:
+        with self._lock:
+            tat = max(self._tat.pop(api_key, now), now) + interval
+            self._tat[api_key] = tat
+            self._evict(now)
+            return tat
+
+    def reserve(self, api_key: str, now: float, interval: float, window: float) -> bool:
+        with self._lock:
+            tat = max(self._tat.get(api_key, now), now) + interval
+            if tat > now + window:
+                return False
+            self._tat.pop(api_key, None)
+            self._tat[api_key] = tat
+            self._evict(now)
+            return True
+
+    def refund(self, api_key: str, interval: float):
+        with self._lock:
+            if api_key in self._tat:
+                self._tat[api_key] -= interval
+
+    def delete(self, api_key: str):
+        with self._lock:
+            self._tat.pop(api_key, None)
+
+    def _evict(self, now: float):
+        """Oublie les clés les moins récemment utilisées dont le quota est plein."""
+        for _ in range(self.EVICT_BATCH):
+            if not self._tat:
+                return
+            api_key = next(iter(self._tat))
+            if self._tat[api_key] > now:
+                return
+            del self._tat[api_key]
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """
+    TAT dans une base SQLite locale, partagée entre processus.
+
+    Mode WAL sans fsync à chaque écriture (``synchronous=NORMAL``) : une mise
+    à jour coûte quelques dizaines de microsecondes. Une connexion par thread.
+
+    Avec une bibliothèque SQLite antérieure à 3.35 (sans ``RETURNING``), les
+    mises à jour lisent puis écrivent la TAT dans une transaction
+    ``BEGIN IMMEDIATE``, qui prend le verrou d'écriture dès le début.
+    """
+
+    # Purge des clés expirées toutes les N écritures (par processus)
+    EVICT_EVERY = 1000
+
+    def __init__(
+        self, path: Path, busy_timeout: float = 5.0, returning: bool = HAS_RETURNING
+    ):
+        """
+        Args:
+            path: Fichier de la base (créé au besoin)
+            busy_timeout: Attente maximale du verrou d'écriture (secondes)
+            returning: Utiliser ``UPSERT ... RETURNING`` (SQLite >= 3.35)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.busy_timeout = busy_timeout
+        self.returning = returning
+        self._local = threading.local()
+        self._writes = 0
+
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            " api_key TEXT PRIMARY KEY, tat REAL NOT NULL) WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS rate_limits_tat ON rate_limits (tat)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit : chaque requête est sa propre transaction
+            conn = sqlite3.connect(
+                self.path, timeout=self.busy_timeout, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, api_key: str) -> Optional[float]:
+        return self._select(self._connection(), api_key)
+
+    def add(self, api_key: str, now: float, interval: float) -> float:
+        conn = self._connection()
+        if self.returning:
+            (tat,) = conn.execute(
+                "INSERT INTO rate_limits (api_key, tat) VALUES (?, ?)"
+                " ON CONFLICT (api_key) DO UPDATE SET tat = max(tat, ?) + ?"
+                " RETURNING tat",
+                (api_key, now + interval, now, interval),
+            ).fetchone()
+        else:
+            with self._immediate(conn):
+                tat = max(self._select(conn, api_key) or now, now) + interval
+                self._store(conn, api_key, tat)
+        self._written(conn, now)
+        return tat
+
+    def reserve(self, api_key: str, now: float, interval: float, window: float) -> bool:
+        conn = self._connection()
+        if self.returning:
+            # Sans ligne retournée : le WHERE de la mise à jour a échoué
+            # (quota épuisé)
+            row = conn.execute(
+                "INSERT INTO rate_limits (api_key, tat) VALUES (:key, :now + :interval)"
+                " ON CONFLICT (api_key) DO UPDATE"
+                " SET tat = max(tat, :now) + :interval"
+                " WHERE max(tat, :now) + :interval <= :now + :window"
+                " RETURNING tat",
+                {"key": api_key, "now": now, "interval": interval, "window": window},
+            ).fetchone()
+            reserved = row is not None
+        else:
+            with self._immediate(conn):
+                tat = max(self._select(conn, api_key) or now, now) + interval
+                reserved = tat <= now + window
+                if reserved:
+                    self._store(conn, api_key, tat)
+        if reserved:
+            self._written(conn, now)
+        return reserved
+
+    @staticmethod
+    @contextmanager
+    def _immediate(conn: sqlite3.Connection) -> Iterator[None]:
+        """Transaction prenant le verrou d'écriture dès son ouverture."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _select(conn: sqlite3.Connection, api_key: str) -> Optional[float]:
+        row = conn.execute(
+            "SELECT tat FROM rate_limits WHERE api_key = ?", (api_key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _store(conn: sqlite3.Connection, api_key: str, tat: float):
+        conn.execute(
+            "INSERT OR REPLACE INTO rate_limits (api_key, tat) VALUES (?, ?)",
+            (api_key, tat),
+        )
+
+    def refund(self, api_key: str, interval: float):
+        self._connection().execute(
+            "UPDATE rate_limits SET tat = tat - ? WHERE api_key = ?",
+            (interval, api_key),
+        )
+
+    def _written(self, conn: sqlite3.Connection, now: float):
+        """Compte une écriture et purge périodiquement les clés expirées."""
+        self._writes += 1
+        if self._writes % self.EVICT_EVERY == 0:
+            conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,))
+
+    def delete(self, api_key: str):
+        self._connection().execute(
+            "DELETE FROM rate_limits WHERE api_key = ?", (api_key,)
+        )
+
+    def __len__(self) -> int:
+        (count,) = (
+            self._connection().execute("SELECT COUNT(*) FROM rate_limits").fetchone()
+        )
+        return count
+
+
+def create_rate_limit_backend(backend: str, path: Path) -> RateLimitBackend:
+    """
+    Crée le stockage du rate limiter.
+
+    Args:
+        backend: "memory" (propre au processus) ou "sqlite" (partagé)
+        path: Fichier de la base SQLite
+
+    Returns:
+        Le stockage
+
+    Raises:
+        ValueError: Si le type de stockage est inconnu
+    """
+    if backend == MEMORY:
+        return MemoryRateLimitBackend()
+    if backend == SQLITE:
+        if not HAS_RETURNING:
+            print(
+                f"[API] SQLite {sqlite3.sqlite_version} sans RETURNING :"
+                " quotas mis à jour par transaction BEGIN IMMEDIATE"
+            )
+        return SQLiteRateLimitBackend(path)
+    raise ValueError(f"Stockage de rate limit inconnu : {backend}")
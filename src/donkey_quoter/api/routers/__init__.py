@@ -2,8 +2,16 @@
 Routers API FastAPI.
 """
 
+from .corpus import router as corpus_router
 from .export import router as export_router
 from .haikus import router as haikus_router
+from .jobs import router as jobs_router
 from .quotes import router as quotes_router
 
-__all__ = ["quotes_router", "haikus_router", "export_router"]
+__all__ = [
+    "quotes_router",
+    "haikus_router",
+    "jobs_router",
+    "export_router",
+    "corpus_router",
+]
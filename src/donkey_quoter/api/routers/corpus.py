@@ -0,0 +1,90 @@
+"""
+Router pour les endpoints /corpus (corpus versionné, cacheable par les CDN).
+"""
+
+from fastapi import APIRouter, HTTPException, Path, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+
+from ...config.settings import settings
+from ..auth import OptionalAPIKey
+from ..dependencies import QuoteRepo
+from ..http_cache import PayloadCache, etag_matches, payload_response
+from ..schemas import CorpusResponse, CorpusVersionResponse, ErrorResponse
+from ..serialization import dump_trusted
+
+router = APIRouter(prefix="/corpus", tags=["corpus"])
+
+# Corps du corpus sérialisé et compressé une fois par version
+_corpus_cache = PayloadCache(compresslevel=settings.compression.level)
+
+
+@router.get(
+    "/version",
+    response_model=CorpusVersionResponse,
+    summary="Obtenir la version courante du corpus",
+)
+async def get_corpus_version(
+    response: Response,
+    repo: QuoteRepo,
+    api_key: OptionalAPIKey = None,
+):
+    """
+    Retourne l'empreinte du corpus courant et son URL immuable.
+
+    Réponse à TTL court : les clients la consultent pour savoir s'ils doivent
+    télécharger une nouvelle version.
+    """
+    version = repo.content_hash
+    response.headers["Cache-Control"] = (
+        f"public, max-age={settings.corpus.pointer_max_age}"
+    )
+    return CorpusVersionResponse(
+        version=version,
+        url=f"{router.prefix}/{version}.json",
+        total_quotes=len(repo.quotes),
+    )
+
+
+@router.get(
+    "/{version}.json",
+    response_model=CorpusResponse,
+    summary="Télécharger une version du corpus",
+    responses={404: {"model": ErrorResponse}},
+)
+async def get_corpus(
+    request: Request,
+    repo: QuoteRepo,
+    version: str = Path(..., description="Empreinte du corpus"),
+    api_key: OptionalAPIKey = None,
+):
+    """
+    Retourne le corpus complet d'une version.
+
+    Le contenu d'une URL ne change jamais (l'URL dépend du contenu) : la
+    réponse est marquée `immutable` et peut être gardée par les navigateurs
+    et les CDN. Seule la version courante est servie.
+    """
+    if version != repo.content_hash:
+        raise HTTPException(
+            status_code=404, detail=f"Version de corpus {version} non disponible"
+        )
+
+    headers = {
+        "Cache-Control": (
+            f"public, max-age={settings.corpus.immutable_max_age}, immutable"
+        ),
+        "ETag": f'"{version}"',
+    }
+    if etag_matches(request.headers.get("If-None-Match"), headers["ETag"]):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    def build() -> bytes:
+        return dump_trusted(
+            CorpusResponse,
+            version=version,
+            quotes=repo.quotes,
+            total_quotes=len(repo.quotes),
+        )
+
+    payload = await run_in_threadpool(_corpus_cache.get, "corpus", version, build)
+    return payload_response(request, payload, headers=headers)
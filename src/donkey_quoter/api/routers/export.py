@@ -3,57 +3,157 @@ Router pour les endpoints /export.
 """
 
 from datetime import datetime
+from typing import Optional
 
-from fastapi import APIRouter
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
 
+from ...config.settings import settings
 from ..auth import OptionalAPIKey
-from ..dependencies import QuoteRepo, Storage
+from ..dependencies import Language, QuoteRepo, Storage
+from ..http_cache import PayloadCache, conditional_get, payload_response
+from ..projection import (
+    FIELDS_QUERY,
+    ONLY_LANG_QUERY,
+    QUOTE_FIELDS,
+    parse_fields,
+)
 from ..schemas import ExportResponse
+from ..serialization import dump_trusted
+from ..streaming import ExportSnapshot, iter_export, iter_rows_export
 
 router = APIRouter(prefix="/export", tags=["export"])
 
+# Export sérialisé et compressé une fois par version des données
+_export_cache = PayloadCache(compresslevel=settings.compression.level)
+
+
+async def _get_export_payload(
+    repo: QuoteRepo,
+    storage: Storage,
+    fields: Optional[tuple[str, ...]] = None,
+    language: Optional[str] = None,
+):
+    """
+    Retourne l'export précompressé de la version courante des données.
+
+    Args:
+        repo: Repository des citations
+        storage: Stockage des haïkus
+        fields: Champs des citations à garder (None pour tous)
+        language: Langue unique (vues à plat et haïkus de cette langue)
+    """
+    version = (repo.version, storage.version)
+
+    def build() -> bytes:
+        # Instantané pris sous le verrou du stockage (ajouts concurrents)
+        haikus = storage.snapshot()
+        if fields is None and language is None:
+            # Données déjà validées au chargement : pas de seconde validation
+            return dump_trusted(
+                ExportResponse,
+                quotes=repo.quotes,
+                haikus=haikus,
+                export_date=datetime.utcnow(),
+                total_quotes=len(repo.quotes),
+            )
+
+        # Projection : citations assemblées à partir des fragments précalculés
+        items = repo.quotes if language is None else repo.views(language)
+        if language is not None:
+            haikus = {
+                quote_id: {language: languages.get(language, [])}
+                for quote_id, languages in haikus.items()
+            }
+        quotes = repo.fragments(language).encode(items, fields or QUOTE_FIELDS)
+        rest = {
+            "haikus": haikus,
+            "export_date": datetime.utcnow(),
+            "total_quotes": len(items),
+        }
+        return b'{"quotes":' + quotes + b"," + to_json(rest)[1:]
+
+    # Une entrée de cache par projection demandée
+    name = f"export:{','.join(fields or ())}:{language or ''}"
+    # Sérialisation + compression hors de la boucle d'événements
+    return await run_in_threadpool(_export_cache.get, name, version, build)
+
 
 @router.get(
     "",
     response_model=ExportResponse,
     summary="Exporter toutes les données",
+    dependencies=[Depends(conditional_get(quotes=True, haikus=True))],
 )
 async def export_all(
+    request: Request,
+    response: Response,
     repo: QuoteRepo,
     storage: Storage,
+    lang: Language,
+    format: str = Query(
+        "json",
+        pattern="^(json|ndjson|csv)$",
+        description="json (document complet) ou une ligne par variante de haïku",
+    ),
+    only_lang: bool = ONLY_LANG_QUERY,
+    fields: Optional[str] = FIELDS_QUERY,
     api_key: OptionalAPIKey = None,
 ):
-    """Exporte toutes les citations et haïkus."""
-    return ExportResponse(
-        quotes=repo.quotes,
-        haikus=storage.haikus_data,
-        export_date=datetime.utcnow(),
-        total_quotes=len(repo.quotes),
-    )
+    """
+    Exporte toutes les citations et haïkus.
+
+    - `json` : document complet, servi précompressé depuis le cache
+      (`fields` et `only_lang` projettent les citations)
+    - `csv` / `ndjson` : une ligne par (citation, langue, variante de haïku),
+      avec le modèle et la date de génération, produite en flux
+      (`only_lang` ne garde que les lignes de la langue demandée)
+    """
+    selected = parse_fields(fields)
+    language = lang if only_lang else None
+
+    if format != "json":
+        snapshot = ExportSnapshot(repo.quotes, storage)
+        media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+        languages = (language,) if language else ("fr", "en")
+        return StreamingResponse(
+            iter_rows_export(snapshot, format, languages),
+            media_type=media_type,
+            headers=dict(response.headers),
+        )
+
+    payload = await _get_export_payload(repo, storage, selected, language)
+    # Reprendre les validateurs posés par conditional_get
+    return payload_response(request, payload, headers=dict(response.headers))
 
 
 @router.get(
     "/download",
-    summary="Télécharger l'export en fichier JSON",
+    summary="Télécharger l'export en fichier JSON ou NDJSON",
 )
 async def download_export(
     repo: QuoteRepo,
     storage: Storage,
+    format: str = Query(
+        "json", pattern="^(json|ndjson)$", description="Format du fichier"
+    ),
     api_key: OptionalAPIKey = None,
 ):
-    """Télécharge toutes les données sous forme de fichier JSON."""
-    data = {
-        "quotes": [q.model_dump() for q in repo.quotes],
-        "haikus": storage.haikus_data,
-        "export_date": datetime.utcnow().isoformat(),
-        "total_quotes": len(repo.quotes),
-    }
-
-    filename = f"donkey-quoter-export-{datetime.now().strftime('%Y%m%d')}.json"
-
-    return JSONResponse(
-        content=data,
-        media_type="application/json",
+    """
+    Télécharge toutes les données sous forme de fichier.
+
+    Le fichier est envoyé en flux à partir d'un instantané des données : la
+    mémoire reste stable et les premiers octets partent immédiatement.
+    """
+    snapshot = ExportSnapshot(repo.quotes, storage)
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "application/json"
+    filename = f"donkey-quoter-export-{datetime.now().strftime('%Y%m%d')}.{format}"
+
+    return StreamingResponse(
+        iter_export(snapshot, format),
+        media_type=media_type,
         headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
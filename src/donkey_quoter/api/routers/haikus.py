@@ -2,23 +2,61 @@
 Router pour les endpoints /haikus.
 """
 
+import asyncio
+import math
 import os
+import time
+from collections.abc import AsyncIterator
+from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Path
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Path,
+    Request,
+    Response,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
 
+from ...config.settings import settings
+from ...core.haiku_manager import HaikuManager
+from ...core.models import QuoteView
+from ...core.services import DonkeyQuoterService
+from ...core.storage import DataStorage
+from ...timing import timed
 from ..auth import (
     OptionalAPIKey,
-    RateLimitedAPIKey,
+    ReservedGeneration,
     get_rate_limiter,
 )
-from ..dependencies import Language, QuoteRepo, Service, Storage
+from ..dependencies import (
+    Deadline,
+    Generation,
+    Language,
+    Pool,
+    QuoteRepo,
+    QuoteRepository,
+    Service,
+    Storage,
+)
+from ..generation import GenerationExecutor, GenerationOverloadedError
+from ..haiku_pool import HaikuPool
+from ..http_cache import cached_response, conditional_get, store_response
 from ..schemas import (
     ErrorResponse,
+    HaikuBatchItem,
+    HaikuBatchRequest,
+    HaikuBatchResponse,
     HaikuExistsResponse,
     HaikuRequest,
     HaikuResponse,
     RateLimitInfo,
 )
+from ..serialization import trusted_response
 
 router = APIRouter(prefix="/haikus", tags=["haikus"])
 
@@ -30,6 +68,7 @@ router = APIRouter(prefix="/haikus", tags=["haikus"])
     responses={
         404: {"model": ErrorResponse},
         429: {"model": ErrorResponse, "description": "Rate limit dépassé"},
+        503: {"model": ErrorResponse, "description": "Générations saturées"},
     },
 )
 async def generate_haiku(
@@ -37,8 +76,12 @@ async def generate_haiku(
     repo: QuoteRepo,
     service: Service,
     storage: Storage,
+    response: Response,
     lang: Language,
-    api_key: RateLimitedAPIKey,
+    generation: Generation,
+    pool: Pool,
+    deadline: Deadline,
+    quota: ReservedGeneration,
 ):
     """
     Génère un haïku pour une citation donnée.
@@ -47,34 +90,340 @@ async def generate_haiku(
     - Si `force_new=True`, génère un nouveau haïku via l'API Claude (rate limited)
 
     Requiert une API key valide et est soumis au rate limiting (5/24h par clé).
+
+    Les requêtes identiques simultanées (même citation, langue et mode) partagent
+    une seule génération ; leur réponse porte `coalesced=true`.
+
+    Si la file des générations est pleine, la requête est refusée (503 avec
+    `Retry-After`) ou, avec `on_overload="fallback"`, reçoit un haïku stocké
+    ou par défaut.
+
+    Pour les citations souvent demandées, un nouveau haïku peut être servi
+    immédiatement depuis une réserve pré-générée (`pooled=true`) ; il compte
+    dans le rate limit comme une génération.
+
+    La génération est bornée par une échéance (en-tête `X-Request-Timeout` en
+    secondes, ou défaut serveur) : passé ce délai, un haïku stocké ou par
+    défaut est renvoyé aussitôt, avec l'en-tête `X-Deadline-Exceeded`.
     """
-    # Trouver la citation
-    quote = service.find_quote_by_id(repo.quotes, request.quote_id)
+    # Trouver la citation (vue à plat dans la langue demandée)
+    with timed("quote_lookup"):
+        quote = repo.get_view(request.quote_id, lang)
     if not quote:
         raise HTTPException(
             status_code=404, detail=f"Citation {request.quote_id} non trouvée"
         )
 
-    # Si pas de force_new, chercher un haïku existant d'abord
+    mode = "new" if request.force_new else "reuse"
+
+    async def produce() -> HaikuResponse:
+        return await _produce_haiku(
+            request.quote_id,
+            quote,
+            lang,
+            request.force_new,
+            repo,
+            service,
+            storage,
+            generation,
+            pool,
+            deadline,
+        )
+
+    async def coalesced() -> tuple[HaikuResponse, bool]:
+        # Requêtes identiques simultanées : une seule génération partagée
+        if settings.generation.coalesce == "share":
+            return await generation.flights.do((request.quote_id, lang, mode), produce)
+        return await produce(), False
+
+    try:
+        result, joined = await asyncio.wait_for(
+            coalesced(), timeout=max(0.0, deadline - time.monotonic())
+        )
+    except asyncio.TimeoutError:
+        # Échéance dépassée (file d'attente, retries) : réponse immédiate. Une
+        # génération partagée continue pour les autres requêtes.
+        response.headers["X-Deadline-Exceeded"] = "true"
+        return _stored_or_fallback(request.quote_id, lang, service, storage)
+    except GenerationOverloadedError as e:
+        if request.on_overload == "reject":
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Trop de générations en cours. Réessayez plus tard.",
+                headers={"Retry-After": str(e.retry_after)},
+            ) from None
+        return _stored_or_fallback(request.quote_id, lang, service, storage)
+
+    # Enregistrer la génération pour le rate limit
+    if result.was_generated and (not joined or settings.generation.charge_joined):
+        quota.charge()
+
+    if joined:
+        return result.model_copy(update={"coalesced": True})
+    return result
+
+
+@router.post(
+    "/generate/stream",
+    summary="Générer un haïku en flux (Server-Sent Events)",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"text/event-stream": {}},
+            "description": "Événements start, token*, error?, done",
+        },
+        404: {"model": ErrorResponse},
+        429: {"model": ErrorResponse, "description": "Rate limit dépassé"},
+        503: {"model": ErrorResponse, "description": "Générations saturées"},
+    },
+)
+async def generate_haiku_stream(
+    request: HaikuRequest,
+    repo: QuoteRepo,
+    service: Service,
+    storage: Storage,
+    lang: Language,
+    generation: Generation,
+    pool: Pool,
+    deadline: Deadline,
+    quota: ReservedGeneration,
+):
+    """
+    Génère un haïku et transmet le texte au fil de la génération (SSE).
+
+    Événements émis :
+    - `start` : citation et langue
+    - `token` : fragment de texte (`{"text": ...}`), dès sa réception de Claude
+    - `error` : échec de la génération (suivi d'un `done` avec le haïku par défaut)
+    - `done` : haïku validé et enregistré (`haiku`), `stored`, et `timings`
+      (`ttft_ms` : délai avant le premier fragment, `total_ms`). Un haïku
+      refusé comme doublon est remplacé par le haïku déjà stocké
+      (`stored=false`, non décompté du rate limit)
+
+    Mêmes règles que `/haikus/generate` (haïku stocké si `force_new=False`,
+    rate limit, file des générations, échéance), sans fusion des requêtes
+    identiques.
+    """
+    with timed("quote_lookup"):
+        quote = repo.get_view(request.quote_id, lang)
+    if not quote:
+        raise HTTPException(
+            status_code=404, detail=f"Citation {request.quote_id} non trouvée"
+        )
+
+    start = {"quote_id": request.quote_id, "language": lang}
+
+    # Haïku stocké, ou pas de client : réponse immédiate en un seul événement
     if not request.force_new:
         stored = storage.get_haiku_with_metadata(request.quote_id, lang)
         if stored:
-            return HaikuResponse(
+            result = _stored_or_fallback(request.quote_id, lang, service, storage)
+            return _event_stream(_single_result(start, result))
+    if not service.api_client:
+        result = _stored_or_fallback(request.quote_id, lang, service, storage)
+        return _event_stream(_single_result(start, result))
+
+    # Variante pré-générée en réserve : un seul événement, sans appel Claude
+    pooled = await _take_pooled(
+        request.quote_id, lang, repo, service, storage, generation, pool
+    )
+    if pooled is not None:
+        quota.charge()
+        return _event_stream(_single_result(start, pooled))
+
+    # Refuser avant d'envoyer le statut 200 du flux
+    try:
+        generation.check_capacity()
+    except GenerationOverloadedError as e:
+        if request.on_overload == "reject":
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Trop de générations en cours. Réessayez plus tard.",
+                headers={"Retry-After": str(e.retry_after)},
+            ) from None
+        result = _stored_or_fallback(request.quote_id, lang, service, storage)
+        return _event_stream(_single_result(start, result))
+
+    async def events() -> AsyncIterator[bytes]:
+        try:
+            async for event in generate_events():
+                yield event
+        finally:
+            # Flux terminé ou interrompu : rendre la réservation non décomptée
+            await run_in_threadpool(quota.release)
+
+    async def generate_events() -> AsyncIterator[bytes]:
+        started = time.perf_counter()
+        first_token = None
+        chunks = []
+        yield _sse("start", start)
+
+        try:
+            async for chunk in generation.stream(
+                service.stream_via_api, quote.text, quote.author, lang, deadline
+            ):
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+                chunks.append(chunk)
+                yield _sse("token", {"text": chunk})
+            haiku_text = service.format_haiku("".join(chunks))
+            if not haiku_text:
+                raise ValueError("Réponse vide")
+        except Exception as e:
+            detail = "Génération impossible, haïku par défaut"
+            error = {"detail": detail}
+            if isinstance(e, GenerationOverloadedError):
+                error["retry_after"] = e.retry_after
+            yield _sse("error", error)
+            fallback = HaikuResponse(
                 quote_id=request.quote_id,
-                haiku_text=stored["text"],
+                haiku_text=service.get_fallback_haiku(lang),
                 language=lang,
-                model=stored.get("model", "unknown"),
-                was_generated=False,
-                generated_at=stored.get("generated_at"),
+                model="fallback",
             )
+            yield _sse("done", {"haiku": fallback, "stored": False})
+            return
 
-    # Vérifier si l'API client est disponible
-    if not service.api_client:
-        # Fallback vers un haïku existant ou par défaut
-        stored = storage.get_haiku_with_metadata(request.quote_id, lang)
+        model = os.getenv("CLAUDE_MODEL", "claude-3-haiku-20240307")
+        result = await _store_generated(
+            request.quote_id, haiku_text, lang, model, storage
+        )
+        stored = result.was_generated
+        if stored:
+            quota.charge()
+
+        timings = {
+            "ttft_ms": round((first_token or 0.0) * 1000, 1),
+            "total_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        yield _sse("done", {"haiku": result, "stored": stored, "timings": timings})
+
+    # La réservation est rendue ou décomptée à la fin du flux, pas de la requête
+    quota.hold()
+    return _event_stream(events())
+
+
+def _sse(event: str, data: dict) -> bytes:
+    """Formate un événement Server-Sent Events (données en JSON)."""
+    return b"event: " + event.encode() + b"\ndata: " + to_json(data) + b"\n\n"
+
+
+async def _single_result(start: dict, result: HaikuResponse) -> AsyncIterator[bytes]:
+    yield _sse("start", start)
+    yield _sse("done", {"haiku": result, "stored": result.model != "fallback"})
+
+
+def _event_stream(events: AsyncIterator[bytes]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        # Pas de mise en tampon par un proxy (nginx) ni par le navigateur
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _stored_or_fallback(
+    quote_id: str, lang: str, service: DonkeyQuoterService, storage: DataStorage
+) -> HaikuResponse:
+    """Retourne un haïku stocké pour la citation, ou le haïku par défaut."""
+    stored = storage.get_haiku_with_metadata(quote_id, lang)
+    if stored:
+        return HaikuResponse(
+            quote_id=quote_id,
+            haiku_text=stored["text"],
+            language=lang,
+            model=stored.get("model", "unknown"),
+            was_generated=False,
+            generated_at=stored.get("generated_at"),
+        )
+
+    fallback = service.get_fallback_haiku(lang)
+    return HaikuResponse(
+        quote_id=quote_id,
+        haiku_text=fallback,
+        language=lang,
+        model="fallback",
+        was_generated=False,
+    )
+
+
+async def _take_pooled(
+    quote_id: str,
+    lang: str,
+    repo: QuoteRepository,
+    service: DonkeyQuoterService,
+    storage: DataStorage,
+    generation: GenerationExecutor,
+    pool: HaikuPool,
+) -> Optional[HaikuResponse]:
+    """
+    Sert un haïku de la réserve pré-générée, s'il y en a un.
+
+    Démarre le remplissage de la réserve au premier appel. La variante servie
+    est enregistrée dans le stockage (une variante rejetée comme doublon est
+    écartée au profit de la suivante).
+
+    Returns:
+        Le haïku servi, ou None si la réserve est vide ou désactivée
+    """
+    if not settings.pool.enabled:
+        return None
+    if not pool.running:
+        manager = HaikuManager(api_client=service.api_client, storage=storage)
+        pool.start(repo.get_by_id, manager, generation)
+
+    while (haiku_text := pool.take(quote_id, lang)) is not None:
+        stored = await run_in_threadpool(
+            storage.add_haiku, quote_id, haiku_text, lang, pool.model
+        )
         if stored:
             return HaikuResponse(
-                quote_id=request.quote_id,
+                quote_id=quote_id,
+                haiku_text=haiku_text,
+                language=lang,
+                model=pool.model,
+                was_generated=True,
+                pooled=True,
+            )
+    return None
+
+
+async def _produce_haiku(
+    quote_id: str,
+    quote: QuoteView,
+    lang: str,
+    force_new: bool,
+    repo: QuoteRepository,
+    service: DonkeyQuoterService,
+    storage: DataStorage,
+    generation: GenerationExecutor,
+    pool: HaikuPool,
+    deadline: float,
+) -> HaikuResponse:
+    """
+    Retourne un haïku stocké ou en génère un nouveau (avec fallbacks).
+
+    Args:
+        quote_id: ID de la citation
+        quote: Vue à plat de la citation dans la langue demandée
+        lang: Langue du haïku
+        force_new: Ignorer les haïkus stockés
+        repo: Repository des citations
+        service: Service métier
+        storage: Stockage des haïkus
+        generation: Pool des générations
+        pool: Réserve de haïkus pré-générés
+        deadline: Échéance de la génération (``time.monotonic()``)
+
+    Returns:
+        Le haïku (``was_generated`` indique un appel Claude réussi)
+    """
+    # Si pas de force_new, chercher un haïku existant d'abord
+    if not force_new:
+        stored = storage.get_haiku_with_metadata(quote_id, lang)
+        if stored:
+            return HaikuResponse(
+                quote_id=quote_id,
                 haiku_text=stored["text"],
                 language=lang,
                 model=stored.get("model", "unknown"),
@@ -82,47 +431,78 @@ async def generate_haiku(
                 generated_at=stored.get("generated_at"),
             )
 
-        # Haïku de fallback
-        fallback = service.get_fallback_haiku(lang)
-        return HaikuResponse(
-            quote_id=request.quote_id,
-            haiku_text=fallback,
-            language=lang,
-            model="fallback",
-            was_generated=False,
-        )
+    # Vérifier si l'API client est disponible
+    if not service.api_client:
+        # Fallback vers un haïku existant ou par défaut
+        return _stored_or_fallback(quote_id, lang, service, storage)
 
-    # Générer via l'API
-    quote_text = quote.text.get(lang, quote.text.get("fr", ""))
-    quote_author = quote.author.get(lang, quote.author.get("fr", ""))
+    # Variante pré-générée en réserve : pas d'appel Claude sur la requête
+    pooled = await _take_pooled(
+        quote_id, lang, repo, service, storage, generation, pool
+    )
+    if pooled is not None:
+        return pooled
 
-    haiku_text = service.generate_via_api(quote_text, quote_author, lang)
+    # Générer via l'API, dans le pool dédié (appel bloquant avec retries)
+    haiku_text = await generation.run(
+        service.generate_via_api, quote.text, quote.author, lang, deadline
+    )
 
     if haiku_text is None:
         # Échec de génération - fallback
         fallback = service.get_fallback_haiku(lang)
         return HaikuResponse(
-            quote_id=request.quote_id,
+            quote_id=quote_id,
             haiku_text=fallback,
             language=lang,
             model="fallback",
             was_generated=False,
         )
 
-    # Enregistrer la génération pour le rate limit
-    limiter = get_rate_limiter()
-    limiter.record(api_key)
-
     # Sauvegarder le haïku
     model = os.getenv("CLAUDE_MODEL", "claude-3-haiku-20240307")
-    storage.add_haiku(request.quote_id, haiku_text, lang, model)
+    return await _store_generated(quote_id, haiku_text, lang, model, storage)
+
+
+async def _store_generated(
+    quote_id: str, haiku_text: str, lang: str, model: str, storage: DataStorage
+) -> HaikuResponse:
+    """
+    Enregistre un haïku généré et construit la réponse.
+
+    Un haïku refusé par le stockage (doublon, ou quasi-doublon avec la
+    politique "reject") n'est pas compté comme une génération : le haïku déjà
+    stocké est servi avec ``was_generated=False``, et la requête n'est pas
+    décomptée du rate limit.
+
+    Returns:
+        Le haïku enregistré, ou celui qui l'a fait refuser
+    """
+    stored = await run_in_threadpool(
+        storage.add_haiku, quote_id, haiku_text, lang, model
+    )
+    if stored:
+        return HaikuResponse(
+            quote_id=quote_id,
+            haiku_text=haiku_text,
+            language=lang,
+            model=model,
+            was_generated=True,
+        )
 
+    existing = await run_in_threadpool(
+        storage.get_duplicate_haiku, quote_id, haiku_text, lang
+    )
+    if existing is None:
+        # Doublon supprimé entre-temps : servir le texte généré, sans le compter
+        existing = {"text": haiku_text, "model": model}
     return HaikuResponse(
-        quote_id=request.quote_id,
-        haiku_text=haiku_text,
+        quote_id=quote_id,
+        haiku_text=existing["text"],
         language=lang,
-        model=model,
-        was_generated=True,
+        model=existing.get("model", "unknown"),
+        was_generated=False,
+        generated_at=existing.get("generated_at"),
     )
 
 
@@ -142,16 +522,66 @@ async def get_rate_limit_status(
     limiter = get_rate_limiter()
 
     if api_key:
-        remaining = limiter.get_remaining(api_key)
+        # Lecture du stockage (SQLite) bloquante : hors de la boucle d'événements
+        remaining = await run_in_threadpool(limiter.get_remaining, api_key)
+        retry_after = math.ceil(await run_in_threadpool(limiter.retry_after, api_key))
     else:
-        remaining = limiter.limit
+        remaining, retry_after = limiter.limit, 0
 
     return RateLimitInfo(
         remaining=remaining,
         limit=limiter.limit,
+        retry_after=retry_after,
     )
 
 
+@router.post(
+    "/batch-get",
+    response_model=HaikuBatchResponse,
+    summary="Obtenir les haïkus de plusieurs citations",
+)
+async def batch_get_haikus(
+    batch: HaikuBatchRequest,
+    storage: Storage,
+    lang: Language,
+    api_key: OptionalAPIKey = None,
+):
+    """
+    Retourne les haïkus stockés de plusieurs citations en une requête.
+
+    Le résultat est indexé par ID puis par langue ; `haiku` vaut `null` quand
+    aucun haïku n'existe, et `count` donne le nombre de variantes stockées.
+    """
+    languages = batch.languages or [lang]
+    data = {}
+    for quote_id in batch.quote_ids:
+        items = {}
+        for language in languages:
+            stored = storage.get_haiku_with_metadata(quote_id, language)
+            if not stored:
+                items[language] = HaikuBatchItem()
+                continue
+            items[language] = HaikuBatchItem(
+                haiku=HaikuResponse(
+                    quote_id=quote_id,
+                    haiku_text=stored["text"],
+                    language=language,
+                    model=stored.get("model", "unknown"),
+                    was_generated=False,
+                    generated_at=stored.get("generated_at"),
+                ),
+                count=storage.count_haikus(quote_id, language),
+            )
+        data[quote_id] = items
+
+    not_found = [
+        quote_id
+        for quote_id, items in data.items()
+        if all(item.haiku is None for item in items.values())
+    ]
+    return HaikuBatchResponse(data=data, not_found=not_found)
+
+
 @router.get(
     "/{quote_id}",
     response_model=HaikuResponse,
@@ -187,20 +617,30 @@ async def get_haiku(
     "/{quote_id}/exists",
     response_model=HaikuExistsResponse,
     summary="Vérifier si un haïku existe",
+    dependencies=[Depends(conditional_get(haikus=True))],
 )
 async def haiku_exists(
+    request: Request,
+    response: Response,
     storage: Storage,
     lang: Language,
     quote_id: str = Path(..., description="ID de la citation"),
     api_key: OptionalAPIKey = None,
 ):
     """Vérifie si un haïku existe pour une citation."""
+    cached = cached_response(request, response)
+    if cached is not None:
+        return cached
+
     exists = storage.has_haiku(quote_id, lang)
     count = storage.count_haikus(quote_id, lang) if exists else 0
 
-    return HaikuExistsResponse(
+    result = trusted_response(
+        HaikuExistsResponse,
+        response,
         quote_id=quote_id,
         language=lang,
         exists=exists,
         count=count,
     )
+    return store_response(request, result)
@@ -0,0 +1,145 @@
+"""
+Router pour les endpoints /haikus/jobs (génération en lot en arrière-plan).
+"""
+
+from fastapi import APIRouter, HTTPException, Path, Response, status
+from fastapi.concurrency import run_in_threadpool
+
+from ...config.settings import settings
+from ...core.haiku_manager import HaikuManager
+from ..auth import AdminAPIKey
+from ..dependencies import APIClient, Generation, Jobs, QuoteRepo, Storage
+from ..jobs import DONE, FAILED, PENDING, HaikuJob
+from ..schemas import ErrorResponse, HaikuJobItem, HaikuJobRequest, HaikuJobResponse
+
+router = APIRouter(prefix="/haikus/jobs", tags=["jobs"])
+
+
+def _job_response(job: HaikuJob) -> HaikuJobResponse:
+    """Construit la réponse API d'un job."""
+    return HaikuJobResponse(
+        id=job.id,
+        status=job.status,
+        model=job.model,
+        batch_size=job.batch_size,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        total=len(job.items),
+        done=job.count(DONE),
+        failed=job.count(FAILED),
+        pending=job.count(PENDING),
+        input_tokens=job.input_tokens,
+        output_tokens=job.output_tokens,
+        cost_usd=round(job.cost_usd, 6),
+        error=job.error,
+        items=[
+            HaikuJobItem(quote_id=quote_id, **item)
+            for quote_id, item in job.items.items()
+        ],
+    )
+
+
+@router.post(
+    "",
+    response_model=HaikuJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Lancer un job de génération en lot",
+    responses={
+        400: {"model": ErrorResponse},
+        403: {"model": ErrorResponse, "description": "Clé admin requise"},
+        404: {"model": ErrorResponse},
+        503: {"model": ErrorResponse, "description": "API Claude non configurée"},
+    },
+)
+async def create_job(
+    request: HaikuJobRequest,
+    response: Response,
+    repo: QuoteRepo,
+    storage: Storage,
+    api_client: APIClient,
+    generation: Generation,
+    jobs: Jobs,
+    api_key: AdminAPIKey,
+):
+    """
+    Génère des haïkus FR + EN pour une liste de citations, en arrière-plan.
+
+    - `quote_ids` : citations à (re)générer
+    - `all_missing` : toutes les citations sans haïku dans les deux langues
+
+    La réponse (202) décrit le job ; son avancement se suit sur
+    `GET /haikus/jobs/{job_id}`. Requiert une clé d'administration.
+    """
+    if (request.quote_ids is None) == (not request.all_missing):
+        raise HTTPException(
+            status_code=400,
+            detail="Préciser soit quote_ids, soit all_missing",
+        )
+    if not api_client:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="API Claude non configurée",
+        )
+
+    if request.all_missing:
+        quotes = [
+            quote
+            for quote in repo.quotes
+            if not (
+                storage.haikus_data.get(quote.id, {}).get("fr")
+                and storage.haikus_data.get(quote.id, {}).get("en")
+            )
+        ]
+    else:
+        quote_ids = list(dict.fromkeys(request.quote_ids))
+        quotes = [repo.get_by_id(quote_id) for quote_id in quote_ids]
+        unknown = [qid for qid, quote in zip(quote_ids, quotes) if quote is None]
+        if unknown:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Citations non trouvées : {', '.join(unknown)}",
+            )
+
+    if not quotes:
+        raise HTTPException(status_code=400, detail="Aucune citation à traiter")
+    if len(quotes) > settings.jobs.max_quotes:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Trop de citations ({len(quotes)}), maximum "
+                f"{settings.jobs.max_quotes} par job"
+            ),
+        )
+
+    manager = HaikuManager(api_client=api_client, storage=storage)
+    job = await run_in_threadpool(
+        jobs.store.create,
+        quotes,
+        manager.model,
+        request.batch_size or settings.jobs.batch_size,
+    )
+    jobs.submit(job, quotes, manager, generation)
+
+    response.headers["Location"] = f"{router.prefix}/{job.id}"
+    return _job_response(job)
+
+
+@router.get(
+    "/{job_id}",
+    response_model=HaikuJobResponse,
+    summary="Suivre un job de génération en lot",
+    responses={404: {"model": ErrorResponse}},
+)
+async def get_job(
+    jobs: Jobs,
+    api_key: AdminAPIKey,
+    job_id: str = Path(..., description="ID du job"),
+):
+    """
+    Retourne l'état d'un job : statut, résultat par citation et coût.
+    """
+    job = jobs.store.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} non trouvé")
+    return _job_response(job)
@@ -4,16 +4,34 @@ Router pour les endpoints /quotes.
 
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Path, Query
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
 
+from ...config.settings import settings
+from ...core.daily import local_today, seconds_until_midnight
+from ...core.services import DuplicateQuoteError
 from ..auth import OptionalAPIKey
-from ..dependencies import Language, QuoteRepo, Service
+from ..dependencies import Language, QuoteRepo, Service, Storage
+from ..http_cache import cached_response, conditional_get, store_response
+from ..projection import (
+    FIELDS_QUERY,
+    ONLY_LANG_QUERY,
+    parse_fields,
+    projected_response,
+)
 from ..schemas import (
+    DailyQuoteResponse,
     ErrorResponse,
+    HaikuResponse,
+    QuoteBatchRequest,
+    QuoteBatchResponse,
+    QuoteCreatedResponse,
     QuoteInputModel,
     QuoteListResponse,
     QuoteResponse,
+    SimilarQuote,
+    SimilarQuotesResponse,
 )
+from ..serialization import trusted_response
 
 router = APIRouter(prefix="/quotes", tags=["quotes"])
 
@@ -29,10 +47,13 @@ async def get_random_quote(
     service: Service,
     lang: Language,
     category: Optional[str] = Query(None, description="Filtrer par catégorie"),
+    only_lang: bool = ONLY_LANG_QUERY,
+    fields: Optional[str] = FIELDS_QUERY,
     api_key: OptionalAPIKey = None,
 ):
     """Retourne une citation aléatoire, optionnellement filtrée par catégorie."""
-    quotes = repo.quotes
+    selected = parse_fields(fields)
+    quotes = repo.views(lang) if only_lang else repo.quotes
 
     if category and category != "all":
         quotes = service.filter_by_category(quotes, category)
@@ -41,15 +62,75 @@ async def get_random_quote(
         raise HTTPException(status_code=404, detail="Aucune citation trouvée")
 
     quote = service.get_random_quote(quotes)
-    return QuoteResponse(data=quote, language=lang)
+    if selected:
+        form = repo.fragments(lang if only_lang else None)
+        return projected_response(
+            form.encode_one(quote, selected), QuoteResponse, language=lang
+        )
+    return trusted_response(QuoteResponse, data=quote, language=lang)
+
+
+@router.get(
+    "/daily",
+    response_model=DailyQuoteResponse,
+    summary="Obtenir la citation du jour",
+    responses={404: {"model": ErrorResponse}},
+)
+async def get_daily_quote(
+    response: Response,
+    repo: QuoteRepo,
+    storage: Storage,
+    lang: Language,
+    category: Optional[str] = Query(None, description="Filtrer par catégorie"),
+    only_lang: bool = ONLY_LANG_QUERY,
+    api_key: OptionalAPIKey = None,
+):
+    """
+    Retourne la citation du jour et son haïku stocké.
+
+    La citation est tirée d'un planning déterministe sans répétition : toutes
+    les requêtes d'une même journée (fuseau configuré) obtiennent la même
+    réponse, cacheable jusqu'à minuit.
+    """
+    today = local_today(settings.daily.timezone)
+    schedule = repo.get_daily_schedule(category or "all")
+    quote_id = schedule.quote_id_for(today)
+
+    if quote_id is None:
+        raise HTTPException(status_code=404, detail="Aucune citation trouvée")
+
+    quote = repo.get_view(quote_id, lang) if only_lang else repo.get_by_id(quote_id)
+
+    # Haïku stocké, choisi lui aussi de façon déterministe
+    haiku = None
+    haikus = storage.get_all_haikus(quote_id, lang)
+    if haikus:
+        stored = haikus[schedule.day_index(today) % len(haikus)]
+        haiku = HaikuResponse(
+            quote_id=quote_id,
+            haiku_text=stored["text"],
+            language=lang,
+            model=stored.get("model", "unknown"),
+            was_generated=False,
+            generated_at=stored.get("generated_at"),
+        )
+
+    max_age = seconds_until_midnight(settings.daily.timezone)
+    response.headers["Cache-Control"] = f"public, max-age={max_age}"
+    response.headers["Vary"] = "Accept-Language"
+
+    return DailyQuoteResponse(data=quote, date=today, language=lang, haiku=haiku)
 
 
 @router.get(
     "",
     response_model=QuoteListResponse,
     summary="Lister les citations",
+    dependencies=[Depends(conditional_get(quotes=True))],
 )
 async def list_quotes(
+    request: Request,
+    response: Response,
     repo: QuoteRepo,
     service: Service,
     lang: Language,
@@ -59,10 +140,17 @@ async def list_quotes(
     ),
     limit: int = Query(50, ge=1, le=100, description="Nombre max de résultats"),
     offset: int = Query(0, ge=0, description="Offset pour pagination"),
+    only_lang: bool = ONLY_LANG_QUERY,
+    fields: Optional[str] = FIELDS_QUERY,
     api_key: OptionalAPIKey = None,
 ):
     """Liste les citations avec filtres optionnels et pagination."""
-    quotes = repo.quotes
+    cached = cached_response(request, response)
+    if cached is not None:
+        return cached
+
+    selected = parse_fields(fields)
+    quotes = repo.views(lang) if only_lang else repo.quotes
 
     if category and category != "all":
         quotes = service.filter_by_category(quotes, category)
@@ -73,7 +161,50 @@ async def list_quotes(
     total = len(quotes)
     quotes = quotes[offset : offset + limit]
 
-    return QuoteListResponse(data=quotes, total=total, language=lang)
+    if selected:
+        form = repo.fragments(lang if only_lang else None)
+        result = projected_response(
+            form.encode(quotes, selected),
+            QuoteListResponse,
+            response,
+            total=total,
+            language=lang,
+        )
+    else:
+        result = trusted_response(
+            QuoteListResponse, response, data=quotes, total=total, language=lang
+        )
+    return store_response(request, result)
+
+
+@router.post(
+    "/batch-get",
+    response_model=QuoteBatchResponse,
+    summary="Obtenir plusieurs citations par ID",
+)
+async def batch_get_quotes(
+    batch: QuoteBatchRequest,
+    repo: QuoteRepo,
+    lang: Language,
+    api_key: OptionalAPIKey = None,
+):
+    """
+    Retourne plusieurs citations en une requête, indexées par ID.
+
+    Les IDs inconnus ont la valeur `null` et sont listés dans `not_found`.
+    """
+    data = {}
+    for quote_id in batch.ids:
+        data[quote_id] = (
+            repo.get_view(quote_id, lang)
+            if batch.only_lang
+            else repo.get_by_id(quote_id)
+        )
+    not_found = [quote_id for quote_id, quote in data.items() if quote is None]
+
+    return trusted_response(
+        QuoteBatchResponse, data=data, not_found=not_found, language=lang
+    )
 
 
 @router.get(
@@ -81,31 +212,75 @@ async def list_quotes(
     response_model=QuoteResponse,
     summary="Obtenir une citation par ID",
     responses={404: {"model": ErrorResponse}},
+    dependencies=[Depends(conditional_get(quotes=True))],
 )
 async def get_quote(
+    request: Request,
+    response: Response,
     repo: QuoteRepo,
-    service: Service,
     lang: Language,
     quote_id: str = Path(..., description="ID de la citation"),
+    only_lang: bool = ONLY_LANG_QUERY,
+    fields: Optional[str] = FIELDS_QUERY,
     api_key: OptionalAPIKey = None,
 ):
     """Retourne une citation par son ID."""
-    quote = service.find_quote_by_id(repo.quotes, quote_id)
+    cached = cached_response(request, response)
+    if cached is not None:
+        return cached
+
+    selected = parse_fields(fields)
+    quote = repo.get_view(quote_id, lang) if only_lang else repo.get_by_id(quote_id)
 
     if not quote:
         raise HTTPException(status_code=404, detail=f"Citation {quote_id} non trouvée")
 
-    return QuoteResponse(data=quote, language=lang)
+    if selected:
+        form = repo.fragments(lang if only_lang else None)
+        result = projected_response(
+            form.encode_one(quote, selected), QuoteResponse, response, language=lang
+        )
+    else:
+        result = trusted_response(QuoteResponse, response, data=quote, language=lang)
+    return store_response(request, result)
+
+
+@router.get(
+    "/{quote_id}/similar",
+    response_model=SimilarQuotesResponse,
+    summary="Obtenir des citations similaires",
+    responses={404: {"model": ErrorResponse}},
+)
+async def get_similar_quotes(
+    repo: QuoteRepo,
+    lang: Language,
+    quote_id: str = Path(..., description="ID de la citation"),
+    k: int = Query(5, ge=1, le=50, description="Nombre de recommandations"),
+    api_key: OptionalAPIKey = None,
+):
+    """Retourne les citations les plus proches (similarité TF-IDF)."""
+    similar = repo.get_similar(quote_id, lang, k)
+
+    if similar is None:
+        raise HTTPException(status_code=404, detail=f"Citation {quote_id} non trouvée")
+
+    return SimilarQuotesResponse(
+        quote_id=quote_id,
+        data=[SimilarQuote(quote=quote, score=score) for quote, score in similar],
+        language=lang,
+    )
 
 
 @router.post(
     "",
-    response_model=QuoteResponse,
+    response_model=QuoteCreatedResponse,
     status_code=201,
     summary="Créer une nouvelle citation",
+    responses={409: {"model": ErrorResponse, "description": "Quasi-doublon"}},
 )
 async def create_quote(
     quote_input: QuoteInputModel,
+    repo: QuoteRepo,
     service: Service,
     lang: Language,
     api_key: OptionalAPIKey = None,
@@ -113,7 +288,18 @@ async def create_quote(
     """
     Crée une nouvelle citation utilisateur.
 
+    Les quasi-doublons d'une citation existante sont rejetés (409) ou signalés
+    via `near_duplicate_of` selon la configuration.
+
     Note: La citation est créée en mémoire et n'est pas persistée.
     """
-    quote = service.create_quote_from_input(quote_input, lang)
-    return QuoteResponse(data=quote, language=lang)
+    try:
+        quote, duplicate_id = service.create_quote_deduplicated(
+            quote_input, lang, repo.find_near_duplicate
+        )
+    except DuplicateQuoteError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from None
+
+    return QuoteCreatedResponse(
+        data=quote, language=lang, near_duplicate_of=duplicate_id
+    )
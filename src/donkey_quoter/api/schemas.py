@@ -2,12 +2,12 @@
 Schémas de requête/réponse pour l'API REST.
 """
 
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import Annotated, Literal, Optional, Union
 
 from pydantic import BaseModel, Field
 
-from ..core.models import Quote, QuoteInput
+from ..core.models import Quote, QuoteInput, QuoteView
 
 # Re-export des modèles existants
 QuoteModel = Quote
@@ -15,20 +15,68 @@ QuoteInputModel = QuoteInput
 
 
 class QuoteResponse(BaseModel):
-    """Réponse API pour une citation."""
+    """Réponse API pour une citation (bilingue ou vue à plat)."""
 
-    data: Quote
+    data: Union[Quote, QuoteView]
     language: str = "fr"
 
 
+class QuoteCreatedResponse(QuoteResponse):
+    """Réponse API à la création d'une citation."""
+
+    near_duplicate_of: Optional[str] = Field(
+        default=None, description="ID d'une citation existante quasi identique"
+    )
+
+
 class QuoteListResponse(BaseModel):
-    """Réponse API pour une liste de citations."""
+    """Réponse API pour une liste de citations (bilingues ou vues à plat)."""
 
-    data: list[Quote]
+    data: list[Union[Quote, QuoteView]]
     total: int
     language: str = "fr"
 
 
+# Limite d'IDs par requête de lecture groupée
+MAX_BATCH_IDS = 100
+
+LanguageCode = Annotated[str, Field(pattern="^(fr|en)$")]
+
+
+class QuoteBatchRequest(BaseModel):
+    """Requête de lecture groupée de citations."""
+
+    ids: list[str] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_IDS, description="IDs des citations"
+    )
+    only_lang: bool = Field(
+        default=False, description="Ne renvoyer que la langue demandée (vue à plat)"
+    )
+
+
+class QuoteBatchResponse(BaseModel):
+    """Citations indexées par ID (None pour un ID inconnu)."""
+
+    data: dict[str, Optional[Union[Quote, QuoteView]]]
+    not_found: list[str] = Field(default_factory=list)
+    language: str = "fr"
+
+
+class SimilarQuote(BaseModel):
+    """Citation similaire avec son score de similarité."""
+
+    quote: Quote
+    score: float
+
+
+class SimilarQuotesResponse(BaseModel):
+    """Réponse API pour les citations similaires."""
+
+    quote_id: str
+    data: list[SimilarQuote]
+    language: str = "fr"
+
+
 class HaikuRequest(BaseModel):
     """Requête pour générer un haïku."""
 
@@ -36,6 +84,13 @@ class HaikuRequest(BaseModel):
     force_new: bool = Field(
         default=False, description="Forcer la génération d'un nouveau haïku"
     )
+    on_overload: Literal["reject", "fallback"] = Field(
+        default="reject",
+        description=(
+            "Si le service est saturé : refuser (503 + Retry-After) ou renvoyer "
+            "un haïku stocké / par défaut"
+        ),
+    )
 
 
 class HaikuResponse(BaseModel):
@@ -47,6 +102,93 @@ class HaikuResponse(BaseModel):
     model: str = "unknown"
     was_generated: bool = False
     generated_at: Optional[datetime] = None
+    coalesced: bool = Field(
+        default=False,
+        description="Résultat partagé avec une requête identique simultanée",
+    )
+    pooled: bool = Field(
+        default=False, description="Servi depuis la réserve de haïkus pré-générés"
+    )
+
+
+class HaikuBatchRequest(BaseModel):
+    """Requête de lecture groupée de haïkus."""
+
+    quote_ids: list[str] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_IDS,
+        description="IDs des citations",
+    )
+    languages: Optional[list[LanguageCode]] = Field(
+        default=None, description="Langues voulues (défaut: langue de la requête)"
+    )
+
+
+class HaikuBatchItem(BaseModel):
+    """Haïku stocké d'une citation dans une langue (None si absent)."""
+
+    haiku: Optional[HaikuResponse] = None
+    count: int = 0
+
+
+class HaikuBatchResponse(BaseModel):
+    """Haïkus indexés par ID de citation puis par langue."""
+
+    data: dict[str, dict[str, HaikuBatchItem]]
+    not_found: list[str] = Field(
+        default_factory=list, description="Citations sans aucun haïku demandé"
+    )
+
+
+class HaikuJobRequest(BaseModel):
+    """Requête de création d'un job de génération en lot."""
+
+    quote_ids: Optional[list[str]] = Field(
+        default=None, min_length=1, description="IDs des citations à traiter"
+    )
+    all_missing: bool = Field(
+        default=False,
+        description="Traiter toutes les citations sans haïku FR et EN",
+    )
+    batch_size: Optional[int] = Field(
+        default=None, ge=1, le=20, description="Citations par appel Claude"
+    )
+
+
+class HaikuJobItem(BaseModel):
+    """Résultat d'un job pour une citation."""
+
+    quote_id: str
+    status: str = Field(..., description="pending, done ou failed")
+    fr: Optional[str] = None
+    en: Optional[str] = None
+    error: Optional[str] = None
+
+
+class HaikuJobResponse(BaseModel):
+    """État d'un job de génération en lot."""
+
+    id: str
+    status: str = Field(
+        ..., description="pending, running, completed, failed ou interrupted"
+    )
+    model: str
+    batch_size: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    total: int
+    done: int
+    failed: int
+    pending: int
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+    error: Optional[str] = Field(
+        default=None, description="Erreur ayant interrompu le job"
+    )
+    items: list[HaikuJobItem]
 
 
 class HaikuExistsResponse(BaseModel):
@@ -63,7 +205,19 @@ class RateLimitInfo(BaseModel):
 
     remaining: int
     limit: int = 5
-    reset_info: str = "24h window per API key"
+    reset_info: str = "24h window per API key, refilled continuously"
+    retry_after: int = Field(
+        0, description="Secondes avant la prochaine génération possible"
+    )
+
+
+class DailyQuoteResponse(BaseModel):
+    """Réponse API pour la citation du jour."""
+
+    data: Union[Quote, QuoteView]
+    date: date
+    language: str = "fr"
+    haiku: Optional[HaikuResponse] = None
 
 
 class ExportResponse(BaseModel):
@@ -75,6 +229,22 @@ class ExportResponse(BaseModel):
     total_quotes: int
 
 
+class CorpusVersionResponse(BaseModel):
+    """Pointeur vers la version courante du corpus."""
+
+    version: str = Field(..., description="Empreinte du contenu du corpus")
+    url: str = Field(..., description="URL immuable du corpus de cette version")
+    total_quotes: int
+
+
+class CorpusResponse(BaseModel):
+    """Corpus complet d'une version donnée."""
+
+    version: str
+    quotes: list[Quote]
+    total_quotes: int
+
+
 class ErrorResponse(BaseModel):
     """Réponse d'erreur standard."""
 
@@ -83,9 +253,63 @@ class ErrorResponse(BaseModel):
     code: str
 
 
+class ResponseCacheStats(BaseModel):
+    """Compteurs du cache de réponses encodées."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    max_entries: int = 0
+
+
+class GenerationQueueStats(BaseModel):
+    """État de la file des générations de haïkus."""
+
+    active: int = 0
+    max_workers: int = 0
+    waiting: int = 0
+    max_queue: int = 0
+    admitted: int = 0
+    rejected: int = 0
+    wait_ms_avg: float = 0.0
+    wait_ms_p95: float = 0.0
+    wait_ms_max: float = 0.0
+    generation_ms_avg: float = 0.0
+
+
+class HaikuPoolStats(BaseModel):
+    """État de la réserve de haïkus pré-générés."""
+
+    variants: int = 0
+    quotes: int = 0
+    hits: int = 0
+    misses: int = 0
+    generated: int = 0
+    spent_today_usd: float = 0.0
+    daily_budget_usd: float = 0.0
+
+
+class CircuitBreakerStats(BaseModel):
+    """État du coupe-circuit des appels à Claude."""
+
+    state: str = "closed"
+    consecutive_failures: int = 0
+    window_calls: int = 0
+    window_failures: int = 0
+    error_rate: float = 0.0
+    trips: int = 0
+    rejected: int = 0
+    retry_after_seconds: float = 0.0
+
+
 class HealthResponse(BaseModel):
     """Réponse du health check."""
 
     status: str = "ok"
     service: str = "donkey-quoter-api"
     version: str = "1.0.0"
+    response_cache: Optional[ResponseCacheStats] = None
+    generation: Optional[GenerationQueueStats] = None
+    haiku_pool: Optional[HaikuPoolStats] = None
+    circuit_breaker: Optional[CircuitBreakerStats] = None
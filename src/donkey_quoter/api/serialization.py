@@ -0,0 +1,68 @@
+"""
+Sérialisation rapide des réponses construites à partir de données de confiance.
+
+Par défaut, FastAPI revalide chaque réponse contre son ``response_model`` puis
+la sérialise. Pour les endpoints chauds, les citations et haïkus viennent déjà
+de modèles validés au chargement : on les sérialise directement en octets
+(``TypeAdapter.dump_json``) sans seconde validation. Le ``response_model`` de
+la route reste déclaré pour le schéma OpenAPI.
+"""
+
+from functools import lru_cache
+from typing import Any, Optional
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache
+def _adapter(model: type[BaseModel]) -> TypeAdapter:
+    """Retourne (et met en cache) l'adaptateur de sérialisation d'un modèle."""
+    return TypeAdapter(model)
+
+
+def dump_trusted(model: type[BaseModel], **fields: Any) -> bytes:
+    """
+    Sérialise des champs de confiance en JSON, sans validation.
+
+    Args:
+        model: Modèle de réponse (définit le format de sortie)
+        **fields: Valeurs des champs, déjà conformes au modèle
+
+    Returns:
+        Corps JSON encodé
+    """
+    return _adapter(model).dump_json(model.model_construct(**fields))
+
+
+def dump_instance(instance: BaseModel) -> bytes:
+    """Sérialise une instance de modèle déjà validée en JSON."""
+    return _adapter(type(instance)).dump_json(instance)
+
+
+def trusted_response(
+    model: type[BaseModel],
+    response: Optional[Response] = None,
+    status_code: int = 200,
+    **fields: Any,
+) -> Response:
+    """
+    Construit une réponse JSON à partir de données de confiance.
+
+    Args:
+        model: Modèle de réponse
+        response: Réponse injectée par FastAPI, dont on reprend les en-têtes
+            (validateurs ETag, Cache-Control, ...)
+        status_code: Code HTTP
+        **fields: Valeurs des champs du modèle
+
+    Returns:
+        Réponse prête à l'envoi
+    """
+    headers = dict(response.headers) if response is not None else None
+    return Response(
+        dump_trusted(model, **fields),
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers,
+    )
@@ -0,0 +1,218 @@
+"""
+Export en flux : JSON, NDJSON ou CSV émis morceau par morceau.
+
+Le corps n'est jamais construit en entier en mémoire : on fige d'abord un
+instantané cohérent (copie superficielle des références), puis un
+générateur le sérialise élément par élément en regroupant les octets en
+morceaux de taille raisonnable.
+"""
+
+import csv
+import io
+import json
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+
+from ..core.models import Quote
+from ..core.storage import DataStorage
+from .serialization import dump_instance
+
+# Taille visée des morceaux envoyés au client
+CHUNK_SIZE = 64 * 1024
+
+# Colonnes de l'export tabulaire : une ligne par (citation, langue, variante)
+ROW_FIELDS = [
+    "quote_id",
+    "category",
+    "language",
+    "quote",
+    "author",
+    "variant",
+    "haiku",
+    "model",
+    "generated_at",
+]
+
+
+class ExportSnapshot:
+    """Instantané cohérent des données à exporter."""
+
+    def __init__(self, quotes: list[Quote], storage: DataStorage):
+        """
+        Fige les données à exporter.
+
+        Le stockage remplace ses listes de haïkus au lieu de les modifier
+        (copie sur écriture) : son instantané (copie superficielle prise sous
+        verrou) suffit pour qu'un haïku ajouté pendant l'envoi n'apparaisse pas
+        dans l'export.
+
+        Args:
+            quotes: Citations du corpus (liste remplacée, jamais modifiée)
+            storage: Stockage des haïkus
+        """
+        self.quotes = quotes
+        self.haikus = storage.snapshot()
+        self.export_date = datetime.utcnow()
+
+
+def _chunked(parts: Iterable[bytes], size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Regroupe des fragments d'octets en morceaux d'environ ``size`` octets."""
+    buffer = bytearray()
+    for part in parts:
+        buffer += part
+        if len(buffer) >= size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def _dumps(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _json_parts(snapshot: ExportSnapshot) -> Iterator[bytes]:
+    yield b'{"quotes":['
+    for i, quote in enumerate(snapshot.quotes):
+        if i:
+            yield b","
+        yield dump_instance(quote)
+
+    yield b'],"haikus":{'
+    for i, (quote_id, languages) in enumerate(snapshot.haikus.items()):
+        if i:
+            yield b","
+        yield _dumps(quote_id) + b":" + _dumps(languages)
+
+    yield b'},"export_date":' + _dumps(snapshot.export_date.isoformat())
+    yield b',"total_quotes":' + str(len(snapshot.quotes)).encode() + b"}"
+
+
+def _ndjson_parts(snapshot: ExportSnapshot) -> Iterator[bytes]:
+    header = {
+        "type": "export",
+        "export_date": snapshot.export_date.isoformat(),
+        "total_quotes": len(snapshot.quotes),
+    }
+    yield _dumps(header) + b"\n"
+
+    for quote in snapshot.quotes:
+        yield b'{"type":"quote","data":' + dump_instance(quote) + b"}\n"
+
+    for quote_id, languages in snapshot.haikus.items():
+        record = {"type": "haikus", "quote_id": quote_id, "data": languages}
+        yield _dumps(record) + b"\n"
+
+
+def iter_export(snapshot: ExportSnapshot, fmt: str = "json") -> Iterator[bytes]:
+    """
+    Sérialise un instantané en flux.
+
+    Args:
+        snapshot: Données figées
+        fmt: "json" (même forme que /export) ou "ndjson" (un objet par ligne)
+
+    Returns:
+        Itérateur de morceaux d'octets
+    """
+    parts = _ndjson_parts(snapshot) if fmt == "ndjson" else _json_parts(snapshot)
+    return _chunked(parts)
+
+
+def iter_rows(
+    snapshot: ExportSnapshot, languages: tuple[str, ...] = ("fr", "en")
+) -> Iterator[dict]:
+    """
+    Aplatit un instantané en lignes (citation, langue, variante de haïku).
+
+    Une citation sans haïku dans une langue donne une ligne aux champs de
+    haïku vides ; les haïkus d'une citation hors corpus (citation utilisateur)
+    sont exportés sans texte de citation.
+
+    Args:
+        snapshot: Données figées
+        languages: Langues à exporter
+
+    Returns:
+        Itérateur de lignes (clés de ``ROW_FIELDS``)
+    """
+    for quote in snapshot.quotes:
+        haikus = snapshot.haikus.get(quote.id, {})
+        for lang in languages:
+            base = {
+                "quote_id": quote.id,
+                "category": quote.category,
+                "language": lang,
+                "quote": quote.text.get(lang, ""),
+                "author": quote.author.get(lang, ""),
+            }
+            yield from _haiku_rows(base, haikus.get(lang, []))
+
+    known = {quote.id for quote in snapshot.quotes}
+    for quote_id, haikus in snapshot.haikus.items():
+        if quote_id in known:
+            continue
+        for lang, entries in haikus.items():
+            if lang not in languages:
+                continue
+            base = {"quote_id": quote_id, "language": lang}
+            yield from _haiku_rows(base, entries)
+
+
+def _haiku_rows(base: dict, entries: list) -> Iterator[dict]:
+    if not entries:
+        yield base
+        return
+    for variant, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            entry = {"text": entry}
+        yield {
+            **base,
+            "variant": variant,
+            "haiku": entry.get("text", ""),
+            "model": entry.get("model", "unknown"),
+            "generated_at": entry.get("generated_at", ""),
+        }
+
+
+def _csv_parts(snapshot: ExportSnapshot, languages: tuple[str, ...]) -> Iterator[bytes]:
+    # Le writer écrit dans un tampon vidé à chaque ligne
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=ROW_FIELDS, lineterminator="\n")
+    writer.writeheader()
+    for row in iter_rows(snapshot, languages):
+        writer.writerow(row)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def _rows_ndjson_parts(
+    snapshot: ExportSnapshot, languages: tuple[str, ...]
+) -> Iterator[bytes]:
+    for row in iter_rows(snapshot, languages):
+        yield _dumps({field: row.get(field) for field in ROW_FIELDS}) + b"\n"
+
+
+def iter_rows_export(
+    snapshot: ExportSnapshot,
+    fmt: str = "csv",
+    languages: tuple[str, ...] = ("fr", "en"),
+) -> Iterator[bytes]:
+    """
+    Sérialise les lignes d'un instantané en flux.
+
+    Args:
+        snapshot: Données figées
+        fmt: "csv" ou "ndjson" (une ligne JSON par variante de haïku)
+        languages: Langues à exporter
+
+    Returns:
+        Itérateur de morceaux d'octets
+    """
+    if fmt == "csv":
+        parts = _csv_parts(snapshot, languages)
+    else:
+        parts = _rows_ndjson_parts(snapshot, languages)
+    return _chunked(parts)
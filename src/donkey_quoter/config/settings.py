@@ -59,6 +59,120 @@ class TokenSettings:
     prompt_overhead_tokens: int = 50  # Tokens supplémentaires du prompt système
 
 
+@dataclass
+class DeduplicationSettings:
+    """Configuration de la détection des quasi-doublons (MinHash/LSH)."""
+
+    threshold: float = 0.8  # Similarité de Jaccard minimale
+    num_perm: int = 128  # Taille des signatures MinHash
+    shingle_size: int = 4  # n-grammes de caractères
+    quote_policy: str = "flag"  # "reject", "flag" ou "off"
+    haiku_policy: str = "reject"  # "reject", "flag" ou "off"
+
+
+@dataclass
+class CompressionSettings:
+    """Configuration de la compression des réponses de l'API."""
+
+    minimum_size: int = 1024  # Octets en dessous desquels on ne compresse pas
+    level: int = 6  # Niveau gzip (1 = rapide, 9 = compact)
+
+
+@dataclass
+class ResponseCacheSettings:
+    """Configuration du cache des corps de réponse encodés."""
+
+    max_entries: int = 4096  # Corps gardés (LRU)
+
+
+@dataclass
+class CorpusSettings:
+    """Configuration de la publication versionnée du corpus."""
+
+    pointer_max_age: int = 60  # TTL de /corpus/version (secondes)
+    immutable_max_age: int = 31_536_000  # TTL de /corpus/{version}.json (1 an)
+
+
+@dataclass
+class TimingSettings:
+    """Configuration du chronométrage des requêtes de l'API."""
+
+    server_timing: bool = True  # En-tête Server-Timing sur chaque réponse
+    log_requests: bool = False  # Ligne de log par requête avec les étapes
+
+
+@dataclass
+class GenerationSettings:
+    """Configuration des générations de haïkus via l'API."""
+
+    max_workers: int = 4  # Appels Claude simultanés (threads dédiés)
+    max_queue: int = 16  # Générations en attente d'une place, au-delà : refus
+    expected_seconds: float = 3.0  # Durée estimée avant mesure (Retry-After)
+    # Échéance d'une génération (défaut, et maximum accepté via X-Request-Timeout)
+    deadline_seconds: float = 10.0
+    max_deadline_seconds: float = 30.0
+    # Requêtes identiques simultanées : "share" (un seul appel, résultat
+    # partagé) ou "off" (chaque requête génère)
+    coalesce: str = "share"
+    # Décompter aussi le rate limit des requêtes qui ont rejoint une génération
+    charge_joined: bool = False
+
+
+@dataclass
+class RateLimitSettings:
+    """Configuration du rate limit des générations de haïkus."""
+
+    limit: int = 5  # Générations par clé API et par fenêtre
+    window_hours: float = 24
+    # "sqlite" (partagé par les workers de la machine, survit aux
+    # redémarrages) ou "memory" (propre au processus)
+    backend: str = "sqlite"
+    path: str = "data/rate_limits.sqlite3"
+
+
+@dataclass
+class CircuitBreakerSettings:
+    """Configuration du coupe-circuit des appels à Claude."""
+
+    failure_threshold: int = 5  # Échecs consécutifs avant ouverture
+    window_seconds: float = 60.0  # Fenêtre glissante du taux d'échec
+    min_calls: int = 10  # Appels minimum dans la fenêtre pour juger du taux
+    error_rate: float = 0.5  # Taux d'échec provoquant l'ouverture
+    open_seconds: float = 30.0  # Échec immédiat avant les appels d'essai
+    half_open_calls: int = 1  # Appels d'essai simultanés
+
+
+@dataclass
+class JobSettings:
+    """Configuration des jobs de génération en lot via l'API."""
+
+    batch_size: int = 5  # Citations par appel Claude (prompt bilingue)
+    max_concurrent_batches: int = 2  # Lots en cours, tous jobs confondus
+    max_quotes: int = 1000  # Citations maximum par job
+    directory: str = "jobs"  # Sous-dossier du stockage où la progression est écrite
+
+
+@dataclass
+class PoolSettings:
+    """Configuration de la réserve de haïkus pré-générés (force_new)."""
+
+    enabled: bool = True
+    size: int = 2  # Variantes gardées par (citation, langue)
+    hot_quotes: int = 20  # Citations les plus demandées à approvisionner
+    batch_size: int = 5  # Citations par appel Claude (prompt bilingue)
+    refill_concurrency: int = 1  # Appels de remplissage simultanés
+    daily_budget_usd: float = 0.50  # Dépense maximale par jour (UTC)
+    idle_poll_seconds: float = 1.0  # Attente quand le pool de génération est occupé
+
+
+@dataclass
+class DailySettings:
+    """Configuration de la citation du jour."""
+
+    timezone: str = "Europe/Paris"  # Fuseau utilisé pour le changement de jour
+    seed: str = "donkey-quoter"  # Graine du planning (changer = autre ordre)
+
+
 @dataclass
 class PricingSettings:
     """Configuration des prix des API Claude."""
@@ -79,6 +193,25 @@ class PricingSettings:
                 },
             }
 
+    def cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
+        """
+        Calcule le coût d'un appel à partir de sa consommation.
+
+        Args:
+            model: Modèle utilisé
+            input_tokens: Tokens en entrée
+            output_tokens: Tokens en sortie
+
+        Returns:
+            Coût en USD (0 si le modèle n'a pas de tarif connu)
+        """
+        pricing = self.claude_pricing.get(model)
+        if not pricing:
+            return 0.0
+        return (input_tokens / 1_000_000) * pricing["input"] + (
+            output_tokens / 1_000_000
+        ) * pricing["output"]
+
 
 @dataclass
 class ModelSettings:
@@ -139,6 +272,17 @@ class Settings:
         self.ui = UISettings()
         self.export = ExportSettings()
         self.tokens = TokenSettings()
+        self.deduplication = DeduplicationSettings()
+        self.daily = DailySettings()
+        self.compression = CompressionSettings()
+        self.response_cache = ResponseCacheSettings()
+        self.corpus = CorpusSettings()
+        self.timing = TimingSettings()
+        self.rate_limit = RateLimitSettings()
+        self.generation = GenerationSettings()
+        self.circuit_breaker = CircuitBreakerSettings()
+        self.jobs = JobSettings()
+        self.pool = PoolSettings()
         self.pricing = PricingSettings()
         self.models = ModelSettings()
 
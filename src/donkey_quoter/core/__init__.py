@@ -2,8 +2,15 @@
 Module contenant la logique métier core de l'application.
 """
 
+from .collection import QuoteCollection
 from .models import Quote, QuoteInput
 from .services import DonkeyQuoterService
 from .storage import DataStorage
 
-__all__ = ["Quote", "QuoteInput", "DonkeyQuoterService", "DataStorage"]
+__all__ = [
+    "Quote",
+    "QuoteInput",
+    "QuoteCollection",
+    "DonkeyQuoterService",
+    "DataStorage",
+]
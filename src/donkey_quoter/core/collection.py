@@ -0,0 +1,77 @@
+"""
+Collection de citations indexée par ID (citations et poèmes sauvegardés).
+"""
+
+from collections.abc import Iterable, Iterator
+from typing import Optional, Union
+
+from .models import Quote
+
+
+class QuoteCollection:
+    """
+    Collection ordonnée de citations, indexée par ID.
+
+    Conserve l'ordre d'insertion (comme une liste) mais l'appartenance,
+    l'ajout et la suppression se font en O(1) sans copier la collection ni
+    comparer les modèles Pydantic champ par champ.
+    """
+
+    def __init__(self, quotes: Optional[Iterable[Quote]] = None):
+        """
+        Initialise la collection.
+
+        Args:
+            quotes: Citations initiales (les doublons d'ID sont ignorés)
+        """
+        self._items: dict[str, Quote] = {}
+        for quote in quotes or ():
+            self.add(quote)
+
+    def __contains__(self, item: Union[Quote, str]) -> bool:
+        key = item.id if isinstance(item, Quote) else item
+        return key in self._items
+
+    def __iter__(self) -> Iterator[Quote]:
+        return iter(self._items.values())
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def __repr__(self) -> str:
+        return f"QuoteCollection({list(self._items)})"
+
+    def add(self, quote: Quote) -> bool:
+        """
+        Ajoute une citation si son ID n'est pas déjà présent.
+
+        Args:
+            quote: Citation à ajouter
+
+        Returns:
+            True si la citation a été ajoutée
+        """
+        if quote.id in self._items:
+            return False
+        self._items[quote.id] = quote
+        return True
+
+    def get(self, quote_id: str) -> Optional[Quote]:
+        """Retourne la citation d'ID donné ou None."""
+        return self._items.get(quote_id)
+
+    def remove(self, quote_id: str) -> bool:
+        """
+        Retire une citation par son ID.
+
+        Returns:
+            True si la citation était présente
+        """
+        return self._items.pop(quote_id, None) is not None
+
+    def to_list(self) -> list[Quote]:
+        """Retourne les citations dans l'ordre d'insertion."""
+        return list(self._items.values())
@@ -0,0 +1,96 @@
+"""
+Planning déterministe de la citation du jour.
+"""
+
+import random
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+# Jour 0 du planning (les cycles sont comptés à partir de cette date)
+SCHEDULE_EPOCH = date(2024, 1, 1)
+
+
+class DailySchedule:
+    """
+    Planning « une citation par jour » sans répétition.
+
+    Le corpus est parcouru dans un ordre mélangé avec une graine fixe : chaque
+    citation sort exactement une fois par cycle de ``len(ids)`` jours, puis un
+    nouveau cycle (autre permutation) commence. Le résultat ne dépend que de
+    la date, de la graine et des IDs, donc tous les workers répondent pareil.
+    """
+
+    def __init__(self, quote_ids: list[str], seed: str = "donkey-quoter"):
+        """
+        Initialise le planning.
+
+        Args:
+            quote_ids: IDs des citations à planifier
+            seed: Graine du mélange
+        """
+        # Trié pour ne pas dépendre de l'ordre du fichier
+        self.quote_ids = sorted(set(quote_ids))
+        self.seed = seed
+        self._cycles: dict[int, list[str]] = {}
+
+    def _shuffled(self, number: int) -> list[str]:
+        """Permutation brute (graine + numéro de cycle)."""
+        order = list(self.quote_ids)
+        random.Random(f"{self.seed}:{number}").shuffle(order)
+        return order
+
+    def _cycle(self, number: int) -> list[str]:
+        """Retourne (et met en cache) la permutation d'un cycle."""
+        if number not in self._cycles:
+            if len(self.quote_ids) <= 2:
+                # Ordre fixe : alterne sans jamais répéter
+                order = list(self.quote_ids)
+            else:
+                order = self._shuffled(number)
+                # Pas de répétition à la jonction de deux cycles (la fin d'un
+                # cycle n'est jamais modifiée dès 3 citations)
+                if order[0] == self._shuffled(number - 1)[-1]:
+                    order[0], order[1] = order[1], order[0]
+            self._cycles[number] = order
+        return self._cycles[number]
+
+    def day_index(self, day: date) -> int:
+        """Numéro du jour dans le planning."""
+        return (day - SCHEDULE_EPOCH).days
+
+    def quote_id_for(self, day: date) -> Optional[str]:
+        """
+        Retourne l'ID de la citation planifiée pour un jour.
+
+        Args:
+            day: Date locale
+
+        Returns:
+            ID de la citation ou None si le corpus est vide
+        """
+        if not self.quote_ids:
+            return None
+        cycle, position = divmod(self.day_index(day), len(self.quote_ids))
+        return self._cycle(cycle)[position]
+
+
+def local_today(timezone: str) -> date:
+    """Date du jour dans le fuseau configuré."""
+    return datetime.now(ZoneInfo(timezone)).date()
+
+
+def seconds_until_midnight(timezone: str) -> int:
+    """
+    Nombre de secondes jusqu'au prochain minuit local.
+
+    Args:
+        timezone: Fuseau horaire IANA (ex: Europe/Paris)
+
+    Returns:
+        Secondes (au moins 1)
+    """
+    tz = ZoneInfo(timezone)
+    now = datetime.now(tz)
+    midnight = datetime.combine(now.date() + timedelta(days=1), time(), tzinfo=tz)
+    return max(1, int((midnight - now).total_seconds()))
@@ -9,15 +9,20 @@ from ..config.settings import CLAUDE_PRICING, TOKEN_ESTIMATION
 from ..data import CLASSIC_QUOTES
 from ..infrastructure.anthropic_client import AnthropicClient
 from .models import Quote
+from .near_duplicates import NearDuplicateIndex
 from .storage import DataStorage
 
 
 class HaikuManager:
     """Gestionnaire centralisé pour toutes les opérations haiku."""
 
-    def __init__(self, api_client: Optional[AnthropicClient] = None):
-        """Initialise le manager."""
-        self.storage = DataStorage()
+    def __init__(
+        self,
+        api_client: Optional[AnthropicClient] = None,
+        storage: Optional[DataStorage] = None,
+    ):
+        """Initialise le manager (stockage par défaut si non fourni)."""
+        self.storage = storage or DataStorage()
         self.api_client = api_client
         self.model = api_client.model if api_client else None
 
@@ -51,6 +56,31 @@ class HaikuManager:
 
         return self._parse_batch_response(response_text)
 
+    def estimate_batch_usage(self, quotes: list[Quote]) -> dict[str, int]:
+        """
+        Estime la consommation maximale d'un appel ``generate_batch``.
+
+        Les tokens de sortie sont bornés par ``max_tokens`` ; les tokens
+        d'entrée sont estimés à partir de la longueur du prompt.
+
+        Returns:
+            {"input_tokens": ..., "output_tokens": ...}
+        """
+        prompt = self._create_batch_prompt(quotes)
+        return {
+            "input_tokens": len(prompt) // TOKEN_ESTIMATION["chars_per_token"]
+            + TOKEN_ESTIMATION["prompt_overhead_tokens"],
+            "output_tokens": TOKEN_ESTIMATION["haiku_output_tokens"] * 2 * len(quotes),
+        }
+
+    def generate_batch_with_usage(
+        self, quotes: list[Quote]
+    ) -> tuple[dict[str, dict[str, str]], Optional[dict[str, int]]]:
+        """Génère un batch bilingue et retourne aussi la consommation de l'appel."""
+        haikus = self.generate_batch(quotes)
+        usage = self.api_client.get_last_usage_metrics() if self.api_client else None
+        return haikus, usage
+
     def get_statistics(self) -> dict[str, Any]:
         """Calcule les statistiques des haïkus."""
         quotes = [Quote(**q) for q in CLASSIC_QUOTES]
@@ -78,7 +108,7 @@ class HaikuManager:
 
         # Modèles utilisés
         models_used = set()
-        for haiku_data in self.storage.haikus_data.values():
+        for haiku_data in self.storage.snapshot().values():
             for lang_data in haiku_data.values():
                 if isinstance(lang_data, dict) and "model" in lang_data:
                     models_used.add(lang_data["model"])
@@ -152,6 +182,42 @@ class HaikuManager:
                 "rows": rows,
             }
 
+    def find_near_duplicates(
+        self, threshold: Optional[float] = None
+    ) -> dict[str, dict[str, list[list[dict[str, str]]]]]:
+        """
+        Recherche les grappes de quasi-doublons dans les citations et haïkus.
+
+        Args:
+            threshold: Seuil de Jaccard (défaut: configuration)
+
+        Returns:
+            {"quotes": {lang: grappes}, "haikus": {lang: grappes}}, chaque
+            grappe étant une liste de {"id": ..., "text": ...}
+        """
+        quotes = [Quote(**q) for q in CLASSIC_QUOTES]
+        report = {"quotes": {}, "haikus": {}}
+
+        for lang in ["fr", "en"]:
+            texts = {q.id: q.text[lang] for q in quotes if q.text.get(lang)}
+            index = NearDuplicateIndex.from_items(texts.items(), threshold)
+            report["quotes"][lang] = [
+                [{"id": key, "text": texts[key]} for key in cluster]
+                for cluster in index.clusters()
+            ]
+
+            texts = {
+                f"{quote_id}#{position}": text
+                for _, (quote_id, position), text in self.storage.iter_haiku_texts(lang)
+            }
+            index = NearDuplicateIndex.from_items(texts.items(), threshold)
+            report["haikus"][lang] = [
+                [{"id": key, "text": texts[key]} for key in cluster]
+                for cluster in index.clusters()
+            ]
+
+        return report
+
     def calculate_cost_estimate(
         self, num_quotes: int, batch_size: int = 5
     ) -> dict[str, Any]:
@@ -5,6 +5,22 @@ Modèles de données pour l'application.
 from pydantic import BaseModel, Field
 
 
+def localize(values: dict[str, str], language: str) -> str:
+    """
+    Retourne la valeur dans la langue demandée, avec repli sur le français.
+
+    Args:
+        values: Dictionnaire {langue: texte}
+        language: Code langue (fr/en)
+
+    Returns:
+        Le texte localisé ("" si absent)
+    """
+    if isinstance(values, dict):
+        return values.get(language, values.get("fr", ""))
+    return str(values)
+
+
 class Quote(BaseModel):
     """Modèle pour une citation."""
 
@@ -21,3 +37,33 @@ class QuoteInput(BaseModel):
     text: str = Field(min_length=1)
     author: str = Field(min_length=1)
     category: str = Field(default="personal", pattern="^(classic|personal|humor)$")
+
+
+class QuoteView(BaseModel):
+    """Vue à plat d'une citation, projetée dans une seule langue."""
+
+    id: str
+    text: str
+    author: str
+    category: str
+    type: str
+
+    @classmethod
+    def from_quote(cls, quote: Quote, language: str) -> "QuoteView":
+        """
+        Projette une citation validée dans une langue (sans re-validation).
+
+        Args:
+            quote: Citation source
+            language: Code langue (fr/en)
+
+        Returns:
+            La vue à plat de la citation
+        """
+        return cls.model_construct(
+            id=quote.id,
+            text=localize(quote.text, language),
+            author=localize(quote.author, language),
+            category=quote.category,
+            type=quote.type,
+        )
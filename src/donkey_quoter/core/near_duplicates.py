@@ -0,0 +1,265 @@
+"""
+Détection de quasi-doublons par MinHash et LSH (locality-sensitive hashing).
+
+Chaque texte normalisé est découpé en n-grammes de caractères, résumé par une
+signature MinHash, puis rangé dans des seaux LSH par bandes. Une requête ne
+compare donc que les quelques candidats partageant un seau, au lieu de tout
+le corpus, avant de vérifier la similarité de Jaccard exacte.
+"""
+
+import re
+import unicodedata
+import zlib
+from collections.abc import Hashable, Iterable
+from typing import Optional
+
+import numpy as np
+
+from ..config.settings import settings
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_NON_WORD = re.compile(r"[^\w\s]", re.UNICODE)
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalise un texte pour la comparaison (casse, accents, ponctuation).
+
+    Args:
+        text: Texte brut
+
+    Returns:
+        Texte en minuscules, sans accents ni ponctuation, espaces compactés
+    """
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", without_accents)).strip()
+
+
+def shingles(text: str, size: int = 4) -> frozenset[str]:
+    """
+    Découpe un texte normalisé en n-grammes de caractères.
+
+    Args:
+        text: Texte à découper
+        size: Taille des n-grammes
+
+    Returns:
+        Ensemble des n-grammes (le texte entier s'il est plus court)
+    """
+    normalized = normalize_text(text)
+    if len(normalized) <= size:
+        return frozenset([normalized]) if normalized else frozenset()
+    return frozenset(
+        normalized[i : i + size] for i in range(len(normalized) - size + 1)
+    )
+
+
+def jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    """Similarité de Jaccard entre deux ensembles."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _optimal_bands(num_perm: int, threshold: float) -> tuple[int, int]:
+    """
+    Choisit le découpage (bandes, lignes) de la signature.
+
+    Retient le seuil LSH approché (1/b)^(1/r) le plus haut restant sous le
+    seuil demandé, pour privilégier le rappel sans exploser les candidats.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+class NearDuplicateIndex:
+    """Index MinHash/LSH de textes, interrogeable en temps sous-linéaire."""
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        shingle_size: int = 4,
+        seed: int = 1,
+    ):
+        """
+        Initialise l'index.
+
+        Args:
+            threshold: Seuil de similarité de Jaccard d'un quasi-doublon
+            num_perm: Nombre de permutations de la signature MinHash
+            shingle_size: Taille des n-grammes de caractères
+            seed: Graine des permutations (signatures reproductibles)
+        """
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = _optimal_bands(num_perm, threshold)
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        self._buckets: list[dict[bytes, set[Hashable]]] = [
+            {} for _ in range(self.bands)
+        ]
+        self._shingles: dict[Hashable, frozenset[str]] = {}
+        self._band_keys: dict[Hashable, list[bytes]] = {}
+
+    def __len__(self) -> int:
+        return len(self._shingles)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._shingles
+
+    def signature(self, items: frozenset[str]) -> np.ndarray:
+        """Calcule la signature MinHash d'un ensemble de n-grammes."""
+        if not items:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        hashes = np.fromiter(
+            (zlib.crc32(item.encode("utf-8")) for item in items),
+            dtype=np.uint64,
+            count=len(items),
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=0)
+
+    def _bands_of(self, items: frozenset[str]) -> list[bytes]:
+        """Découpe la signature en clés de bandes LSH."""
+        sig = self.signature(items)
+        return [
+            sig[i * self.rows : (i + 1) * self.rows].tobytes()
+            for i in range(self.bands)
+        ]
+
+    def add(self, key: Hashable, text: str):
+        """
+        Ajoute (ou remplace) un texte dans l'index.
+
+        Args:
+            key: Identifiant du texte
+            text: Texte brut
+        """
+        if key in self._shingles:
+            self.remove(key)
+        items = shingles(text, self.shingle_size)
+        band_keys = self._bands_of(items)
+        for bucket, band_key in zip(self._buckets, band_keys):
+            bucket.setdefault(band_key, set()).add(key)
+        self._shingles[key] = items
+        self._band_keys[key] = band_keys
+
+    def remove(self, key: Hashable):
+        """Retire un texte de l'index."""
+        band_keys = self._band_keys.pop(key, None)
+        if band_keys is None:
+            return
+        del self._shingles[key]
+        for bucket, band_key in zip(self._buckets, band_keys):
+            members = bucket.get(band_key)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del bucket[band_key]
+
+    def _candidates(self, band_keys: list[bytes]) -> set[Hashable]:
+        candidates: set[Hashable] = set()
+        for bucket, band_key in zip(self._buckets, band_keys):
+            candidates.update(bucket.get(band_key, ()))
+        return candidates
+
+    def query(
+        self, text: str, threshold: Optional[float] = None
+    ) -> list[tuple[Hashable, float]]:
+        """
+        Cherche les quasi-doublons d'un texte.
+
+        Args:
+            text: Texte brut à comparer
+            threshold: Seuil de Jaccard (défaut: celui de l'index)
+
+        Returns:
+            Liste de (clé, similarité) triée par similarité décroissante
+        """
+        threshold = self.threshold if threshold is None else threshold
+        items = shingles(text, self.shingle_size)
+        matches = []
+        for key in self._candidates(self._bands_of(items)):
+            score = jaccard(items, self._shingles[key])
+            if score >= threshold:
+                matches.append((key, score))
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches
+
+    def find(self, text: str, threshold: Optional[float] = None) -> Optional[Hashable]:
+        """Retourne la clé du plus proche quasi-doublon, ou None."""
+        matches = self.query(text, threshold)
+        return matches[0][0] if matches else None
+
+    def clusters(self, threshold: Optional[float] = None) -> list[list[Hashable]]:
+        """
+        Regroupe les textes indexés en grappes de quasi-doublons.
+
+        Args:
+            threshold: Seuil de Jaccard (défaut: celui de l'index)
+
+        Returns:
+            Grappes d'au moins deux clés, les plus grandes en premier
+        """
+        threshold = self.threshold if threshold is None else threshold
+        parent: dict[Hashable, Hashable] = {}
+
+        def root(key: Hashable) -> Hashable:
+            while parent.get(key, key) != key:
+                key = parent[key]
+            return key
+
+        for key, band_keys in self._band_keys.items():
+            for other in self._candidates(band_keys):
+                if other == key or root(other) == root(key):
+                    continue
+                if jaccard(self._shingles[key], self._shingles[other]) >= threshold:
+                    parent[root(other)] = root(key)
+
+        groups: dict[Hashable, list[Hashable]] = {}
+        for key in self._shingles:
+            groups.setdefault(root(key), []).append(key)
+        return sorted(
+            (group for group in groups.values() if len(group) > 1),
+            key=len,
+            reverse=True,
+        )
+
+    @classmethod
+    def from_settings(cls, threshold: Optional[float] = None) -> "NearDuplicateIndex":
+        """
+        Crée un index vide configuré par ``settings.deduplication``.
+
+        Args:
+            threshold: Seuil de Jaccard (défaut: configuration)
+        """
+        config = settings.deduplication
+        return cls(
+            threshold=config.threshold if threshold is None else threshold,
+            num_perm=config.num_perm,
+            shingle_size=config.shingle_size,
+        )
+
+    @classmethod
+    def from_items(
+        cls, items: Iterable[tuple[Hashable, str]], threshold: Optional[float] = None
+    ) -> "NearDuplicateIndex":
+        """Construit un index configuré à partir de paires (clé, texte)."""
+        index = cls.from_settings(threshold)
+        for key, text in items:
+            index.add(key, text)
+        return index
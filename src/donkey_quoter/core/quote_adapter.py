@@ -11,7 +11,8 @@ from typing import Optional
 
 import streamlit as st
 
-from .models import Quote, QuoteInput
+from .collection import QuoteCollection
+from .models import Quote, QuoteInput, QuoteView, localize
 from .services import DonkeyQuoterService
 
 # Détermine si on utilise le backend API ou les services directs
@@ -57,9 +58,9 @@ class QuoteAdapter:
                     data_loader.get_default_quotes_path()
                 )
         if "saved_quotes" not in st.session_state:
-            st.session_state.saved_quotes = []
+            st.session_state.saved_quotes = QuoteCollection()
         if "saved_poems" not in st.session_state:
-            st.session_state.saved_poems = []
+            st.session_state.saved_poems = QuoteCollection()
         if "original_quote" not in st.session_state:
             st.session_state.original_quote = None
 
@@ -79,12 +80,12 @@ class QuoteAdapter:
         st.session_state.current_quote = quote
 
     @property
-    def saved_quotes(self) -> list[Quote]:
+    def saved_quotes(self) -> QuoteCollection:
         """Retourne les citations sauvegardées."""
         return st.session_state.saved_quotes
 
     @property
-    def saved_poems(self) -> list[Quote]:
+    def saved_poems(self) -> QuoteCollection:
         """Retourne les poèmes sauvegardés."""
         return st.session_state.saved_poems
 
@@ -101,9 +102,41 @@ class QuoteAdapter:
     def get_text(self, text_dict: dict[str, str], language: str) -> str:
         """Obtient le texte dans la langue spécifiée."""
         # Cette méthode est purement locale, pas besoin d'appeler l'API
-        if isinstance(text_dict, dict):
-            return text_dict.get(language, text_dict.get("fr", ""))
-        return str(text_dict)
+        return localize(text_dict, language)
+
+    def get_quote_views(
+        self, language: str, quotes: Optional[list[Quote]] = None
+    ) -> list[QuoteView]:
+        """
+        Retourne les vues à plat des citations dans une langue.
+
+        Les vues sont calculées une fois par liste et par langue puis gardées
+        en session, au lieu de résoudre la langue à chaque rendu. Le cache
+        garde une référence à la liste (son identité ne peut donc pas être
+        réutilisée par une autre liste) et est vidé à chaque modification des
+        citations par l'adaptateur.
+
+        Args:
+            language: Code langue (fr/en)
+            quotes: Citations à projeter (défaut: toutes les citations)
+
+        Returns:
+            Vues dans le même ordre que les citations
+        """
+        quotes = self.quotes if quotes is None else quotes
+        if "quote_views" not in st.session_state:
+            st.session_state.quote_views = {}
+        cache = st.session_state.quote_views
+        # Une seule version par langue : (liste source, taille, vues)
+        cached = cache.get(language)
+        if cached is None or cached[0] is not quotes or cached[1] != len(quotes):
+            views = [QuoteView.from_quote(q, language) for q in quotes]
+            cached = cache[language] = (quotes, len(quotes), views)
+        return cached[2]
+
+    def _invalidate_views(self):
+        """Oublie les vues calculées (citations ajoutées, modifiées, supprimées)."""
+        st.session_state.quote_views = {}
 
     def add_quote(self, quote_input: QuoteInput, language: str) -> Quote:
         """Ajoute une nouvelle citation."""
@@ -118,9 +151,9 @@ class QuoteAdapter:
             if quote:
                 # Ajouter localement aussi pour la session
                 st.session_state.quotes.insert(0, quote)
+                self._invalidate_views()
                 self.current_quote = quote
-                if quote not in st.session_state.saved_quotes:
-                    st.session_state.saved_quotes.append(quote)
+                st.session_state.saved_quotes.add(quote)
             return quote
         else:
             # Mode direct
@@ -128,11 +161,10 @@ class QuoteAdapter:
             st.session_state.quotes = self.service.add_quote_to_list(
                 st.session_state.quotes, quote
             )
+            self._invalidate_views()
             self.current_quote = quote
             # Sauvegarder automatiquement
-            st.session_state.saved_quotes, _ = self.service.add_quote_if_not_exists(
-                st.session_state.saved_quotes, quote
-            )
+            st.session_state.saved_quotes.add(quote)
             return quote
 
     def update_quote(self, quote_id: str, quote_input: QuoteInput, language: str):
@@ -149,12 +181,14 @@ class QuoteAdapter:
                     quotes[i] = updated_quote
                     break
             st.session_state.quotes = quotes
+            self._invalidate_views()
 
     def delete_quote(self, quote_id: str):
         """Supprime une citation."""
         st.session_state.quotes = self.service.remove_quote_by_id(
             st.session_state.quotes, quote_id
         )
+        self._invalidate_views()
         if self.current_quote and self.current_quote.id == quote_id:
             if st.session_state.quotes:
                 self.current_quote = st.session_state.quotes[0]
@@ -177,21 +211,13 @@ class QuoteAdapter:
     def save_current_quote(self) -> bool:
         """Sauvegarde la citation courante."""
         if self.current_quote:
-            saved_quotes, was_added = self.service.add_quote_if_not_exists(
-                st.session_state.saved_quotes, self.current_quote
-            )
-            st.session_state.saved_quotes = saved_quotes
-            return was_added
+            return st.session_state.saved_quotes.add(self.current_quote)
         return False
 
     def save_current_poem(self) -> bool:
         """Sauvegarde le poème courant."""
         if self.current_quote and self.current_quote.category == "poem":
-            saved_poems, was_added = self.service.add_quote_if_not_exists(
-                st.session_state.saved_poems, self.current_quote
-            )
-            st.session_state.saved_poems = saved_poems
-            return was_added
+            return st.session_state.saved_poems.add(self.current_quote)
         return False
 
     def export_saved_data(self) -> str:
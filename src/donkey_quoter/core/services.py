@@ -6,12 +6,27 @@ Consolide toutes les fonctionnalités en un seul service.
 import json
 import os
 import random
+from collections.abc import Iterable, Iterator
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Optional
 
 from ..config.settings import settings
 from ..prompts.haiku_prompts import build_haiku_prompt
-from .models import Quote, QuoteInput
+from ..timing import timed
+from .collection import QuoteCollection
+from .models import Quote, QuoteInput, localize
+
+
+class DuplicateQuoteError(Exception):
+    """Levée quand une nouvelle citation est quasi identique à une existante."""
+
+    def __init__(self, duplicate_id: str):
+        """
+        Args:
+            duplicate_id: ID de la citation existante
+        """
+        super().__init__(f"Citation quasi identique à {duplicate_id}")
+        self.duplicate_id = duplicate_id
 
 
 class DonkeyQuoterService:
@@ -35,9 +50,7 @@ class DonkeyQuoterService:
 
     def get_text(self, text_dict: dict[str, str], language: str) -> str:
         """Obtient le texte dans la langue spécifiée."""
-        if isinstance(text_dict, dict):
-            return text_dict.get(language, text_dict.get("fr", ""))
-        return str(text_dict)
+        return localize(text_dict, language)
 
     def get_random_quote(self, quotes: list[Quote]) -> Optional[Quote]:
         """Retourne une citation aléatoire."""
@@ -73,6 +86,37 @@ class DonkeyQuoterService:
             type="user",
         )
 
+    def create_quote_deduplicated(
+        self,
+        quote_input: QuoteInput,
+        language: str,
+        find_near_duplicate: Callable[[str, str], Optional[str]],
+    ) -> tuple[Quote, Optional[str]]:
+        """
+        Crée une citation en appliquant ``settings.deduplication.quote_policy``.
+
+        Args:
+            quote_input: Données de la citation
+            language: Langue de saisie
+            find_near_duplicate: Recherche d'un quasi-doublon (texte, langue)
+                retournant l'ID de la citation existante ou None
+
+        Returns:
+            (citation, ID du quasi-doublon signalé ou None)
+
+        Raises:
+            DuplicateQuoteError: Si un quasi-doublon existe et que la
+                politique est "reject"
+        """
+        duplicate_id = None
+        policy = settings.deduplication.quote_policy
+        if policy != "off":
+            with timed("dedup"):
+                duplicate_id = find_near_duplicate(quote_input.text, language)
+            if duplicate_id and policy == "reject":
+                raise DuplicateQuoteError(duplicate_id)
+        return self.create_quote_from_input(quote_input, language), duplicate_id
+
     def update_quote_from_input(
         self, quote: Quote, quote_input: QuoteInput, language: str
     ) -> Quote:
@@ -102,24 +146,27 @@ class DonkeyQuoterService:
         new_quotes.insert(0, quote)
         return new_quotes
 
-    def is_quote_in_list(self, quotes: list[Quote], quote: Quote) -> bool:
-        """Vérifie si une citation est dans la liste."""
+    def is_quote_in_list(self, quotes: QuoteCollection, quote: Quote) -> bool:
+        """Vérifie si une citation est dans la collection (par ID, O(1))."""
         return quote in quotes
 
     def add_quote_if_not_exists(
-        self, quotes: list[Quote], quote: Quote
-    ) -> tuple[list[Quote], bool]:
-        """Ajoute une citation si elle n'existe pas déjà."""
-        if self.is_quote_in_list(quotes, quote):
-            return quotes, False
-        new_quotes = quotes.copy()
-        new_quotes.append(quote)
-        return new_quotes, True
+        self, quotes: QuoteCollection, quote: Quote
+    ) -> tuple[QuoteCollection, bool]:
+        """
+        Ajoute une citation si son ID n'est pas déjà présent.
+
+        La collection est modifiée sur place (pas de copie) et retournée
+        pour compatibilité avec l'ancienne interface à base de listes.
+        """
+        return quotes, quotes.add(quote)
 
     def export_quotes_to_json(
-        self, saved_quotes: list[Quote], saved_poems: list[Quote]
+        self, saved_quotes: Iterable[Quote], saved_poems: Iterable[Quote]
     ) -> str:
         """Exporte les citations sauvegardées au format JSON."""
+        saved_quotes = list(saved_quotes)
+        saved_poems = list(saved_poems)
         data = {
             "savedQuotes": [q.model_dump() for q in saved_quotes],
             "savedPoems": [p.model_dump() for p in saved_poems],
@@ -146,7 +193,11 @@ class DonkeyQuoterService:
         return self.api_client is not None and generation_count < 5
 
     def generate_via_api(
-        self, quote_text: str, quote_author: str, language: str
+        self,
+        quote_text: str,
+        quote_author: str,
+        language: str,
+        deadline: Optional[float] = None,
     ) -> Optional[str]:
         """
         Génère un haïku via l'API Claude.
@@ -155,14 +206,61 @@ class DonkeyQuoterService:
             quote_text: Texte de la citation
             quote_author: Auteur de la citation
             language: Langue du haïku
+            deadline: Échéance absolue (``time.monotonic()``) transmise au
+                client : les retries s'arrêtent avant
 
         Returns:
-            Le haïku généré ou None en cas d'erreur
+            Le haïku généré ou None en cas d'erreur (échéance dépassée incluse)
         """
         if not self.api_client:
             return None
 
         try:
+            prompt = self._build_prompt(quote_text, quote_author, language)
+
+            # Appel générique à l'API (chronométré par le client)
+            haiku_raw = self.api_client.call_claude(prompt, deadline=deadline)
+
+            # Vérifier et formater le haïku
+            with timed("format"):
+                return self.format_haiku(haiku_raw)
+
+        except Exception:
+            return None
+
+    def stream_via_api(
+        self,
+        quote_text: str,
+        quote_author: str,
+        language: str,
+        deadline: Optional[float] = None,
+    ) -> Iterator[str]:
+        """
+        Génère un haïku via l'API Claude, fragment par fragment.
+
+        Le texte brut reçu doit ensuite être validé avec ``format_haiku``.
+
+        Args:
+            quote_text: Texte de la citation
+            quote_author: Auteur de la citation
+            language: Langue du haïku
+            deadline: Échéance absolue (``time.monotonic()``), optionnelle
+
+        Yields:
+            Les fragments de texte bruts
+
+        Raises:
+            Exception: Si le client est absent ou en cas d'erreur de l'API
+        """
+        if not self.api_client:
+            raise RuntimeError("Client API non configuré")
+
+        prompt = self._build_prompt(quote_text, quote_author, language)
+        yield from self.api_client.stream_claude(prompt, deadline=deadline)
+
+    def _build_prompt(self, quote_text: str, quote_author: str, language: str) -> str:
+        """Construit le prompt de génération (tronqué à la limite d'entrée)."""
+        with timed("prompt"):
             # Construire le prompt avec le module dédié
             prompt = build_haiku_prompt(quote_text, quote_author, language)
 
@@ -170,17 +268,9 @@ class DonkeyQuoterService:
             max_chars = getattr(self.api_client, "max_tokens_input", 200) * 4
             if len(prompt) > max_chars:
                 prompt = prompt[:max_chars]
+            return prompt
 
-            # Appel générique à l'API
-            haiku_raw = self.api_client.call_claude(prompt)
-
-            # Vérifier et formater le haïku
-            return self._format_haiku(haiku_raw)
-
-        except Exception:
-            return None
-
-    def _format_haiku(self, haiku_text: str) -> str:
+    def format_haiku(self, haiku_text: str) -> str:
         """
         Formate et valide un haïku généré.
 
@@ -309,8 +399,8 @@ class DonkeyQuoterService:
         Returns:
             Tuple (haiku_text, model_used, was_generated_via_api)
         """
-        quote_text = quote.text.get(language, quote.text.get("fr", ""))
-        quote_author = quote.author.get(language, quote.author.get("fr", ""))
+        quote_text = localize(quote.text, language)
+        quote_author = localize(quote.author, language)
 
         # Stratégie 1: Génération via API si demandée et possible
         if force_new and self.can_generate_new_haiku(generation_count):
@@ -0,0 +1,254 @@
+"""
+Index TF-IDF pour recommander des citations similaires.
+
+L'index est construit avec NumPy sous forme creuse (postings par terme, poids
+float32 normalisés L2) afin de répondre à une requête par un seul passage
+vectorisé de similarité cosinus suivi d'un ``argpartition``.
+"""
+
+import math
+import re
+import threading
+from typing import Optional
+
+import numpy as np
+
+from .models import Quote
+
+# Mots trop fréquents pour être discriminants
+STOP_WORDS: dict[str, frozenset[str]] = {
+    "fr": frozenset(
+        "le la les un une des du de d l et ou en au aux à a ce ces qui que qu "
+        "ne pas plus est sont il elle on se sa son ses sur pour par dans avec "
+        "mais c s n y t j m".split()
+    ),
+    "en": frozenset(
+        "the a an and or of to in on at is are be it its his her he she they "
+        "that this than for with as by but not no s t".split()
+    ),
+}
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str, language: str = "fr") -> list[str]:
+    """
+    Découpe un texte en termes normalisés.
+
+    Args:
+        text: Texte à découper
+        language: Langue pour le filtrage des mots vides
+
+    Returns:
+        Liste des termes (minuscules, sans mots vides)
+    """
+    stop_words = STOP_WORDS.get(language, frozenset())
+    return [
+        token
+        for token in _TOKEN_PATTERN.findall(text.lower())
+        if token not in stop_words and not token.isdigit()
+    ]
+
+
+class TfidfMatrix:
+    """
+    Matrice TF-IDF creuse d'un corpus pour une langue.
+
+    Stockée par colonne (terme -> documents) pour que le produit
+    matrice-vecteur d'une requête ne touche que les postings de ses termes.
+    """
+
+    def __init__(self, documents: list[str], language: str = "fr"):
+        """
+        Construit la matrice pour une liste de documents.
+
+        Args:
+            documents: Textes du corpus (un par citation, dans l'ordre)
+            language: Langue des documents
+        """
+        self.language = language
+        self.n_docs = len(documents)
+        self.vocabulary: dict[str, int] = {}
+
+        doc_ids: list[int] = []
+        term_ids: list[int] = []
+        counts: list[int] = []
+        for doc_id, text in enumerate(documents):
+            tf: dict[int, int] = {}
+            for token in tokenize(text, language):
+                term_id = self.vocabulary.setdefault(token, len(self.vocabulary))
+                tf[term_id] = tf.get(term_id, 0) + 1
+            doc_ids.extend([doc_id] * len(tf))
+            term_ids.extend(tf.keys())
+            counts.extend(tf.values())
+
+        docs = np.asarray(doc_ids, dtype=np.int32)
+        terms = np.asarray(term_ids, dtype=np.int32)
+        n_terms = len(self.vocabulary)
+
+        # IDF lissé (comme scikit-learn) : log((1 + n) / (1 + df)) + 1
+        df = np.bincount(terms, minlength=n_terms).astype(np.float32)
+        self.idf = (np.log((1.0 + self.n_docs) / (1.0 + df)) + 1.0).astype(np.float32)
+
+        # TF sous-linéaire puis normalisation L2 par document
+        weights = (1.0 + np.log(np.asarray(counts, dtype=np.float32))) * self.idf[terms]
+        norms = np.sqrt(
+            np.bincount(docs, weights=weights * weights, minlength=self.n_docs)
+        ).astype(np.float32)
+        norms[norms == 0] = 1.0
+        weights = (weights / norms[docs]).astype(np.float32)
+
+        # Tri par terme pour obtenir un stockage colonne (CSC)
+        order = np.argsort(terms, kind="stable")
+        self.indices = docs[order]
+        self.data = weights[order]
+        self.indptr = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(df.astype(np.int64), out=self.indptr[1:])
+
+        # Vecteur de chaque document (termes, poids) pour les requêtes par ID
+        row_order = np.argsort(docs[order], kind="stable")
+        self._row_terms = terms[order][row_order]
+        self._row_data = self.data[row_order]
+        self._row_ptr = np.zeros(self.n_docs + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(docs, minlength=self.n_docs).astype(np.int64),
+            out=self._row_ptr[1:],
+        )
+
+    def row(self, doc_id: int) -> tuple[np.ndarray, np.ndarray]:
+        """Retourne le vecteur creux (termes, poids) d'un document."""
+        start, end = self._row_ptr[doc_id], self._row_ptr[doc_id + 1]
+        return self._row_terms[start:end], self._row_data[start:end]
+
+    def scores(self, terms: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """
+        Calcule la similarité cosinus d'une requête avec tous les documents.
+
+        Args:
+            terms: Indices des termes de la requête
+            weights: Poids normalisés de la requête
+
+        Returns:
+            Tableau float32 de taille n_docs
+        """
+        starts = self.indptr[terms]
+        lengths = self.indptr[terms + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.zeros(self.n_docs, dtype=np.float32)
+
+        # Positions de tous les postings concernés, sans boucle Python
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        positions = offsets + np.arange(total, dtype=np.int64)
+        contributions = self.data[positions] * np.repeat(weights, lengths)
+        return np.bincount(
+            self.indices[positions], weights=contributions, minlength=self.n_docs
+        ).astype(np.float32)
+
+
+class QuoteSimilarityIndex:
+    """
+    Index de similarité des citations, une matrice TF-IDF par langue.
+
+    La première construction est synchrone. Ensuite, quand le corpus change,
+    la reconstruction se fait dans un thread d'arrière-plan et l'ancien index
+    continue de répondre jusqu'à ce que le nouveau soit prêt.
+    """
+
+    LANGUAGES = ("fr", "en")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fingerprint: Optional[int] = None
+        self._building: Optional[int] = None
+        self._source: Optional[list[Quote]] = None
+        self._quotes: list[Quote] = []
+        self._positions: dict[str, int] = {}
+        self._matrices: dict[str, TfidfMatrix] = {}
+
+    @staticmethod
+    def _compute_fingerprint(quotes: list[Quote]) -> int:
+        """Empreinte du corpus (ids et textes) pour détecter les changements."""
+        return hash(tuple((q.id, tuple(sorted(q.text.items()))) for q in quotes))
+
+    def _build(self, quotes: list[Quote], fingerprint: int):
+        """Construit les matrices puis remplace l'index courant."""
+        matrices = {
+            lang: TfidfMatrix(
+                [q.text.get(lang, q.text.get("fr", "")) for q in quotes], lang
+            )
+            for lang in self.LANGUAGES
+        }
+        positions = {q.id: i for i, q in enumerate(quotes)}
+        with self._lock:
+            self._quotes = list(quotes)
+            self._positions = positions
+            self._matrices = matrices
+            self._fingerprint = fingerprint
+            if self._building == fingerprint:
+                self._building = None
+
+    def ensure(self, quotes: list[Quote], background: bool = True):
+        """
+        S'assure que l'index correspond au corpus fourni.
+
+        Args:
+            quotes: Corpus courant
+            background: Reconstruire en arrière-plan si un index existe déjà
+        """
+        # Chemin rapide : même liste que lors du dernier appel
+        if quotes is self._source:
+            return
+        self._source = quotes
+
+        fingerprint = self._compute_fingerprint(quotes)
+        with self._lock:
+            if fingerprint in (self._fingerprint, self._building):
+                return
+            has_index = self._fingerprint is not None
+            self._building = fingerprint
+
+        if background and has_index:
+            threading.Thread(
+                target=self._build,
+                args=(list(quotes), fingerprint),
+                name="similarity-index-build",
+                daemon=True,
+            ).start()
+        else:
+            self._build(quotes, fingerprint)
+
+    def similar(
+        self, quote_id: str, language: str = "fr", k: int = 5
+    ) -> Optional[list[tuple[Quote, float]]]:
+        """
+        Retourne les k citations les plus proches d'une citation.
+
+        Args:
+            quote_id: ID de la citation de référence
+            language: Langue utilisée pour la comparaison
+            k: Nombre de résultats
+
+        Returns:
+            Liste de (citation, score) triée par score décroissant,
+            ou None si la citation n'est pas indexée
+        """
+        with self._lock:
+            quotes = self._quotes
+            position = self._positions.get(quote_id)
+            matrix = self._matrices.get(language) or self._matrices.get("fr")
+
+        if position is None or matrix is None:
+            return None
+
+        terms, weights = matrix.row(position)
+        scores = matrix.scores(terms, weights)
+        scores[position] = -math.inf
+
+        k = min(k, matrix.n_docs - 1)
+        if k <= 0:
+            return []
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(quotes[i], float(scores[i])) for i in top if scores[i] > 0]
@@ -2,13 +2,18 @@
 Service de stockage pour gérer la persistance des données (logique pure, sans UI).
 """
 
+import hashlib
 import json
 import random
-from datetime import datetime
+import threading
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional, Union
 
+from ..config.settings import settings
+from ..timing import timed
 from .models import Quote
+from .near_duplicates import NearDuplicateIndex
 
 
 class DataStorage:
@@ -29,6 +34,28 @@ class DataStorage:
         # Charger les données existantes
         self.haikus_data = self._load_haikus()
 
+        # Version des haïkus : incrémentée à chaque sauvegarde (caches locaux)
+        self.version = 0
+        # Empreinte du fichier des haïkus : identique d'un worker à l'autre
+        # pour un même contenu (validateurs HTTP)
+        self.content_hash = (
+            _content_hash(self.haikus_file.read_bytes())
+            if self.haikus_file.exists()
+            else ""
+        )
+        self.last_modified = (
+            datetime.fromtimestamp(self.haikus_file.stat().st_mtime, timezone.utc)
+            if self.haikus_file.exists()
+            else datetime.now(timezone.utc)
+        )
+
+        # Index MinHash des haïkus par langue (construit à la demande)
+        self._haiku_index: Optional[dict[str, NearDuplicateIndex]] = None
+
+        # Écritures sérialisées : l'API ajoute des haïkus depuis plusieurs
+        # threads (vérification des doublons, ajout, index et sauvegarde)
+        self._lock = threading.RLock()
+
     def _load_haikus(self) -> dict[str, dict[str, list[Union[str, dict]]]]:
         """
         Charge les haïkus depuis le fichier.
@@ -76,8 +103,89 @@ class DataStorage:
 
     def _save_haikus(self):
         """Sauvegarde les haïkus dans le fichier."""
-        with open(self.haikus_file, "w", encoding="utf-8") as f:
-            json.dump(self.haikus_data, f, ensure_ascii=False, indent=2)
+        with self._lock:
+            with timed("storage_save"):
+                payload = json.dumps(
+                    self.snapshot(), ensure_ascii=False, indent=2
+                ).encode("utf-8")
+                self.haikus_file.write_bytes(payload)
+            self.content_hash = _content_hash(payload)
+            self.version += 1
+            self.last_modified = datetime.now(timezone.utc)
+
+    def snapshot(self) -> dict[str, dict[str, list[Union[str, dict]]]]:
+        """
+        Retourne un instantané cohérent des haïkus.
+
+        Les dictionnaires de langues et listes de haïkus sont remplacés, jamais
+        modifiés en place (copie sur écriture) : une copie superficielle prise
+        sous le verrou suffit, et peut être parcourue sans verrou.
+
+        Returns:
+            Dict au format {quote_id: {lang: [haiku_data, ...]}}
+        """
+        with self._lock:
+            return dict(self.haikus_data)
+
+    def iter_haiku_texts(self, language: Optional[str] = None):
+        """Itère sur ((quote_id, position), texte) des haïkus stockés."""
+        for quote_id, languages in self.snapshot().items():
+            for lang, haikus in languages.items():
+                if language is not None and lang != language:
+                    continue
+                for position, haiku in enumerate(haikus):
+                    text = haiku.get("text") if isinstance(haiku, dict) else haiku
+                    if text:
+                        yield lang, (quote_id, position), text
+
+    def get_haiku_index(self, language: str) -> NearDuplicateIndex:
+        """
+        Retourne l'index de quasi-doublons des haïkus d'une langue.
+
+        Args:
+            language: Langue des haïkus
+
+        Returns:
+            Index MinHash/LSH dont les clés sont (quote_id, position)
+        """
+        with self._lock:
+            if self._haiku_index is None:
+                self._haiku_index = {}
+                for lang, key, text in self.iter_haiku_texts():
+                    if lang not in self._haiku_index:
+                        self._haiku_index[lang] = NearDuplicateIndex.from_settings()
+                    self._haiku_index[lang].add(key, text)
+            if language not in self._haiku_index:
+                self._haiku_index[language] = NearDuplicateIndex.from_settings()
+            return self._haiku_index[language]
+
+    def find_near_duplicate_haiku(
+        self,
+        haiku: str,
+        language: str,
+        threshold: Optional[float] = None,
+        quote_id: Optional[str] = None,
+    ) -> Optional[tuple[str, int]]:
+        """
+        Cherche un haïku stocké quasi identique.
+
+        Args:
+            haiku: Texte du haïku
+            language: Langue du haïku
+            threshold: Seuil de Jaccard (défaut: configuration)
+            quote_id: Ne chercher que parmi les haïkus de cette citation
+
+        Returns:
+            (quote_id, position) du plus proche quasi-doublon ou None
+        """
+        with self._lock:
+            index = self.get_haiku_index(language)
+            if quote_id is None:
+                return index.find(haiku, threshold)
+            for key, _ in index.query(haiku, threshold):
+                if key[0] == quote_id:
+                    return key
+            return None
 
     # Méthodes pour les haïkus
     def get_haiku(self, quote_id: str, language: str) -> Optional[str]:
@@ -112,6 +220,10 @@ class DataStorage:
         Returns:
             Dict avec text, generated_at, model ou None
         """
+        with timed("storage_read"):
+            return self._get_haiku_with_metadata(quote_id, language)
+
+    def _get_haiku_with_metadata(self, quote_id: str, language: str) -> Optional[dict]:
         if quote_id in self.haikus_data:
             haikus = self.haikus_data[quote_id].get(language, [])
             if haikus:
@@ -128,22 +240,64 @@ class DataStorage:
                     }
         return None
 
-    def add_haiku(self, quote_id: str, haiku: str, language: str, model: str = None):
+    def get_all_haikus(self, quote_id: str, language: str) -> list[dict]:
+        """
+        Récupère tous les haïkus d'une citation avec leurs métadonnées.
+
+        Args:
+            quote_id: ID de la citation
+            language: Langue des haïkus
+
+        Returns:
+            Liste de dicts avec text, generated_at, model (ordre d'ajout)
+        """
+        haikus = self.haikus_data.get(quote_id, {}).get(language, [])
+        return [
+            haiku
+            if isinstance(haiku, dict)
+            else {"text": haiku, "generated_at": "unknown", "model": "unknown"}
+            for haiku in haikus
+        ]
+
+    def _append_haikus(self, quote_id: str, language: str, entries: list[dict]):
+        """
+        Ajoute des haïkus à une citation par copie sur écriture.
+
+        Les dictionnaires de langues et listes de haïkus existants ne sont
+        jamais modifiés en place mais remplacés : une copie superficielle de
+        ``haikus_data`` suffit donc à figer un instantané cohérent (export).
+
+        Args:
+            quote_id: ID de la citation
+            language: Langue des haïkus
+            entries: Haïkus à ajouter
+        """
+        languages = self.haikus_data.get(quote_id, {"fr": [], "en": []})
+        self.haikus_data[quote_id] = {
+            **languages,
+            language: [*languages.get(language, []), *entries],
+        }
+
+    def add_haiku(
+        self, quote_id: str, haiku: str, language: str, model: str = None
+    ) -> bool:
         """
         Ajoute un haïku pour une citation avec métadonnées.
 
+        Les doublons exacts sont ignorés. Les quasi-doublons (MinHash) d'un
+        haïku de la même citation sont rejetés ou marqués selon
+        ``settings.deduplication.haiku_policy`` ; ceux d'une autre citation
+        sont seulement marqués (``near_duplicate_of``).
+
         Args:
             quote_id: ID de la citation
             haiku: Le haïku à ajouter
             language: Langue du haïku
             model: Modèle utilisé pour générer le haïku
-        """
-        if quote_id not in self.haikus_data:
-            self.haikus_data[quote_id] = {"fr": [], "en": []}
-
-        if language not in self.haikus_data[quote_id]:
-            self.haikus_data[quote_id][language] = []
 
+        Returns:
+            True si le haïku a été enregistré
+        """
         # Créer l'entrée avec métadonnées
         haiku_entry = {
             "text": haiku,
@@ -151,15 +305,71 @@ class DataStorage:
             "model": model or "unknown",
         }
 
-        # Éviter les doublons (basé sur le texte)
-        existing_texts = [
-            h.get("text") if isinstance(h, dict) else h
-            for h in self.haikus_data[quote_id][language]
-        ]
-
-        if haiku not in existing_texts:
-            self.haikus_data[quote_id][language].append(haiku_entry)
+        # Vérification, ajout, index et sauvegarde : un seul écrivain à la fois
+        with self._lock:
+            # Éviter les doublons (basé sur le texte)
+            existing = self.haikus_data.get(quote_id, {}).get(language, [])
+            existing_texts = [
+                h.get("text") if isinstance(h, dict) else h for h in existing
+            ]
+
+            if haiku in existing_texts:
+                return False
+
+            policy = settings.deduplication.haiku_policy
+            if policy != "off":
+                with timed("dedup"):
+                    duplicate = self.find_near_duplicate_haiku(haiku, language)
+                if duplicate is not None:
+                    # Seule une variante quasi identique de la même citation
+                    # est refusée ; un haïku proche de celui d'une autre
+                    # citation est seulement marqué
+                    if policy == "reject" and (
+                        duplicate[0] == quote_id
+                        or self.find_near_duplicate_haiku(
+                            haiku, language, quote_id=quote_id
+                        )
+                    ):
+                        return False
+                    haiku_entry["near_duplicate_of"] = duplicate[0]
+
+            self._append_haikus(quote_id, language, [haiku_entry])
+            if self._haiku_index is not None:
+                position = len(existing)
+                self.get_haiku_index(language).add((quote_id, position), haiku)
             self._save_haikus()
+            return True
+
+    def get_duplicate_haiku(
+        self, quote_id: str, haiku: str, language: str
+    ) -> Optional[dict]:
+        """
+        Retourne le haïku stocké qui empêche l'ajout de ``haiku``.
+
+        À appeler quand ``add_haiku`` a retourné False : doublon exact ou
+        quasi-doublon (politique "reject"), toujours parmi les haïkus de la
+        citation.
+
+        Args:
+            quote_id: ID de la citation
+            haiku: Le haïku refusé
+            language: Langue du haïku
+
+        Returns:
+            Dict avec text, generated_at, model ou None
+        """
+        with self._lock:
+            for entry in self.get_all_haikus(quote_id, language):
+                if entry["text"] == haiku:
+                    return entry
+            duplicate = self.find_near_duplicate_haiku(
+                haiku, language, quote_id=quote_id
+            )
+            if duplicate is None:
+                return None
+            entries = self.get_all_haikus(quote_id, language)
+            position = duplicate[1]
+            return entries[position] if position < len(entries) else None
 
     def has_haiku(self, quote_id: str, language: str) -> bool:
         """
@@ -230,7 +440,7 @@ class DataStorage:
             Dict avec haikus et quotes
         """
         return {
-            "haikus": self.haikus_data,
+            "haikus": self.snapshot(),
             "user_quotes": [q.model_dump() for q in self.load_user_quotes()],
             "export_date": datetime.now().isoformat(),
         }
@@ -244,31 +454,34 @@ class DataStorage:
         """
         # Importer haïkus
         if "haikus" in data:
-            imported_haikus = data["haikus"]
-            for quote_id, languages in imported_haikus.items():
-                if quote_id not in self.haikus_data:
-                    self.haikus_data[quote_id] = {"fr": [], "en": []}
-
-                for lang, haikus in languages.items():
-                    if lang not in self.haikus_data[quote_id]:
-                        self.haikus_data[quote_id][lang] = []
-
-                    # Ajouter sans doublons
-                    existing_texts = [
-                        h.get("text") if isinstance(h, dict) else h
-                        for h in self.haikus_data[quote_id][lang]
-                    ]
-
-                    for haiku in haikus:
-                        haiku_text = (
-                            haiku.get("text") if isinstance(haiku, dict) else haiku
-                        )
-                        if haiku_text not in existing_texts:
-                            self.haikus_data[quote_id][lang].append(haiku)
-
-            self._save_haikus()
+            with self._lock:
+                imported_haikus = data["haikus"]
+                for quote_id, languages in imported_haikus.items():
+                    for lang, haikus in languages.items():
+                        # Ajouter sans doublons
+                        existing_texts = [
+                            h.get("text") if isinstance(h, dict) else h
+                            for h in self.haikus_data.get(quote_id, {}).get(lang, [])
+                        ]
+
+                        new_haikus = [
+                            haiku
+                            for haiku in haikus
+                            if (haiku.get("text") if isinstance(haiku, dict) else haiku)
+                            not in existing_texts
+                        ]
+                        self._append_haikus(quote_id, lang, new_haikus)
+
+                # L'index des quasi-doublons sera reconstruit à la demande
+                self._haiku_index = None
+                self._save_haikus()
 
         # Importer citations utilisateur
         if "user_quotes" in data:
             user_quotes = [Quote(**q) for q in data["user_quotes"]]
             self.save_user_quotes(user_quotes)
+
+
+def _content_hash(payload: bytes) -> str:
+    """Empreinte courte d'un contenu sérialisé."""
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
@@ -3,10 +3,14 @@ Client API Anthropic pour l'infrastructure (séparé de la logique métier).
 """
 
 import os
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
 from contextlib import contextmanager
 from typing import TYPE_CHECKING, Optional
 
-from anthropic import Anthropic, RateLimitError
+from anthropic import Anthropic, APIStatusError, RateLimitError
 from dotenv import load_dotenv
 
 # Import conditionnel de Streamlit (évite l'erreur en mode API)
@@ -19,17 +23,230 @@ else:
         st = None  # type: ignore
 
 from tenacity import (
+    RetryCallState,
     retry,
     retry_if_not_exception_type,
     stop_after_attempt,
     wait_exponential,
 )
 
+from ..config.settings import settings
+from ..timing import current_timer, timed, timed_sleep
 from ..token_counter import TokenCounter
 
 load_dotenv()
 
 
+class DeadlineExceededError(Exception):
+    """Levée quand l'échéance d'un appel est dépassée avant une tentative."""
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    """
+    Temps restant avant une échéance.
+
+    Args:
+        deadline: Échéance absolue (``time.monotonic()``) ou None
+
+    Returns:
+        Secondes restantes, ou None sans échéance
+
+    Raises:
+        DeadlineExceededError: Si l'échéance est dépassée
+    """
+    if deadline is None:
+        return None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceededError("Échéance dépassée avant l'appel à Claude")
+    return remaining
+
+
+def _past_deadline(retry_state: RetryCallState) -> bool:
+    """Arrête les retries si l'attente suivante dépasserait l'échéance."""
+    deadline = retry_state.kwargs.get("deadline")
+    if deadline is None:
+        return False
+    upcoming = retry_state.upcoming_sleep or 0
+    return time.monotonic() + upcoming >= deadline
+
+
+# États du coupe-circuit
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Levée sans appeler Claude quand le coupe-circuit est ouvert."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(
+            f"API Claude indisponible (circuit ouvert, nouvel essai dans"
+            f" {retry_after:.0f} s)"
+        )
+        self.retry_after = retry_after
+
+
+def _is_outage(error: Exception) -> bool:
+    """Vrai si l'erreur vient de l'API (panne, surcharge) et non de la requête."""
+    if isinstance(error, APIStatusError):
+        return error.status_code >= 500 or error.status_code == 429
+    # Connexion, timeout, erreurs inattendues
+    return True
+
+
+class CircuitBreaker:
+    """
+    Coupe-circuit des appels à Claude, partagé par les threads d'un client.
+
+    Fermé, il laisse passer les appels et s'ouvre après ``failure_threshold``
+    échecs consécutifs, ou quand le taux d'échec des ``window_seconds``
+    dernières secondes atteint ``error_rate`` (sur au moins ``min_calls``
+    appels). Ouvert, il refuse les appels pendant ``open_seconds``, puis
+    laisse passer ``half_open_calls`` appels d'essai : un succès le referme,
+    un échec le rouvre.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        window_seconds: float = 60.0,
+        min_calls: int = 10,
+        error_rate: float = 0.5,
+        open_seconds: float = 30.0,
+        half_open_calls: int = 1,
+    ):
+        """
+        Args:
+            failure_threshold: Échecs consécutifs avant ouverture
+            window_seconds: Durée de la fenêtre glissante du taux d'échec
+            min_calls: Appels minimum dans la fenêtre pour juger du taux
+            error_rate: Taux d'échec provoquant l'ouverture (0-1)
+            open_seconds: Durée d'ouverture avant les appels d'essai
+            half_open_calls: Appels d'essai simultanés
+        """
+        self.failure_threshold = failure_threshold
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self._consecutive = 0
+        # (instant, échec) des appels de la fenêtre
+        self._window: deque[tuple[float, bool]] = deque()
+        self._window_failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+        # Compteurs
+        self.trips = 0
+        self.rejected = 0
+
+    def retry_after(self) -> float:
+        """Secondes avant les prochains appels d'essai (0 si fermé)."""
+        if self.state == CLOSED:
+            return 0.0
+        return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+
+    def acquire(self) -> bool:
+        """
+        Autorise un appel.
+
+        Returns:
+            True si l'appel est un appel d'essai (circuit semi-ouvert)
+
+        Raises:
+            CircuitOpenError: Si le circuit est ouvert
+        """
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() < self._opened_at + self.open_seconds:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.retry_after())
+                self.state = HALF_OPEN
+                self._probes = 0
+            if self.state == HALF_OPEN:
+                if self._probes >= self.half_open_calls:
+                    self.rejected += 1
+                    raise CircuitOpenError(1.0)
+                self._probes += 1
+                return True
+            return False
+
+    def release(self, probe: bool, failed: Optional[bool]):
+        """
+        Enregistre l'issue d'un appel autorisé par ``acquire``.
+
+        Args:
+            probe: Valeur retournée par ``acquire``
+            failed: True si l'API est en échec, False si elle a répondu,
+                None si l'appel a été abandonné avant la fin
+        """
+        now = time.monotonic()
+        with self._lock:
+            if probe:
+                self._probes -= 1
+                if failed and self.state == HALF_OPEN:
+                    self._open(now)
+                elif failed is False and self.state == HALF_OPEN:
+                    self._close()
+                return
+            # Appels commencés avant une ouverture : ignorés
+            if failed is None or self.state != CLOSED:
+                return
+
+            self._window.append((now, failed))
+            self._window_failures += failed
+            while self._window and self._window[0][0] < now - self.window_seconds:
+                self._window_failures -= self._window.popleft()[1]
+            self._consecutive = self._consecutive + 1 if failed else 0
+
+            if self._consecutive >= self.failure_threshold or (
+                len(self._window) >= self.min_calls
+                and self._window_failures >= self.error_rate * len(self._window)
+            ):
+                self._open(now)
+
+    def _open(self, now: float):
+        self.state = OPEN
+        self._opened_at = now
+        self.trips += 1
+        self._reset_window()
+
+    def _close(self):
+        self.state = CLOSED
+        self._reset_window()
+
+    def _reset_window(self):
+        self._window.clear()
+        self._window_failures = 0
+        self._consecutive = 0
+
+    def stats(self) -> dict:
+        """
+        Retourne l'état du coupe-circuit.
+
+        Returns:
+            État, échecs récents, ouvertures et appels refusés
+        """
+        with self._lock:
+            calls = len(self._window)
+            return {
+                "state": self.state,
+                "consecutive_failures": self._consecutive,
+                "window_calls": calls,
+                "window_failures": self._window_failures,
+                "error_rate": round(self._window_failures / calls, 3) if calls else 0.0,
+                "trips": self.trips,
+                "rejected": self.rejected,
+                "retry_after_seconds": round(self.retry_after(), 1),
+            }
+
+
 class AnthropicClient:
     """Client API pur pour Anthropic Claude (infrastructure uniquement)."""
 
@@ -74,12 +291,23 @@ class AnthropicClient:
         # Client lazy loading
         self._client = None
 
-        # Métriques d'utilisation pour le dernier appel
-        self.last_usage_metrics = None
+        # Métriques d'utilisation du dernier appel, par thread (le client est
+        # partagé entre les threads de génération de l'API)
+        self._usage = threading.local()
 
         # Compteur pour count_tokens
         self.token_counter = TokenCounter()
 
+        # Coupe-circuit : échec immédiat quand l'API est en panne
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.circuit_breaker.failure_threshold,
+            window_seconds=settings.circuit_breaker.window_seconds,
+            min_calls=settings.circuit_breaker.min_calls,
+            error_rate=settings.circuit_breaker.error_rate,
+            open_seconds=settings.circuit_breaker.open_seconds,
+            half_open_calls=settings.circuit_breaker.half_open_calls,
+        )
+
     def _get_config(self, key: str, default: Optional[str] = None) -> Optional[str]:
         """
         Récupère une valeur de configuration selon la source configurée.
@@ -116,6 +344,15 @@ class AnthropicClient:
 
         return os.getenv(key, default)
 
+    @property
+    def last_usage_metrics(self):
+        """Métriques d'utilisation du dernier appel de ce thread."""
+        return getattr(self._usage, "metrics", None)
+
+    @last_usage_metrics.setter
+    def last_usage_metrics(self, metrics):
+        self._usage.metrics = metrics
+
     @property
     def client(self) -> Anthropic:
         """Retourne le client Anthropic (lazy loading)."""
@@ -125,20 +362,41 @@ class AnthropicClient:
 
     @contextmanager
     def _api_call(self):
-        """Context manager pour les appels API avec gestion d'erreur."""
+        """
+        Context manager pour les appels API avec gestion d'erreur.
+
+        Chaque appel passe par le coupe-circuit : s'il est ouvert,
+        ``CircuitOpenError`` est levée sans appeler l'API.
+        """
+        try:
+            probe = self.breaker.acquire()
+        except CircuitOpenError:
+            timer = current_timer()
+            if timer is not None:
+                timer.record("circuit_open", 0.0)
+            raise
+
+        failed = None
         try:
             yield self.client
+            failed = False
         except Exception as e:
+            failed = _is_outage(e)
             # Import local pour éviter import circulaire
             from ..api.exceptions import APIErrorHandler
 
             raise APIErrorHandler.handle_api_error(e) from e
+        finally:
+            self.breaker.release(probe, failed)
 
     @retry(
-        stop=stop_after_attempt(3),
+        stop=stop_after_attempt(3) | _past_deadline,
         wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_not_exception_type(RateLimitError),
+        retry=retry_if_not_exception_type(
+            (RateLimitError, DeadlineExceededError, CircuitOpenError)
+        ),
         reraise=True,
+        sleep=timed_sleep,
     )
     def call_claude(
         self,
@@ -146,30 +404,43 @@ class AnthropicClient:
         max_tokens: Optional[int] = None,
         temperature: float = 0.7,
         model: Optional[str] = None,
+        *,
+        deadline: Optional[float] = None,
     ) -> str:
         """
         Effectue un appel générique à l'API Claude.
 
+        Avec une échéance, chaque tentative est limitée au temps restant et
+        aucun retry n'est tenté si l'attente avant lui dépasserait l'échéance.
+        Circuit ouvert : échec immédiat, sans retry.
+
         Args:
             prompt: Le prompt à envoyer
             max_tokens: Nombre max de tokens de sortie
             temperature: Température pour la génération
             model: Modèle à utiliser (optionnel)
+            deadline: Échéance absolue (``time.monotonic()``), optionnelle
 
         Returns:
             La réponse brute de l'API
 
         Raises:
+            DeadlineExceededError: Si l'échéance est dépassée
+            CircuitOpenError: Si le coupe-circuit est ouvert
             Exception: Pour les erreurs non récupérables
         """
         messages = [{"role": "user", "content": prompt}]
+        timeout = _remaining(deadline)
+        options = {"timeout": timeout} if timeout is not None else {}
 
-        with self._api_call() as client:
+        # Chaque tentative est chronométrée (le nombre apparaît dans Server-Timing)
+        with timed("claude"), self._api_call() as client:
             response = client.messages.create(
                 model=model or self.model,
                 max_tokens=max_tokens or self.max_tokens_output,
                 temperature=temperature,
                 messages=messages,
+                **options,
             )
 
         # Stocker les métriques d'utilisation
@@ -178,6 +449,50 @@ class AnthropicClient:
         # Retourner le texte brut
         return response.content[0].text.strip()
 
+    def stream_claude(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        model: Optional[str] = None,
+        *,
+        deadline: Optional[float] = None,
+    ) -> Iterator[str]:
+        """
+        Effectue un appel à l'API Claude en flux (streaming messages API).
+
+        Pas de retry automatique : une partie du texte a pu être transmise.
+
+        Args:
+            prompt: Le prompt à envoyer
+            max_tokens: Nombre max de tokens de sortie
+            temperature: Température pour la génération
+            model: Modèle à utiliser (optionnel)
+            deadline: Échéance absolue (``time.monotonic()``), optionnelle
+
+        Yields:
+            Les fragments de texte, au fil de leur génération
+
+        Raises:
+            DeadlineExceededError: Si l'échéance est dépassée
+            CircuitOpenError: Si le coupe-circuit est ouvert
+            Exception: Pour les erreurs de l'API
+        """
+        messages = [{"role": "user", "content": prompt}]
+        timeout = _remaining(deadline)
+        options = {"timeout": timeout} if timeout is not None else {}
+
+        with timed("claude"), self._api_call() as client:
+            with client.messages.stream(
+                model=model or self.model,
+                max_tokens=max_tokens or self.max_tokens_output,
+                temperature=temperature,
+                messages=messages,
+                **options,
+            ) as stream:
+                yield from stream.text_stream
+                self.last_usage_metrics = stream.get_final_message().usage
+
     def is_available(self) -> bool:
         """Vérifie si l'API est disponible."""
         try:
@@ -4,6 +4,7 @@ Gestionnaire d'état centralisé pour l'application.
 
 import streamlit as st
 
+from .core.collection import QuoteCollection
 from .core.data_loader import DataLoader
 from .core.models import Quote
 
@@ -28,9 +29,9 @@ class StateManager:
             st.session_state.current_quote = random.choice(st.session_state.quotes)
 
         if "saved_quotes" not in st.session_state:
-            st.session_state.saved_quotes = []
+            st.session_state.saved_quotes = QuoteCollection()
         if "saved_poems" not in st.session_state:
-            st.session_state.saved_poems = []
+            st.session_state.saved_poems = QuoteCollection()
         if "language" not in st.session_state:
             st.session_state.language = "fr"
         if "show_all_quotes" not in st.session_state:
@@ -0,0 +1,125 @@
+"""
+Chronométrage par requête des étapes internes (en-tête Server-Timing).
+
+Un ``RequestTimer`` est attaché au contexte courant (``contextvars``) par le
+middleware de l'API. Les services, le stockage et le client Anthropic y
+enregistrent leurs étapes via ``timed("nom")`` sans avoir à le recevoir en
+paramètre. Hors requête (Streamlit, CLI), aucun timer n'est actif et
+``timed`` ne coûte qu'une lecture de variable de contexte.
+"""
+
+import asyncio
+import time
+from collections.abc import Coroutine, Iterator
+from contextlib import contextmanager
+from contextvars import Context, ContextVar, Token
+from typing import Optional
+
+
+class RequestTimer:
+    """Durées cumulées des étapes d'une requête."""
+
+    __slots__ = ("start", "stages")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        # {étape: [durée cumulée (s), nombre d'occurrences]}, ordre d'apparition
+        self.stages: dict[str, list] = {}
+
+    def record(self, name: str, seconds: float):
+        """
+        Ajoute une durée à une étape (les occurrences sont cumulées).
+
+        Args:
+            name: Nom de l'étape (ex: "claude", "storage_save")
+            seconds: Durée en secondes
+        """
+        stage = self.stages.get(name)
+        if stage is None:
+            self.stages[name] = [seconds, 1]
+        else:
+            stage[0] += seconds
+            stage[1] += 1
+
+    def elapsed(self) -> float:
+        """Temps écoulé depuis le début de la requête (secondes)."""
+        return time.perf_counter() - self.start
+
+    def header(self) -> str:
+        """
+        Formate les étapes pour l'en-tête Server-Timing.
+
+        Returns:
+            Ex: ``claude;dur=812.4;desc="x2", total;dur=815.0``
+        """
+        parts = []
+        for name, (seconds, count) in self.stages.items():
+            part = f"{name};dur={seconds * 1000:.1f}"
+            if count > 1:
+                part += f';desc="x{count}"'
+            parts.append(part)
+        parts.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current_timer: ContextVar[Optional[RequestTimer]] = ContextVar(
+    "request_timer", default=None
+)
+
+
+def start_timer() -> tuple[RequestTimer, Token]:
+    """Attache un nouveau timer au contexte courant."""
+    timer = RequestTimer()
+    return timer, _current_timer.set(timer)
+
+
+def stop_timer(token: Token):
+    """Détache le timer posé par ``start_timer``."""
+    _current_timer.reset(token)
+
+
+def current_timer() -> Optional[RequestTimer]:
+    """Retourne le timer de la requête en cours, s'il y en a un."""
+    return _current_timer.get()
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """
+    Chronomètre un bloc et l'enregistre dans le timer de la requête en cours.
+
+    Args:
+        name: Nom de l'étape
+    """
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.record(name, time.perf_counter() - start)
+
+
+def timed_sleep(seconds: float):
+    """``time.sleep`` chronométré (attentes entre deux tentatives de retry)."""
+    with timed("retry_wait"):
+        time.sleep(seconds)
+
+
+def create_background_task(coro: Coroutine) -> asyncio.Task:
+    """
+    Lance une tâche de fond dans un contexte vide, sans timer de requête.
+
+    Une tâche copie le contexte de celle qui la crée : lancée pendant une
+    requête, elle enregistrerait toutes ses étapes dans le timer de cette
+    requête, bien après sa fin.
+
+    Args:
+        coro: Coroutine de la tâche
+
+    Returns:
+        La tâche
+    """
+    return Context().run(asyncio.create_task, coro)
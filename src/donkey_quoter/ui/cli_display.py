@@ -49,6 +49,28 @@ def print_stats(stats: dict[str, Any]):
     print(f"\nTOTAL : {stats['total_quotes']} citations")
 
 
+def print_duplicate_report(report: dict[str, Any]):
+    """Affiche les grappes de quasi-doublons."""
+    print("\n🔁 Quasi-doublons")
+    print("=" * 40)
+
+    total = 0
+    for kind, label in (("quotes", "CITATIONS"), ("haikus", "HAÏKUS")):
+        for lang, clusters in report[kind].items():
+            if not clusters:
+                continue
+            print(f"\n{label} {lang.upper()} : {len(clusters)} grappe(s)")
+            for cluster in clusters:
+                total += 1
+                print(f"\n   Grappe {total} ({len(cluster)} éléments)")
+                for item in cluster:
+                    first_line = item["text"].split("\n")[0]
+                    print(f"   - [{item['id']}] {first_line}")
+
+    if total == 0:
+        print("\nAucun quasi-doublon détecté")
+
+
 def print_error(message: str):
     """Affiche une erreur."""
     print(f"❌ {message}")
@@ -389,15 +389,13 @@ def render_quote_list(
 
     container = st.container(height=settings.ui.quote_list_height)
     with container:
-        for quote in quotes:
-            quote_text = quote_manager.get_text(quote.text, lang)
-            quote_author = quote_manager.get_text(quote.author, lang)
-
+        views = quote_manager.get_quote_views(lang, quotes)
+        for quote, view in zip(quotes, views):
             render_quote_list_item(
                 quote=quote,
                 lang=lang,
-                quote_text=quote_text,
-                quote_author=quote_author,
+                quote_text=view.text,
+                quote_author=view.author,
                 on_display=lambda q: (
                     setattr(quote_manager, "current_quote", q),
                     StateManager.hide_all_quotes(),
@@ -0,0 +1,98 @@
+"""
+Fixtures partagées : application API isolée (stockage temporaire, client
+Claude factice, rate limiter en mémoire).
+"""
+
+import random
+import string
+import threading
+import time
+
+import pytest
+
+from src.donkey_quoter.api import auth, create_app
+from src.donkey_quoter.api.auth import RateLimiter
+from src.donkey_quoter.api.dependencies import (
+    get_anthropic_client,
+    get_generation_executor,
+    get_storage,
+)
+from src.donkey_quoter.api.generation import GenerationExecutor
+from src.donkey_quoter.config.settings import settings
+from src.donkey_quoter.core.storage import DataStorage
+
+API_KEY = "dev-key-for-testing"
+
+
+def random_haiku(rng: random.Random) -> str:
+    """Haïku aléatoire, sans ressemblance avec les autres (pas de quasi-doublon)."""
+    return "\n".join(
+        " ".join("".join(rng.choices(string.ascii_lowercase, k=6)) for _ in range(3))
+        for _ in range(3)
+    )
+
+
+class FakeClaudeClient:
+    """Client Claude factice : appel bloquant d'une durée fixe, haïkus inédits."""
+
+    max_tokens_input = 200
+    model = "test-model"
+
+    def __init__(self, delay: float = 0.0, haiku: str = None):
+        self.delay = delay
+        self.haiku = haiku
+        self.calls = 0
+        self._rng = random.Random(0)
+        self._lock = threading.Lock()
+
+    def _next_haiku(self) -> str:
+        with self._lock:
+            self.calls += 1
+            return self.haiku or random_haiku(self._rng)
+
+    def call_claude(self, prompt: str, **kwargs) -> str:
+        time.sleep(self.delay)
+        return self._next_haiku()
+
+    def stream_claude(self, prompt: str, **kwargs):
+        time.sleep(self.delay)
+        for line in self._next_haiku().split("\n"):
+            yield line + "\n"
+
+
+@pytest.fixture
+def storage(tmp_path) -> DataStorage:
+    return DataStorage(tmp_path)
+
+
+@pytest.fixture
+def claude() -> FakeClaudeClient:
+    return FakeClaudeClient()
+
+
+@pytest.fixture
+def executor():
+    executor = GenerationExecutor(max_workers=2, max_queue=4, expected_seconds=0.1)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.fixture
+def limiter(monkeypatch) -> RateLimiter:
+    limiter = RateLimiter(limit=5)
+    monkeypatch.setattr(auth, "_rate_limiter", limiter)
+    return limiter
+
+
+@pytest.fixture
+def app(monkeypatch, storage, claude, executor, limiter):
+    monkeypatch.setenv("DONKEY_QUOTER_DEV_MODE", "true")
+    monkeypatch.setattr(auth, "_api_key_manager", None)
+    # Pas de remplissage de la réserve en arrière-plan pendant les tests
+    monkeypatch.setattr(settings.pool, "enabled", False)
+
+    app = create_app()
+    app.dependency_overrides[get_storage] = lambda: storage
+    app.dependency_overrides[get_anthropic_client] = lambda: claude
+    app.dependency_overrides[get_generation_executor] = lambda: executor
+    return app
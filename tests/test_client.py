@@ -0,0 +1,44 @@
+"""
+Tests du client HTTP (lectures groupées).
+"""
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from src.donkey_quoter.api.client import DonkeyQuoterAPIClient
+
+
+@pytest.fixture
+def api(app) -> DonkeyQuoterAPIClient:
+    client = DonkeyQuoterAPIClient(base_url="http://testserver")
+    client._client = TestClient(app)
+    return client
+
+
+def test_batches_are_split_at_the_server_limit(api):
+    requests = []
+    api.client.event_hooks["request"].append(requests.append)
+    quote_ids = ["c1", *(f"missing{i}" for i in range(249))]
+
+    quotes = api.get_quotes_batch(quote_ids)
+    haikus = api.get_haikus_batch(quote_ids)
+
+    assert len(requests) == 6
+    assert list(quotes) == quote_ids
+    assert quotes["c1"].id == "c1"
+    assert quotes["missing0"] is None
+    assert set(haikus) == set(quote_ids)
+
+
+def test_batch_errors_are_raised():
+    api = DonkeyQuoterAPIClient(base_url="http://testserver")
+    api._client = httpx.Client(
+        base_url="http://testserver",
+        transport=httpx.MockTransport(lambda request: httpx.Response(503)),
+    )
+
+    with pytest.raises(httpx.HTTPStatusError):
+        api.get_quotes_batch(["c1"])
+    with pytest.raises(httpx.HTTPStatusError):
+        api.get_haikus_batch(["c1"])
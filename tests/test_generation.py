@@ -0,0 +1,170 @@
+"""
+Tests des générations de haïkus via l'API (pool dédié, file bornée).
+"""
+
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from src.donkey_quoter.api.generation import (
+    GenerationExecutor,
+    GenerationOverloadedError,
+)
+from src.donkey_quoter.config.settings import settings
+
+from .conftest import API_KEY
+
+
+def test_reads_stay_fast_while_generations_are_in_flight(app, claude, executor):
+    claude.delay = 1.0
+
+    async def scenario() -> dict[str, float]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://t"
+        ) as client:
+            generations = [
+                asyncio.create_task(
+                    client.post(
+                        "/haikus/generate",
+                        json={"quote_id": quote_id, "force_new": True},
+                        headers={"X-API-Key": API_KEY},
+                    )
+                )
+                for quote_id in ("c1", "c2")
+            ]
+            # Attendre que les deux places du pool soient prises
+            while executor.active < executor.max_workers:
+                await asyncio.sleep(0.01)
+
+            latencies = {}
+            for path in ("/health", "/quotes"):
+                start = time.perf_counter()
+                response = await client.get(path)
+                latencies[path] = time.perf_counter() - start
+                assert response.status_code == 200
+
+            assert executor.active == executor.max_workers
+            responses = await asyncio.gather(*generations)
+            assert [r.json()["was_generated"] for r in responses] == [True, True]
+            return latencies
+
+    latencies = asyncio.run(scenario())
+    # Bien en dessous de la durée d'une génération (1 s)
+    assert max(latencies.values()) < 0.25, latencies
+
+
+def test_cancelled_generation_keeps_its_slot_until_the_thread_ends():
+    executor = GenerationExecutor(max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(executor.run(release.wait), timeout=0.05)
+        # Le thread tourne toujours : la place n'est pas rendue
+        assert executor.active == 1
+        with pytest.raises(GenerationOverloadedError):
+            await executor.run(time.sleep, 0)
+
+        release.set()
+        while executor.active:
+            await asyncio.sleep(0.01)
+        assert await executor.run(sum, [1, 2]) == 3
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_rejected_duplicate_is_served_without_charging(app, claude, limiter):
+    claude.haiku = "vent sur la colline\nun âne regarde au loin\nles nuages passent"
+
+    async def scenario() -> list[dict]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://t"
+        ) as client:
+            results = []
+            for _ in range(2):
+                response = await client.post(
+                    "/haikus/generate",
+                    json={"quote_id": "c1", "force_new": True},
+                    headers={"X-API-Key": API_KEY},
+                )
+                assert response.status_code == 200
+                results.append(response.json())
+            return results
+
+    first, second = asyncio.run(scenario())
+    assert first["was_generated"] is True
+    # Même texte : refusé comme doublon, le haïku stocké est servi
+    assert second["was_generated"] is False
+    assert second["haiku_text"] == claude.haiku
+    assert claude.calls == 2
+    assert limiter.get_remaining(API_KEY) == limiter.limit - 1
+
+
+def test_stream_charges_only_stored_generations(app, claude, limiter):
+    claude.haiku = "vent sur la colline\nun âne regarde au loin\nles nuages passent"
+
+    def stream() -> str:
+        with TestClient(app) as client:
+            response = client.post(
+                "/haikus/generate/stream",
+                json={"quote_id": "c1", "force_new": True},
+                headers={"X-API-Key": API_KEY},
+            )
+            assert response.status_code == 200
+            return response.text
+
+    first = stream()
+    assert '"stored":true' in first
+    assert limiter.get_remaining(API_KEY) == limiter.limit - 1
+
+    # Doublon refusé : la réservation est rendue à la fin du flux
+    second = stream()
+    assert '"stored":false' in second
+    assert limiter.get_remaining(API_KEY) == limiter.limit - 1
+
+
+def test_haiku_close_to_another_quotes_haiku_is_served_as_generated(
+    app, claude, storage, limiter, monkeypatch
+):
+    monkeypatch.setattr(settings.deduplication, "haiku_policy", "reject")
+    storage.add_haiku(
+        "c2", "Vent sur la colline,\nun âne regarde au loin,\nles nuages passent.", "fr"
+    )
+    claude.haiku = "vent sur la colline\nun âne regarde au loin\nles nuages passent"
+
+    response = TestClient(app).post(
+        "/haikus/generate",
+        json={"quote_id": "c1", "force_new": True},
+        headers={"X-API-Key": API_KEY},
+    )
+
+    result = response.json()
+    assert result["quote_id"] == "c1"
+    assert result["haiku_text"] == claude.haiku
+    assert result["was_generated"] is True
+    assert limiter.get_remaining(API_KEY) == limiter.limit - 1
+
+
+def test_executor_built_outside_the_event_loop_works_inside_it():
+    # Comme la dépendance lru_cache, exécutée dans un thread sans boucle
+    holder = []
+    thread = threading.Thread(target=lambda: holder.append(GenerationExecutor(1)))
+    thread.start()
+    thread.join()
+    executor = holder[0]
+    assert executor._slots is None
+
+    try:
+        assert asyncio.run(executor.run(sum, [1, 2])) == 3
+    finally:
+        executor.shutdown()
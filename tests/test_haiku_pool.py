@@ -0,0 +1,68 @@
+"""
+Tests de la réserve de haïkus pré-générés (budget quotidien).
+"""
+
+import asyncio
+
+from src.donkey_quoter.api.generation import GenerationExecutor
+from src.donkey_quoter.api.haiku_pool import HaikuPool
+from src.donkey_quoter.config.settings import settings
+from src.donkey_quoter.core.haiku_manager import HaikuManager
+from src.donkey_quoter.core.models import Quote
+from src.donkey_quoter.core.storage import DataStorage
+
+MODEL = "claude-3-haiku-20240307"
+QUOTES = {
+    f"q{i}": Quote(
+        id=f"q{i}",
+        text={"fr": f"Citation numéro {i}", "en": f"Quote number {i}"},
+        author={"fr": "Âne", "en": "Donkey"},
+        category="classic",
+        type="preset",
+    )
+    for i in range(10)
+}
+
+
+class WorstCaseManager(HaikuManager):
+    """Chaque lot consomme exactement son estimation maximale."""
+
+    def __init__(self, storage: DataStorage):
+        super().__init__(storage=storage)
+        self.model = MODEL
+        self.batches = 0
+
+    def generate_batch_with_usage(self, quotes: list[Quote]):
+        self.batches += 1
+        haikus = {q.id: {"fr": f"fr {q.id}", "en": f"en {q.id}"} for q in quotes}
+        return haikus, self.estimate_batch_usage(quotes)
+
+
+def batch_cost(manager: HaikuManager, quotes: list[Quote]) -> float:
+    usage = manager.estimate_batch_usage(quotes)
+    return settings.pricing.cost(MODEL, usage["input_tokens"], usage["output_tokens"])
+
+
+def test_refill_never_exceeds_the_daily_budget(tmp_path):
+    manager = WorstCaseManager(DataStorage(tmp_path))
+    quotes = list(QUOTES.values())
+    # Budget d'un lot et demi : le deuxième lot ne doit pas partir
+    budget = batch_cost(manager, quotes[:5]) * 1.5
+    pool = HaikuPool(size=1, batch_size=5, daily_budget_usd=budget)
+    executor = GenerationExecutor(max_workers=4)
+
+    async def scenario():
+        pool.start(QUOTES.get, manager, executor)
+        for quote_id in QUOTES:
+            pool.take(quote_id, "fr")
+        while manager.batches < 1 or executor.active:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert manager.batches == 1
+    assert 0 < pool.spent_today() <= budget
@@ -0,0 +1,45 @@
+"""
+Tests des validateurs HTTP (ETags dérivés du contenu).
+"""
+
+from fastapi.testclient import TestClient
+
+from src.donkey_quoter.api.dependencies import (
+    QuoteRepository,
+    get_quote_repository,
+    get_storage,
+)
+from src.donkey_quoter.core.storage import DataStorage
+
+HAIKU = "vent sur la colline\nun âne regarde au loin\nles nuages passent"
+
+
+def etag(app, path: str) -> str:
+    response = TestClient(app).get(path)
+    assert response.status_code == 200
+    return response.headers["ETag"]
+
+
+def test_etag_depends_on_content_not_on_process_counters(app, storage, tmp_path):
+    before = etag(app, "/haikus/c1/exists")
+    storage.add_haiku("c1", HAIKU, "fr")
+    after = etag(app, "/haikus/c1/exists")
+    assert after != before
+
+    # Autre worker : même fichier relu, compteur de versions à zéro
+    other = DataStorage(tmp_path)
+    assert other.version != storage.version
+    app.dependency_overrides[get_storage] = lambda: other
+    assert etag(app, "/haikus/c1/exists") == after
+
+
+def test_quote_etag_survives_a_corpus_reload(app):
+    repo = QuoteRepository()
+    app.dependency_overrides[get_quote_repository] = lambda: repo
+    first = etag(app, "/quotes/c1")
+
+    # Rechargement (ou autre worker) : nouvelle version, même contenu
+    repo.reload()
+    response = TestClient(app).get("/quotes/c1", headers={"If-None-Match": first})
+    assert repo.version == 2
+    assert response.status_code == 304
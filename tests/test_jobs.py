@@ -0,0 +1,91 @@
+"""
+Tests des jobs de génération en lot.
+"""
+
+import asyncio
+
+from src.donkey_quoter.api.generation import GenerationExecutor
+from src.donkey_quoter.api.jobs import COMPLETED, FAILED, PENDING, JobRunner, JobStore
+from src.donkey_quoter.core.models import Quote
+from src.donkey_quoter.core.storage import DataStorage
+from src.donkey_quoter.timing import start_timer, stop_timer, timed
+
+QUOTES = [
+    Quote(
+        id=f"q{i}",
+        text={"fr": f"Citation {i}", "en": f"Quote {i}"},
+        author={"fr": "Âne", "en": "Donkey"},
+        category="classic",
+        type="preset",
+    )
+    for i in range(3)
+]
+
+
+class FakeManager:
+    """Gestionnaire factice : un haïku distinct par citation et par langue."""
+
+    model = "test-model"
+
+    def __init__(self, storage: DataStorage):
+        self.storage = storage
+
+    def generate_batch_with_usage(self, quotes: list[Quote]):
+        with timed("claude"):
+            haikus = {
+                quote.id: {
+                    lang: f"{lang} {quote.id}\nligne deux {quote.id}\nfin {quote.id}"
+                    for lang in ("fr", "en")
+                }
+                for quote in quotes
+            }
+        return haikus, {"input_tokens": 10, "output_tokens": 10}
+
+
+def run_job(tmp_path, manager) -> tuple:
+    store = JobStore(tmp_path / "jobs")
+    executor = GenerationExecutor(max_workers=2)
+
+    async def scenario():
+        runner = JobRunner(store)
+        job = store.create(QUOTES, manager.model, batch_size=2)
+        timer, token = start_timer()
+        try:
+            runner.submit(job, QUOTES, manager, executor)
+        finally:
+            stop_timer(token)
+        await asyncio.gather(*runner._tasks)
+        return job, timer
+
+    try:
+        job, timer = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    return store, job, timer
+
+
+def test_job_timings_stay_out_of_the_submitting_request(tmp_path):
+    _, job, timer = run_job(tmp_path, FakeManager(DataStorage(tmp_path)))
+
+    assert job.status == COMPLETED
+    assert "claude" not in timer.stages
+
+
+class BrokenStorage(DataStorage):
+    """Stockage dont l'écriture échoue (disque plein)."""
+
+    def add_haiku(self, *args, **kwargs) -> bool:
+        raise OSError("No space left on device")
+
+
+def test_unexpected_error_marks_the_job_failed(tmp_path):
+    store, job, _ = run_job(tmp_path, FakeManager(BrokenStorage(tmp_path)))
+
+    assert job.status == FAILED
+    assert "No space left on device" in job.error
+    assert job.finished_at is not None
+    assert job.count(PENDING) == 0
+    # État final persisté : relu tel quel, pas marqué interrompu
+    reloaded = JobStore(tmp_path / "jobs").get(job.id)
+    assert reloaded.status == FAILED
+    assert reloaded.error == job.error
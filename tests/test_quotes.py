@@ -0,0 +1,68 @@
+"""
+Tests de création des citations (politique de quasi-doublons).
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.donkey_quoter.config.settings import settings
+from src.donkey_quoter.core.models import QuoteInput
+from src.donkey_quoter.core.services import DonkeyQuoterService, DuplicateQuoteError
+
+QUOTE = QuoteInput(text="Le vent tourne toujours.", author="Âne anonyme")
+
+
+def find_duplicate(text: str, language: str) -> str:
+    return "c1"
+
+
+@pytest.mark.parametrize(("policy", "duplicate_id"), [("flag", "c1"), ("off", None)])
+def test_create_quote_deduplicated_flags_or_ignores(monkeypatch, policy, duplicate_id):
+    monkeypatch.setattr(settings.deduplication, "quote_policy", policy)
+
+    quote, found = DonkeyQuoterService().create_quote_deduplicated(
+        QUOTE, "fr", find_duplicate
+    )
+
+    assert quote.text["fr"] == QUOTE.text
+    assert found == duplicate_id
+
+
+def test_create_quote_deduplicated_rejects(monkeypatch):
+    monkeypatch.setattr(settings.deduplication, "quote_policy", "reject")
+
+    with pytest.raises(DuplicateQuoteError) as info:
+        DonkeyQuoterService().create_quote_deduplicated(QUOTE, "fr", find_duplicate)
+    assert info.value.duplicate_id == "c1"
+
+
+def test_create_quote_route_maps_rejection_to_409(monkeypatch, app):
+    monkeypatch.setattr(settings.deduplication, "quote_policy", "reject")
+    client = TestClient(app)
+    existing = client.get("/quotes/c1").json()["data"]
+
+    response = client.post(
+        "/quotes",
+        json={"text": existing["text"]["fr"], "author": existing["author"]["fr"]},
+    )
+
+    assert response.status_code == 409
+    assert "c1" in response.json()["detail"]
+
+
+def test_near_duplicate_of_only_on_created_quotes(monkeypatch, app):
+    monkeypatch.setattr(settings.deduplication, "quote_policy", "flag")
+    client = TestClient(app)
+    existing = client.get("/quotes/c1").json()
+
+    created = client.post(
+        "/quotes",
+        json={
+            "text": existing["data"]["text"]["fr"],
+            "author": existing["data"]["author"]["fr"],
+        },
+    )
+
+    assert "near_duplicate_of" not in existing
+    assert created.status_code == 201
+    assert created.json()["near_duplicate_of"] == "c1"
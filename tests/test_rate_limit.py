@@ -0,0 +1,88 @@
+"""
+Tests des stockages du rate limiter.
+"""
+
+import threading
+
+import pytest
+
+from src.donkey_quoter.api.auth import GenerationReservation, RateLimiter
+from src.donkey_quoter.api.rate_limit import (
+    MemoryRateLimitBackend,
+    SQLiteRateLimitBackend,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite", "sqlite-transaction"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryRateLimitBackend()
+    # Sans RETURNING : chemin des bibliothèques SQLite antérieures à 3.35
+    returning = request.param == "sqlite"
+    return SQLiteRateLimitBackend(tmp_path / "limits.sqlite3", returning=returning)
+
+
+def test_reserve_stops_at_the_limit(backend):
+    limiter = RateLimiter(limit=3, backend=backend)
+
+    assert [limiter.reserve("key") for _ in range(4)] == [True, True, True, False]
+    assert limiter.get_remaining("key") == 0
+
+    limiter.refund("key")
+    assert limiter.get_remaining("key") == 1
+
+
+def test_add_advances_past_the_limit(backend):
+    limiter = RateLimiter(limit=2, backend=backend)
+
+    for _ in range(3):
+        limiter.record("key")
+
+    assert limiter.get_remaining("key") == 0
+    assert not limiter.reserve("key")
+    assert limiter.retry_after("key") > limiter.interval
+
+
+def test_concurrent_reserve_grants_exactly_the_limit(backend):
+    limiter = RateLimiter(limit=50, backend=backend)
+    barrier = threading.Barrier(8)
+    granted = []
+
+    def worker():
+        barrier.wait()
+        granted.append(sum(limiter.reserve("key") for _ in range(20)))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(granted) == 50
+
+
+def test_charge_after_release_does_not_exceed_the_quota():
+    limiter = RateLimiter(limit=1)
+    assert limiter.reserve("key")
+    reservation = GenerationReservation(limiter, "key")
+
+    reservation.release()
+    # Quota repris entre-temps par une autre requête
+    assert limiter.reserve("key")
+    retry_after = limiter.retry_after("key")
+
+    reservation.charge()
+    assert not reservation.charged
+    assert limiter.retry_after("key") == pytest.approx(retry_after, abs=1)
+
+
+def test_charge_after_release_takes_a_free_slot_back():
+    limiter = RateLimiter(limit=2)
+    assert limiter.reserve("key")
+    reservation = GenerationReservation(limiter, "key")
+
+    reservation.release()
+    reservation.charge()
+
+    assert reservation.charged
+    assert limiter.get_remaining("key") == 1
@@ -0,0 +1,88 @@
+"""
+Tests du stockage des haïkus (écritures concurrentes).
+"""
+
+import random
+import string
+import threading
+
+from src.donkey_quoter.config.settings import settings
+from src.donkey_quoter.core.storage import DataStorage
+
+
+def _random_haiku(rng: random.Random) -> str:
+    """Haïku aléatoire, sans ressemblance avec les autres (pas de quasi-doublon)."""
+    return "\n".join(
+        " ".join("".join(rng.choices(string.ascii_lowercase, k=6)) for _ in range(3))
+        for _ in range(3)
+    )
+
+
+def test_concurrent_add_haiku_keeps_every_haiku(tmp_path):
+    storage = DataStorage(tmp_path)
+    errors = []
+    barrier = threading.Barrier(8)
+
+    def writer(worker: int):
+        rng = random.Random(worker)
+        barrier.wait()
+        for i in range(20):
+            try:
+                # Deux citations partagées : lecture-modification-écriture concurrente
+                assert storage.add_haiku(f"q{i % 2}", _random_haiku(rng), "fr", "test")
+            except Exception as e:  # pragma: no cover - échec du test
+                errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(w,)) for w in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert storage.count_haikus("q0", "fr") + storage.count_haikus("q1", "fr") == 160
+
+    # Fichier sauvegardé complet, index des quasi-doublons aligné sur les positions
+    reloaded = DataStorage(tmp_path)
+    assert reloaded.count_haikus("q0", "fr") == 80
+    for quote_id in ("q0", "q1"):
+        for position, haiku in enumerate(storage.get_all_haikus(quote_id, "fr")):
+            found = storage.find_near_duplicate_haiku(haiku["text"], "fr")
+            assert found == (quote_id, position)
+
+
+def test_snapshot_is_not_affected_by_later_writes(tmp_path):
+    storage = DataStorage(tmp_path)
+    storage.add_haiku("q1", "vent sur la colline\nl'âne rêve\nle pré se tait", "fr")
+    snapshot = storage.snapshot()
+
+    storage.add_haiku("q1", "pluie sur les toits\nun chat dort\nle soir descend", "fr")
+    storage.add_haiku("q2", "neige du matin\nle pas lent\nsilence blanc", "fr")
+
+    assert len(snapshot["q1"]["fr"]) == 1
+    assert "q2" not in snapshot
+
+
+HAIKU = "vent sur la colline\nun âne regarde au loin\nles nuages passent"
+# Quasi identique après normalisation (casse, ponctuation)
+NEAR_HAIKU = "Vent sur la colline,\nun âne regarde au loin,\nles nuages passent."
+
+
+def test_near_duplicate_of_another_quote_is_stored_and_flagged(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings.deduplication, "haiku_policy", "reject")
+    storage = DataStorage(tmp_path)
+    assert storage.add_haiku("q1", HAIKU, "fr")
+
+    assert storage.add_haiku("q2", NEAR_HAIKU, "fr")
+    assert storage.get_all_haikus("q2", "fr")[0]["near_duplicate_of"] == "q1"
+
+
+def test_near_duplicate_of_the_same_quote_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings.deduplication, "haiku_policy", "reject")
+    storage = DataStorage(tmp_path)
+    assert storage.add_haiku("q1", HAIKU, "fr")
+    assert storage.add_haiku("q2", NEAR_HAIKU, "fr")
+
+    assert not storage.add_haiku("q2", HAIKU, "fr")
+    # Le haïku servi à la place est celui de la même citation
+    assert storage.get_duplicate_haiku("q2", HAIKU, "fr")["text"] == NEAR_HAIKU
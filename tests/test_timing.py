@@ -0,0 +1,32 @@
+"""
+Tests du chronométrage par requête.
+"""
+
+import asyncio
+
+from src.donkey_quoter.timing import (
+    create_background_task,
+    current_timer,
+    start_timer,
+    stop_timer,
+    timed,
+)
+
+
+def test_background_task_does_not_record_into_the_request_timer():
+    async def background():
+        with timed("claude"):
+            pass
+        return current_timer()
+
+    async def request():
+        timer, token = start_timer()
+        try:
+            task = create_background_task(background())
+        finally:
+            stop_timer(token)
+        return timer, await task
+
+    timer, background_timer = asyncio.run(request())
+    assert background_timer is None
+    assert "claude" not in timer.stages